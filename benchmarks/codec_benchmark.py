@@ -0,0 +1,70 @@
+import argparse
+import dataclasses
+import time
+import tracemalloc
+from datetime import date, datetime
+from boto3.dynamodb.types import TypeDeserializer
+from models.DynamoCodec import decode_page, decode_game_turn
+from models.GameTurn import GameTurn
+
+
+# run from the project root: python -m benchmarks.codec_benchmark
+def make_items(count: int) -> list[dict]:
+    return [GameTurn(
+        username=f"player{i % 1000}",
+        game_date=date(2024, 1, 1),
+        game_timestamp=datetime.fromtimestamp(1704067200 + i + 0.25),
+        word="crane",
+        win=i % 6 == 0,
+        game_id="4f0b7c1e-8d0e-4a57-9d6b-3c7a3f1c2b10"
+    ).to_dynamo_json() for i in range(count)]
+
+
+def generic_decode_page(items: list[dict]) -> list:
+    # field by field decoding through the boto3 TypeDeserializer, as DynamoProvider did before the codec
+    deserializer = TypeDeserializer()
+    return [GameTurn(
+        username=deserializer.deserialize(item["username"]),
+        game_date=date.fromisoformat(deserializer.deserialize(item["game_date"])),
+        game_timestamp=datetime.fromtimestamp(int(deserializer.deserialize(item["game_timestamp"]))),
+        word=deserializer.deserialize(item["word"]),
+        win=deserializer.deserialize(item["win"]),
+        game_id=deserializer.deserialize(item["game_id"])
+    ) for item in items]
+
+
+def items_per_second(decode, items: list[dict]) -> float:
+    started_at = time.perf_counter()
+    decode(items)
+    return len(items) / (time.perf_counter() - started_at)
+
+
+def bytes_per_item(model_type, items: list[dict]) -> float:
+    models = decode_page(items, decode_game_turn)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    copies = [model_type(**{f.name: getattr(model, f.name) for f in dataclasses.fields(model)}) for model in models]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return (used - copies.__sizeof__()) / len(copies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure GameTurn decoding throughput and memory per item")
+    parser.add_argument("--items", type=int, default=100000)
+    args = parser.parse_args()
+    items = make_items(args.items)
+    dict_game_turn = dataclasses.make_dataclass(
+        "DictGameTurn",
+        [(f.name, f.type) for f in dataclasses.fields(GameTurn)]
+    )
+
+    print(f"items:                   {args.items}")
+    print(f"TypeDeserializer:        {items_per_second(generic_decode_page, items):,.0f} items/s")
+    print(f"codec:                   {items_per_second(lambda page: decode_page(page, decode_game_turn), items):,.0f} items/s")
+    print(f"dataclass without slots: {bytes_per_item(dict_game_turn, items):.0f} bytes/item")
+    print(f"slotted GameTurn:        {bytes_per_item(GameTurn, items):.0f} bytes/item")
+
+
+if __name__ == "__main__":
+    main()
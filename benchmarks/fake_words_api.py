@@ -0,0 +1,60 @@
+import asyncio
+import os
+import random
+from fastapi import FastAPI, Response
+from providers.WordIndex import WordIndex
+
+# a local stand-in for wordsapi with configurable latency and failures, for exercising the words api client
+# run from the project root: uvicorn benchmarks.fake_words_api:app --port 9000
+# then point the api at it with WORDS_API_URL=http://127.0.0.1:9000
+LATENCY_SECONDS = float(os.getenv("FAKE_WORDS_API_LATENCY", "0.05"))
+FAILURE_RATE = float(os.getenv("FAKE_WORDS_API_FAILURE_RATE", "0"))
+HANG_RATE = float(os.getenv("FAKE_WORDS_API_HANG_RATE", "0"))
+# answer the first requests with 503 before behaving normally, for a deterministic flaky upstream
+FAILURES_BEFORE_SUCCESS = int(os.getenv("FAKE_WORDS_API_FAILURES_BEFORE_SUCCESS", "0"))
+
+app = FastAPI()
+word_index = WordIndex.from_file()
+words = word_index.words()
+request_count = 0
+
+
+async def upstream_delay() -> Response | None:
+    global request_count
+    request_count += 1
+    roll = random.random()
+    if roll < HANG_RATE:
+        # longer than any sensible read timeout
+        await asyncio.sleep(3600)
+    await asyncio.sleep(LATENCY_SECONDS)
+    if roll < HANG_RATE + FAILURE_RATE or request_count <= FAILURES_BEFORE_SUCCESS:
+        return Response(status_code=503)
+    return None
+
+
+@app.get("/words/")
+async def list_words(limit: int = 50, page: int = 1):
+    failure = await upstream_delay()
+    if failure is not None:
+        return failure
+    start = (page - 1) * limit
+    return {
+        "results": {
+            "total": len(words),
+            "data": words[start:start + limit]
+        },
+        "query": {
+            "limit": limit,
+            "page": page
+        }
+    }
+
+
+@app.get("/words/{word}/frequency")
+async def word_frequency(word: str):
+    failure = await upstream_delay()
+    if failure is not None:
+        return failure
+    if word not in word_index:
+        return Response(status_code=404)
+    return {"word": word, "frequency": {"zipf": 3.0}}
@@ -0,0 +1,222 @@
+import asyncio
+import random
+import threading
+import time
+from botocore.exceptions import ClientError
+from models.GameSummary import MAX_ATTEMPTS
+from providers.WordsProvider import WordsProvider
+
+
+# in-memory stand-ins for cognito, dynamodb and wordsapi with injected latency, used by the load test
+class Latency:
+    def __init__(self, seconds: float = 0.0, jitter: float = 0.0):
+        self.seconds = seconds
+        self.jitter = jitter
+
+    def wait(self):
+        delay = self.seconds + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self):
+        delay = self.seconds + random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def client_error(code: str, message: str, operation: str, **extra) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": message}, **extra}, operation)
+
+
+class FakeCognitoClient:
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.__users: dict[str, dict] = {}
+        self.__tokens: dict[str, str] = {}
+        self.__lock = threading.Lock()
+
+    def admin_create_user(self, UserPoolId, Username, UserAttributes, **kwargs):
+        self.latency.wait()
+        with self.__lock:
+            if Username in self.__users:
+                raise client_error("UsernameExistsException", "User account already exists", "AdminCreateUser")
+            self.__users[Username] = {"Attributes": UserAttributes, "Password": None}
+        return {"User": {"Username": Username, "Attributes": UserAttributes}}
+
+    def admin_set_user_password(self, UserPoolId, Username, Password, Permanent):
+        self.latency.wait()
+        with self.__lock:
+            self.__users[Username]["Password"] = Password
+
+    def initiate_auth(self, ClientId, AuthFlow, AuthParameters):
+        self.latency.wait()
+        if AuthFlow == "REFRESH_TOKEN":
+            username = self.__tokens.get(AuthParameters["REFRESH_TOKEN"].removeprefix("refresh-"))
+        else:
+            user = self.__users.get(AuthParameters["USERNAME"])
+            username = AuthParameters["USERNAME"]
+            if user is None or user["Password"] != AuthParameters["PASSWORD"]:
+                username = None
+        if username is None:
+            raise client_error("NotAuthorizedException", "Incorrect username or password.", "InitiateAuth")
+        access_token = f"token-{username}-{random.getrandbits(64):x}"
+        with self.__lock:
+            self.__tokens[access_token] = username
+        return {"AuthenticationResult": {
+            "AccessToken": access_token,
+            "RefreshToken": f"refresh-{access_token}",
+            "ExpiresIn": 3600,
+            "TokenType": "Bearer"
+        }}
+
+    def get_user(self, AccessToken):
+        self.latency.wait()
+        username = self.__tokens.get(AccessToken)
+        if username is None:
+            raise client_error("NotAuthorizedException", "Invalid Access Token", "GetUser")
+        return {"Username": username, "UserAttributes": self.__users[username]["Attributes"]}
+
+    def close(self):
+        pass
+
+
+class FakeDynamoClient:
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.__items: dict[tuple[str, float], dict] = {}
+        self.__lock = threading.Lock()
+
+    def create_table(self, **kwargs):
+        pass
+
+    def get_item(self, TableName, Key, ConsistentRead=False, **kwargs):
+        self.latency.wait()
+        item = self.__items.get(self.__key(Key))
+        return {} if item is None else {"Item": item}
+
+    def put_item(self, TableName, Item, ConditionExpression=None, **kwargs):
+        self.latency.wait()
+        with self.__lock:
+            self.__put(Item, ConditionExpression, "PutItem")
+        return {}
+
+    def query(self, TableName, KeyConditionExpression, ExpressionAttributeValues, Limit=None,
+              ExclusiveStartKey=None, **kwargs):
+        self.latency.wait()
+        values = ExpressionAttributeValues
+        username = values[":username"]["S"]
+        lower_bound = float(values[":game_timestamp"]["N"]) if ":game_timestamp" in values else 0.0
+        with self.__lock:
+            keys = sorted(key for key in self.__items if key[0] == username and key[1] >= lower_bound)
+        if ":zero" in values:
+            keys = [key for key in keys if key[1] > 0]
+        if ExclusiveStartKey is not None:
+            start = self.__key(ExclusiveStartKey)[1]
+            keys = [key for key in keys if key[1] > start]
+        page_keys = keys if Limit is None else keys[:Limit]
+        items = [self.__items[key] for key in page_keys]
+        if ":game_id" in values:
+            items = [item for item in items if item.get("game_id", {}).get("S") == values[":game_id"]["S"]]
+        response = {"Items": items, "Count": len(items)}
+        if Limit is not None and len(keys) > Limit:
+            last = self.__items[page_keys[-1]]
+            response["LastEvaluatedKey"] = {"username": last["username"], "game_timestamp": last["game_timestamp"]}
+        return response
+
+    def transact_write_items(self, TransactItems):
+        self.latency.wait()
+        update = TransactItems[0]["Update"]
+        put = TransactItems[1]["Put"]
+        with self.__lock:
+            old = self.__check_summary_condition(update)
+            if old is not False:
+                raise client_error(
+                    "TransactionCanceledException",
+                    "Transaction cancelled",
+                    "TransactWriteItems",
+                    CancellationReasons=[{"Code": "ConditionalCheckFailed", **({} if old is None else {"Item": old})},
+                                         {"Code": "None"}]
+                )
+            self.__put(put["Item"], put.get("ConditionExpression"), "TransactWriteItems")
+            self.__update_summary(update)
+        return {}
+
+    def update_item(self, **update):
+        # only the game summary update is supported, which is what the batched turn writes use
+        self.latency.wait()
+        with self.__lock:
+            old = self.__check_summary_condition(update)
+            if old is not False:
+                raise client_error("ConditionalCheckFailedException", "The conditional request failed", "UpdateItem",
+                                   **({} if old is None else {"Item": old}))
+            self.__update_summary(update)
+        return {}
+
+    def batch_get_item(self, RequestItems):
+        self.latency.wait()
+        responses = {}
+        for table_name, request in RequestItems.items():
+            keys = [self.__key(key) for key in request["Keys"]]
+            responses[table_name] = [self.__items[key] for key in keys if key in self.__items]
+        return {"Responses": responses, "UnprocessedKeys": {}}
+
+    def batch_write_item(self, RequestItems):
+        self.latency.wait()
+        with self.__lock:
+            for write_requests in RequestItems.values():
+                for write_request in write_requests:
+                    self.__put(write_request["PutRequest"]["Item"], None, "BatchWriteItem")
+        return {"UnprocessedItems": {}}
+
+    def close(self):
+        pass
+
+    def __put(self, item: dict, condition_expression: str | None, operation: str):
+        key = self.__key(item)
+        if condition_expression is not None and "attribute_not_exists" in condition_expression and key in self.__items:
+            raise client_error("ConditionalCheckFailedException", "The conditional request failed", operation)
+        self.__items[key] = item
+
+    def __check_summary_condition(self, update: dict):
+        # returns False when the condition holds, otherwise the old summary or None if there was none
+        values = update["ExpressionAttributeValues"]
+        old = self.__items.get(self.__key(update["Key"]))
+        previous_attempts = 0 if old is None else int(old["attempt_count"]["N"])
+        if ":previous_attempts" in values:
+            expected_attempts = int(values[":previous_attempts"]["N"])
+        elif update["ConditionExpression"] == "attribute_not_exists(username)":
+            expected_attempts = 0
+        else:
+            expected_attempts = previous_attempts
+        if old is not None and (old["won"]["BOOL"] or previous_attempts >= MAX_ATTEMPTS) \
+                or previous_attempts != expected_attempts:
+            return old
+        return False
+
+    def __update_summary(self, update: dict):
+        values = update["ExpressionAttributeValues"]
+        key = self.__key(update["Key"])
+        old = self.__items.get(key)
+        self.__items[key] = {
+            **update["Key"],
+            "attempt_count": {"N": str(1 if old is None else int(old["attempt_count"]["N"]) + 1)},
+            "won": values[":win"],
+            "guesses": {"L": ([] if old is None else old["guesses"]["L"]) + values[":guess"]["L"]},
+            "game_id": values[":game_id"],
+            "game_date": values[":game_date"]
+        }
+
+    @staticmethod
+    def __key(item: dict) -> tuple[str, float]:
+        return item["username"]["S"], float(item["game_timestamp"]["N"])
+
+
+class FakeWordsProvider(WordsProvider):
+    def __init__(self, latency: Latency, word_index):
+        super().__init__("fake-key", word_index, remote_fallback=False)
+        self.latency = latency
+        self.__words = word_index.words()
+
+    async def get_random_word(self) -> str:
+        await self.latency.wait_async()
+        return random.choice(self.__words)
@@ -0,0 +1,205 @@
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import threading
+import time
+from datetime import datetime
+import httpx
+import uvicorn
+from benchmarks.fakes import Latency, FakeCognitoClient, FakeDynamoClient, FakeWordsProvider
+from main import app
+from providers.AuthenticationProvider import AuthenticationProvider
+from providers.BlockingExecutor import BlockingExecutor
+from providers.DynamoProvider import DynamoProvider
+from providers.GameWordProvider import GameWordProvider
+from providers.ProviderContainer import ProviderContainer, create_token_cache, create_hint_provider
+from providers.TurnWriteQueue import TurnWriteQueue, TurnJournal
+from providers.WordIndex import WordIndex
+
+
+# drives the app with a scripted player mix against local fakes and reports latency per endpoint
+# run from the project root: python -m benchmarks.load_test --mode inprocess --users 50 --duration 30
+class LatencyRecorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        # failed responses per endpoint and status class, "4xx" or "5xx"
+        self.failures: dict[str, dict[str, int]] = {}
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started_at = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies.setdefault(endpoint, []).append(time.perf_counter() - started_at)
+        if not 200 <= response.status_code < 300:
+            # a rejected request is cheap, so a run full of 4xx would otherwise look fast and healthy
+            status_class = f"{response.status_code // 100}xx"
+            failures = self.failures.setdefault(endpoint, {})
+            failures[status_class] = failures.get(status_class, 0) + 1
+        return response
+
+    def report(self, duration_seconds: float) -> dict:
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            failures = self.failures.get(endpoint, {})
+            endpoints[endpoint] = {
+                "Count": len(latencies),
+                "ClientErrors": failures.get("4xx", 0),
+                "ServerErrors": failures.get("5xx", 0),
+                "Failures": sum(failures.values()),
+                "ThroughputRps": len(latencies) / duration_seconds,
+                "SuccessRps": (len(latencies) - sum(failures.values())) / duration_seconds,
+                "MeanMs": sum(latencies) / len(latencies) * 1000,
+                "P50Ms": percentile(latencies, 50) * 1000,
+                "P95Ms": percentile(latencies, 95) * 1000,
+                "P99Ms": percentile(latencies, 99) * 1000
+            }
+        request_count = sum(len(latencies) for latencies in self.latencies.values())
+        failure_count = sum(sum(failures.values()) for failures in self.failures.values())
+        return {
+            "DurationSeconds": duration_seconds,
+            "Requests": request_count,
+            "Failures": failure_count,
+            "ThroughputRps": request_count / duration_seconds,
+            "SuccessRps": (request_count - failure_count) / duration_seconds,
+            "Endpoints": endpoints
+        }
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def build_providers(args) -> ProviderContainer:
+    cognito_client = FakeCognitoClient(Latency(args.cognito_latency, args.jitter))
+    dynamo_client = FakeDynamoClient(Latency(args.dynamo_latency, args.jitter))
+    dynamo_provider = DynamoProvider(dynamo_client)
+    words_provider = FakeWordsProvider(Latency(args.words_latency, args.jitter), WordIndex.from_file())
+    executor = BlockingExecutor(args.max_concurrency)
+    providers = ProviderContainer(
+        cognito_client=cognito_client,
+        dynamo_client=dynamo_client,
+        auth_provider=AuthenticationProvider(cognito_client, "fake-pool", "fake-client", None, create_token_cache()),
+        dynamo_provider=dynamo_provider,
+        words_provider=words_provider,
+        executor=executor,
+        game_word_provider=GameWordProvider(dynamo_provider, words_provider, executor),
+        hint_provider=create_hint_provider(),
+        # statistics need the counter updates the fake dynamodb does not implement
+        stats_provider=None,
+        turn_write_queue=TurnWriteQueue(dynamo_provider, executor, TurnJournal(args.journal_dir))
+        if args.turn_write_mode == "batched" else None
+    )
+    # keep the metrics instrumentation on, as it is in production
+    providers.instrument()
+    return providers
+
+
+async def play(client: httpx.AsyncClient, recorder: LatencyRecorder, player: int, words: list[str], deadline: float):
+    username = f"player{player}-{random.getrandbits(32):x}"
+    password = "Benchmark-password-1"
+    await recorder.request(client, "POST /auth/register", "POST", "/auth/register", json={
+        "username": username,
+        "first_name": "Load",
+        "last_name": "Test",
+        "email": f"{username}@example.com",
+        "password": password
+    })
+    login = await recorder.request(client, "POST /auth/login", "POST", "/auth/login", json={
+        "username": username,
+        "password": password
+    })
+    headers = {"authorization": f"Bearer {login.json()['AuthResult']['AccessToken']}"}
+    guesses_left = 6
+    while time.monotonic() < deadline:
+        await recorder.request(client, "GET /word/game-word", "GET", "/word/game-word", headers=headers)
+        if guesses_left > 0:
+            guesses_left -= 1
+            response = await recorder.request(client, "PUT /word/check-word", "PUT", "/word/check-word",
+                                              headers=headers, json={"word": random.choice(words)})
+            if response.status_code == 200 and response.json()["Win"]:
+                guesses_left = 0
+        else:
+            await recorder.request(client, "GET /word/user-game-attempts", "GET", "/word/user-game-attempts",
+                                   headers=headers)
+
+
+async def run_players(client: httpx.AsyncClient, args) -> dict:
+    words = WordIndex.from_file().words()
+    recorder = LatencyRecorder()
+    started_at = time.monotonic()
+    deadline = started_at + args.duration
+    await asyncio.gather(*[play(client, recorder, player, words, deadline) for player in range(args.users)])
+    return recorder.report(time.monotonic() - started_at)
+
+
+async def run_in_process(args) -> dict:
+    app.state.providers = build_providers(args)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            return await run_players(client, args)
+
+
+async def run_over_http(args) -> dict:
+    app.state.providers = build_providers(args)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+    # the server gets its own thread and event loop so the load generator does not compete with it
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    while not server.started:
+        await asyncio.sleep(0.05)
+    try:
+        limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits) as client:
+            return await run_players(client, args)
+    finally:
+        server.should_exit = True
+        server_thread.join()
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API against local Cognito, DynamoDB and WordsAPI fakes")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--users", type=int, default=20, help="concurrent simulated players")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run for")
+    parser.add_argument("--cognito-latency", type=float, default=0.03, help="seconds added to every Cognito call")
+    parser.add_argument("--dynamo-latency", type=float, default=0.01, help="seconds added to every DynamoDB call")
+    parser.add_argument("--words-latency", type=float, default=0.1, help="seconds added to every WordsAPI call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency of up to this many seconds")
+    parser.add_argument("--max-concurrency", type=int, default=32, help="size of the blocking call executor")
+    parser.add_argument("--turn-write-mode", choices=["sync", "batched"], default="sync")
+    parser.add_argument("--journal-dir", default="journal", help="turn journal directory in batched mode")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    run = run_in_process if args.mode == "inprocess" else run_over_http
+    report = asyncio.run(run(args))
+    report = {
+        "Commit": current_commit(),
+        "RecordedAt": datetime.now().isoformat(),
+        "Config": vars(args),
+        **report
+    }
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"{'endpoint':32} {'count':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'4xx':>5} {'5xx':>5}")
+    for endpoint, stats in report["Endpoints"].items():
+        print(f"{endpoint:32} {stats['Count']:>7} {stats['ThroughputRps']:>8.1f} {stats['P50Ms']:>8.1f} "
+              f"{stats['P95Ms']:>8.1f} {stats['P99Ms']:>8.1f} {stats['ClientErrors']:>5} {stats['ServerErrors']:>5}")
+    print(f"total: {report['Requests']} requests, {report['ThroughputRps']:.1f} req/s, "
+          f"{report['Failures']} failed ({report['SuccessRps']:.1f} successful req/s), results in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import random
+import time
+from providers.ScoringEngine import score_word, score_batch, encode_words
+from providers.WordIndex import WordIndex, DEFAULT_WORD_LIST_PATH
+
+
+# run from the project root: python -m benchmarks.scoring_benchmark
+def legacy_score_word(guess: str, answer: str) -> tuple[list[int], list[int]]:
+    # the scoring loop WordsProvider.compare_word_attempt used before the scoring engine
+    correct_letters = []
+    misplaced_letters = []
+    for i, letter in enumerate(guess):
+        if letter == answer[i]:
+            correct_letters.append(i)
+    for i, letter in enumerate(guess):
+        if letter in answer and i not in correct_letters:
+            misplaced_letters.append(i)
+    return correct_letters, misplaced_letters
+
+
+def pairs_per_second(score, pairs: list[tuple[str, str]]) -> float:
+    started_at = time.perf_counter()
+    for guess, answer in pairs:
+        score(guess, answer)
+    return len(pairs) / (time.perf_counter() - started_at)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the legacy and vectorized guess scoring")
+    parser.add_argument("--pairs", type=int, default=200000)
+    args = parser.parse_args()
+
+    words = WordIndex.from_file(DEFAULT_WORD_LIST_PATH).words()
+    pairs = [(random.choice(words), random.choice(words)) for _ in range(args.pairs)]
+    guesses = encode_words([guess for guess, _ in pairs])
+    answers = encode_words([answer for _, answer in pairs])
+
+    started_at = time.perf_counter()
+    score_batch(guesses, answers)
+    batch_seconds = time.perf_counter() - started_at
+
+    print(f"pairs:                   {args.pairs}")
+    print(f"legacy loop:             {pairs_per_second(legacy_score_word, pairs):,.0f} pairs/s")
+    print(f"single pair fast path:   {pairs_per_second(score_word, pairs):,.0f} pairs/s")
+    print(f"numpy batch:             {args.pairs / batch_seconds:,.0f} pairs/s")
+
+
+if __name__ == "__main__":
+    main()
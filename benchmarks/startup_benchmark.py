@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+import httpx
+from benchmarks.load_test import current_commit
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+# measures how long a fresh server takes to answer /ping and where the import time goes.
+# exits with status 1 when time to first ping goes over the budget, so it can gate a build:
+# python -m benchmarks.startup_benchmark --runs 5 --budget-seconds 2
+def import_breakdown(top: int) -> tuple[float, list[tuple[str, float]]]:
+    # the modules main imports directly, with everything they import in turn
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    total_seconds = 0.0
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match is None:
+            continue
+        cumulative_seconds = int(match.group(2)) / 1e6
+        depth = len(match.group(3)) // 2
+        if match.group(4) == "main":
+            total_seconds = cumulative_seconds
+        elif depth == 1:
+            modules.append((match.group(4), cumulative_seconds))
+    return total_seconds, sorted(modules, key=lambda module: module[1], reverse=True)[:top]
+
+
+def time_to_first_ping(port: int, timeout_seconds: float) -> tuple[float, str | None]:
+    env = {
+        "AWS_ACCESS_KEY_ID": "startup-benchmark",
+        "AWS_SECRET_ACCESS_KEY": "startup-benchmark",
+        **os.environ
+    }
+    started_at = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    try:
+        while time.perf_counter() - started_at < timeout_seconds:
+            if server.poll() is not None:
+                raise RuntimeError(f"The server exited with status {server.returncode}: {server.stderr.read()}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/ping", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - started_at, startup_report_line(server)
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"The server did not answer /ping within {timeout_seconds}s")
+    finally:
+        server.terminate()
+        try:
+            server.wait(10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def startup_report_line(server: subprocess.Popen) -> str | None:
+    # the report is logged before uvicorn says startup is complete, so it has been written by the time /ping answers
+    for line in server.stderr:
+        if "Startup took" in line:
+            return line.strip()
+        if "Application startup complete" in line:
+            return None
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first /ping of a fresh server process")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-seconds", type=float, default=2.0, help="fail when the median time to first ping is over this")
+    parser.add_argument("--timeout-seconds", type=float, default=30.0)
+    parser.add_argument("--top", type=int, default=10, help="number of imports to list")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", default="bench_results_startup.json")
+    args = parser.parse_args()
+
+    import_seconds, slowest_imports = import_breakdown(args.top)
+    ping_seconds = []
+    startup_report = None
+    for _ in range(args.runs):
+        seconds, startup_report = time_to_first_ping(args.port, args.timeout_seconds)
+        ping_seconds.append(seconds)
+    median_seconds = statistics.median(ping_seconds)
+    report = {
+        "Commit": current_commit(),
+        "RecordedAt": datetime.now().isoformat(),
+        "Config": vars(args),
+        "ImportSeconds": import_seconds,
+        "SlowestImports": dict(slowest_imports),
+        "TimeToFirstPingSeconds": ping_seconds,
+        "MedianTimeToFirstPingSeconds": median_seconds,
+        "StartupReport": startup_report
+    }
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+
+    print(f"import main: {import_seconds * 1000:.0f} ms")
+    for module, seconds in slowest_imports:
+        print(f"  {module:40} {seconds * 1000:>8.1f} ms")
+    if startup_report is not None:
+        print(startup_report)
+    print(f"time to first /ping: median {median_seconds * 1000:.0f} ms over {args.runs} runs "
+          f"(min {min(ping_seconds) * 1000:.0f} ms, max {max(ping_seconds) * 1000:.0f} ms), results in {args.output}")
+    if median_seconds > args.budget_seconds:
+        print(f"over the budget of {args.budget_seconds * 1000:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
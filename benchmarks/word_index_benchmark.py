@@ -0,0 +1,44 @@
+import argparse
+import random
+import sys
+import time
+from providers.WordIndex import WordIndex, DEFAULT_WORD_LIST_PATH
+
+
+# run from the project root: python -m benchmarks.word_index_benchmark
+def set_size_bytes(words: set[str]) -> int:
+    return sys.getsizeof(words) + sum(sys.getsizeof(word) for word in words)
+
+
+def time_lookups(lookup, guesses: list[str]) -> float:
+    started_at = time.perf_counter()
+    for guess in guesses:
+        lookup(guess)
+    return (time.perf_counter() - started_at) / len(guesses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory use and lookup latency of the word index")
+    parser.add_argument("--word-list", default=DEFAULT_WORD_LIST_PATH)
+    parser.add_argument("--lookups", type=int, default=200000)
+    args = parser.parse_args()
+
+    started_at = time.perf_counter()
+    word_index = WordIndex.from_file(args.word_list)
+    load_seconds = time.perf_counter() - started_at
+    words = word_index.words()
+    word_set = set(words)
+    # half hits, half misses, the way real guesses look
+    guesses = [random.choice(words) if i % 2 == 0 else "".join(random.choices("abcdefghijklmnopqrstuvwxyz", k=5))
+               for i in range(args.lookups)]
+
+    print(f"words:               {len(word_index)}")
+    print(f"load time:           {load_seconds * 1000:.2f} ms")
+    print(f"index size:          {word_index.size_bytes()} bytes")
+    print(f"set[str] size:       {set_size_bytes(word_set)} bytes")
+    print(f"index lookup:        {time_lookups(word_index.__contains__, guesses) * 1e9:.0f} ns")
+    print(f"set[str] lookup:     {time_lookups(word_set.__contains__, guesses) * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import argparse
+import logging
+import os
+import time
+from providers.FeedbackMatrix import FeedbackMatrix, DEFAULT_FEEDBACK_MATRIX_PATH
+from providers.WordIndex import WordIndex, DEFAULT_WORD_LIST_PATH
+
+
+# precomputes the feedback matrix that backs /word/hint
+# usage: python build_feedback_matrix.py --word-list data/words.txt --output data/feedback_matrix.bin
+def main():
+    parser = argparse.ArgumentParser(description="Build the words x words feedback pattern matrix")
+    parser.add_argument("--word-list", default=os.getenv("WORD_LIST_PATH", DEFAULT_WORD_LIST_PATH))
+    parser.add_argument("--output", default=os.getenv("FEEDBACK_MATRIX_PATH", DEFAULT_FEEDBACK_MATRIX_PATH))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    words = WordIndex.from_file(args.word_list).words()
+    started_at = time.perf_counter()
+    FeedbackMatrix.build(words, args.output)
+    logging.info(f"Wrote {len(words)}x{len(words)} feedback matrix to {args.output} "
+                 f"in {time.perf_counter() - started_at:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import gc
+import os
+import shutil
+import tempfile
+
+# production server settings, used by start_server in main.py and the Dockerfile:
+# gunicorn -c gunicorn.conf.py main:app
+
+# metrics from every worker are written to this directory and added up by /metrics.
+# it has to be set before prometheus_client is imported, and is emptied so a restart does not count old workers
+metrics_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "pywordle-metrics"))
+shutil.rmtree(metrics_dir, ignore_errors=True)
+os.makedirs(metrics_dir)
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1)))
+worker_class = "server_worker.AppWorker"
+# the app and its read-only data are loaded once in the master, workers get them copy-on-write when forked
+preload_app = os.getenv("SERVER_PRELOAD", "true") == "true"
+# workers are replaced after this many requests, the jitter keeps them from restarting together
+max_requests = int(os.getenv("SERVER_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", str(max_requests // 10)))
+# on SIGTERM workers stop accepting connections and get this long to finish what they are serving
+graceful_timeout = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("SERVER_WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "5"))
+accesslog = "-" if os.getenv("SERVER_ACCESS_LOG", "false") == "true" else None
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from providers.ProviderContainer import preload_shared_data
+    preload_shared_data()
+    # objects loaded so far are never collected, so collections in the workers do not write to (and copy) their pages
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
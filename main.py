@@ -1,16 +1,50 @@
+import time
+from providers.StartupTimer import StartupTimer
+
+# started before the other imports so the startup report includes them
+startup_timer = StartupTimer()
+
+import asyncio
 import os
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST
 from routers.WordsRouter import words_router
 from routers.AuthRouter import auth_router
 from fastapi.middleware.cors import CORSMiddleware
-from boto3 import client
-from providers.AuthenticationProvider import AuthenticationProvider
-from providers.WordsProvider import WordsProvider
-from providers.DynamoProvider import DynamoProvider
+from providers.ProviderContainer import ProviderContainer
+from providers.Metrics import HTTP_REQUEST_SECONDS, render_metrics
+from providers.RequestProfiler import RequestProfiler
+from middleware.AdmissionMiddleware import admission_middleware
 import logging
 import uvicorn
 
 app = FastAPI()
+profiler = RequestProfiler.from_env()
+# registered before http_middleware so it runs inside it and shed requests are still timed
+app.middleware("http")(admission_middleware)
+
+
+@app.middleware("http")
+async def http_middleware(req: Request, call_next):
+    started_at = time.perf_counter()
+    if profiler.enabled and profiler.should_profile(req.headers):
+        response = await profiler.profile(req, call_next)
+    else:
+        response = await call_next(req)
+    if "Content-Type" not in response.headers and response.status_code != 304:
+        response.headers["Content-Type"] = "application/json"
+    # label by route template rather than raw path so dates and usernames do not explode the label set
+    route = req.scope.get("route")
+    HTTP_REQUEST_SECONDS.labels(
+        req.method,
+        route.path if route is not None else "unmatched",
+        str(response.status_code)
+    ).observe(time.perf_counter() - started_at)
+    return response
+
+
+# added last so it is the outermost middleware: preflights are answered before admission control,
+# and 429 and 503 responses from admission control still carry the cors headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=['*'],
@@ -20,46 +54,6 @@ app.add_middleware(
 )
 
 
-@app.middleware("http")
-async def http_middleware(req: Request, call_next):
-    cognito_client = client(
-        "cognito-idp",
-        region_name="us-west-1",
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-    )
-    if os.getenv("PROJECT_ENV") == "development":
-        dynamo_client = client(
-            "dynamodb",
-            region_name="anywhere",
-            endpoint_url="http://my-dynamodb:8000",
-            aws_access_key_id="LOCAL_ACCESS_ID",
-            aws_secret_access_key="LOCAL_ACCESS_SECRET_KEY"
-        )
-        req.state.dynamo_provider: DynamoProvider = DynamoProvider(dynamo_client)
-    else:
-        dynamo_client = client(
-            "dynamodb",
-            region_name="us-west-1",
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-        )
-        req.state.dynamo_provider: DynamoProvider = DynamoProvider(dynamo_client)
-    words_api_key = os.getenv("WORDS_API_KEY")
-    user_pool_id = os.getenv("USER_POOL_ID")
-    app_client_id = os.getenv("APP_CLIENT_ID")
-    req.state.auth_provider: AuthenticationProvider = AuthenticationProvider(
-        cognito_client,
-        user_pool_id,
-        app_client_id
-    )
-    req.state.words_provider: WordsProvider = WordsProvider(words_api_key)
-    response = await call_next(req)
-    response.headers["Content-Type"] = "application/json"
-    req.state.dynamo_provider.close_connection()
-    return response
-
-
 # include routers
 app.include_router(words_router)
 app.include_router(auth_router)
@@ -72,7 +66,15 @@ async def health_check():
     }
 
 
-def create_games_table(dynamo_client: client):
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+startup_timer.mark("imports")
+
+
+def create_games_table(dynamo_client):
     # create the table to run this project locally
     logging.info("Project is in development environment. Creating the dynamodb table...")
     try:
@@ -113,22 +115,41 @@ def create_games_table(dynamo_client: client):
 
 @app.on_event("startup")
 async def startup_event():
+    # providers may already be set up by whoever embeds the app, e.g. the load test with its local fakes
+    startup_timer.begin()
+    if not hasattr(app.state, "providers"):
+        app.state.providers = ProviderContainer.from_env()
+    startup_timer.mark("providers")
+    app.state.providers.start()
+    startup_timer.mark("start")
     if os.getenv("PROJECT_ENV") == "development":
-        # create the table to run this project locally
-        dynamo_client = client(
-            "dynamodb",
-            endpoint_url="http://my-dynamodb:8000",
-            region_name="anywhere",
-            aws_access_key_id="LOCAL_ACCESS_ID",
-            aws_secret_access_key="LOCAL_ACCESS_SECRET_KEY"
-        )
-        create_games_table(dynamo_client)
+        # create the table to run this project locally, without holding up startup until dynamodb local answers
+        asyncio.create_task(create_games_table_in_background(app.state.providers))
+    app.state.startup_report = startup_timer.report()
+    startup_timer.log()
+
+
+async def create_games_table_in_background(providers: ProviderContainer):
+    try:
+        await providers.executor.run(create_games_table, providers.dynamo_client)
+    except Exception as e:
+        logging.error(f"Could not create the dynamodb table: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await app.state.providers.close()
 
 
 def start_server():
     print("running start_server")
+    default_mode = "development" if os.getenv("PROJECT_ENV") == "development" else "production"
+    if os.getenv("SERVER_MODE", default_mode) == "production":
+        # gunicorn forks the uvicorn workers, see gunicorn.conf.py. exec keeps it as the process that gets SIGTERM
+        os.execvp("gunicorn", ["gunicorn", "--config", "gunicorn.conf.py", "main:app"])
     env_port = 8080 if os.getenv("PORT") is None else int(os.getenv("PORT"))
-    uvicorn.run(app, host="0.0.0.0", port=env_port, reload=True)
+    # reload needs the app as an import string, it is imported again in the reloaded process
+    uvicorn.run("main:app", host="0.0.0.0", port=env_port, reload=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+from fastapi import Request, HTTPException, status, Depends
+from fastapi.responses import JSONResponse
+from providers.AdmissionControl import AdmissionController, retry_after_header, COGNITO, DYNAMO, WORDSAPI
+from providers.AuthenticationProvider import AuthenticationProvider
+from middleware.ProviderMiddleware import get_auth_provider
+
+# never limited, so health checks and scrapes keep working while the api sheds load
+EXEMPT_PATHS = {"/ping", "/metrics"}
+# the downstreams a request can call, first matching prefix wins.
+# authenticated routes only reach cognito on a token cache miss, so they are not counted against it
+ROUTE_DOWNSTREAMS = [
+    ("/auth/", (COGNITO,)),
+    ("/word/check-word", (DYNAMO, WORDSAPI)),
+    ("/word/game-word", (DYNAMO, WORDSAPI)),
+    ("/word/", (DYNAMO,)),
+]
+
+
+def get_admission_controller(req: Request) -> AdmissionController | None:
+    providers = getattr(req.app.state, "providers", None)
+    return getattr(providers, "admission_controller", None)
+
+
+def client_ip(req: Request) -> str:
+    return req.client.host if req.client is not None else "unknown"
+
+
+def route_downstreams(path: str) -> tuple[str, ...]:
+    for prefix, downstreams in ROUTE_DOWNSTREAMS:
+        if path.startswith(prefix):
+            return downstreams
+    return ()
+
+
+def too_many_requests(retry_after: float, message: str) -> JSONResponse:
+    # same body as an HTTPException raised by a route
+    return JSONResponse(
+        {"detail": {"Message": message}},
+        status.HTTP_429_TOO_MANY_REQUESTS,
+        headers=retry_after_header(retry_after)
+    )
+
+
+async def admission_middleware(req: Request, call_next):
+    admission_controller = get_admission_controller(req)
+    path = req.url.path
+    # preflights are answered by the cors middleware, this only covers requests it passes through
+    if admission_controller is None or path in EXEMPT_PATHS or req.method == "OPTIONS":
+        return await call_next(req)
+    retry_after = await admission_controller.check_rate("ip", client_ip(req))
+    if retry_after == 0 and path.startswith("/auth/") and req.method == "POST":
+        retry_after = await admission_controller.check_rate("auth", client_ip(req))
+    if retry_after > 0:
+        return too_many_requests(retry_after, "Too many requests, please slow down.")
+    downstreams = route_downstreams(path)
+    if not admission_controller.try_acquire(downstreams):
+        return too_many_requests(1.0, "The server is busy, please try again shortly.")
+    try:
+        return await call_next(req)
+    finally:
+        admission_controller.release(downstreams)
+
+
+async def limit_username(req: Request, limit_name: str, username: str):
+    await check_rate(req, limit_name, username.lower(), "Too many requests for this user, please slow down.")
+
+
+async def limit_unverified_token(
+        req: Request,
+        auth_provider: AuthenticationProvider = Depends(get_auth_provider)
+):
+    # runs before validate_token. a token that is not cached yet is checked with cognito or against the jwks,
+    # so it takes from the client ip's stricter auth bucket first and made up tokens cannot flood the verifier.
+    # without a token cache every request would count as unverified, so only the ip bucket applies
+    parts = req.headers.get("authorization", "").split(" ")
+    if len(parts) < 2 or auth_provider.token_cache is None or auth_provider.is_token_cached(parts[1]):
+        return
+    await check_rate(req, "auth", client_ip(req), "Too many requests, please slow down.")
+
+
+async def limit_user(req: Request):
+    # runs after validate_token, which sets the username
+    await limit_username(req, "user", req.state.username)
+
+
+async def check_rate(req: Request, limit_name: str, key: str, message: str):
+    admission_controller = get_admission_controller(req)
+    if admission_controller is None:
+        return
+    retry_after = await admission_controller.check_rate(limit_name, key)
+    if retry_after > 0:
+        raise HTTPException(status.HTTP_429_TOO_MANY_REQUESTS, {
+            "Message": message
+        }, headers=retry_after_header(retry_after))
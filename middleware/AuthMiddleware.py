@@ -1,7 +1,16 @@
-from fastapi import Request, HTTPException, status
+from fastapi import Request, HTTPException, status, Depends
+from providers.AuthenticationProvider import AuthenticationProvider
+from providers.BlockingExecutor import BlockingExecutor
+from middleware.ProviderMiddleware import get_auth_provider, get_executor
+from middleware.AdmissionMiddleware import limit_unverified_token
 
 
-async def validate_token(req: Request):
+async def validate_token(
+        req: Request,
+        auth_provider: AuthenticationProvider = Depends(get_auth_provider),
+        executor: BlockingExecutor = Depends(get_executor),
+        _: None = Depends(limit_unverified_token)
+):
     try:
         authentication = req.headers["authorization"]
         if not str.startswith(authentication, "Bearer"):
@@ -9,8 +18,7 @@ async def validate_token(req: Request):
                 "message": "Authentication token not found!"
             })
         token = authentication.split(" ")[1]
-        auth_provider = req.state.auth_provider
-        cognito_user = auth_provider.verify_token(token)
+        cognito_user = await executor.run(auth_provider.verify_token, token)
         username = cognito_user["Username"]
         req.state.username = username
         return username
@@ -19,4 +27,3 @@ async def validate_token(req: Request):
             "message": "Unauthorized! Failed to validate token.",
             "errorMessage": str(e)
         })
-
@@ -0,0 +1,54 @@
+import hashlib
+from datetime import datetime, timedelta
+import orjson
+from fastapi import Request, Response, status
+
+IMMUTABLE = "private, max-age=31536000, immutable"
+REVALIDATE = "private, no-cache"
+
+
+def seconds_until_midnight(now: datetime | None = None) -> int:
+    now = now or datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(0, int((midnight - now).total_seconds()))
+
+
+def until_midnight() -> str:
+    return f"private, max-age={seconds_until_midnight()}"
+
+
+def cached_json_response(req: Request, content, cache_control: str, etag: str | None = None) -> Response:
+    # without a validator the etag is a hash of the encoded body: a client holding the same body gets an empty 304,
+    # which saves bandwidth but not the reads and encoding that produced the body
+    body = orjson.dumps(content)
+    if etag is None:
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    if etag_matches(req.headers.get("if-none-match"), etag):
+        return not_modified_response(etag, cache_control)
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag, cache_control))
+
+
+def validator_etag(*parts) -> str:
+    # an etag built from whatever identifies a version of the content, so it can be checked before loading it
+    digest = hashlib.sha256(orjson.dumps([str(part) for part in parts])).hexdigest()[:32]
+    return f'"v-{digest}"'
+
+
+def not_modified_response(etag: str, cache_control: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, cache_control))
+
+
+def cache_headers(etag: str, cache_control: str) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Authorization"
+    }
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
@@ -0,0 +1,51 @@
+from fastapi import Request, HTTPException, status
+from providers.AuthenticationProvider import AuthenticationProvider
+from providers.BlockingExecutor import BlockingExecutor
+from providers.DynamoProvider import DynamoProvider
+from providers.GameWordProvider import GameWordProvider
+from providers.HintProvider import HintProvider
+from providers.StatsProvider import StatsProvider
+from providers.ProviderContainer import ProviderContainer
+from providers.WordsProvider import WordsProvider
+
+
+def get_providers(req: Request) -> ProviderContainer:
+    return req.app.state.providers
+
+
+def get_auth_provider(req: Request) -> AuthenticationProvider:
+    return get_providers(req).auth_provider
+
+
+def get_dynamo_provider(req: Request) -> DynamoProvider:
+    return get_providers(req).dynamo_provider
+
+
+def get_words_provider(req: Request) -> WordsProvider:
+    return get_providers(req).words_provider
+
+
+def get_executor(req: Request) -> BlockingExecutor:
+    return get_providers(req).executor
+
+
+def get_game_word_provider(req: Request) -> GameWordProvider:
+    return get_providers(req).game_word_provider
+
+
+def get_hint_provider(req: Request) -> HintProvider:
+    hint_provider = get_providers(req).hint_provider
+    if hint_provider is None:
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, {
+            "Message": "Hints are not available on this server."
+        })
+    return hint_provider
+
+
+def get_stats_provider(req: Request) -> StatsProvider:
+    stats_provider = get_providers(req).stats_provider
+    if stats_provider is None:
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, {
+            "Message": "Statistics are not available on this server."
+        })
+    return stats_provider
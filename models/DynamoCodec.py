@@ -0,0 +1,118 @@
+from datetime import date, datetime
+from models.GameStats import GameStats, UserStats, Leaderboard, LeaderboardEntry, won_in_attribute, \
+    GAME_STATS_USERNAME, LEADERBOARD_USERNAME
+from models.GameSummary import GameSummary, MAX_ATTEMPTS
+from models.GameTurn import GameTurn
+from models.GameWord import GameWord
+from models.RateLimitWindow import RateLimitWindow, RATE_LIMIT_USERNAME_PREFIX
+
+
+# converts between the game models and dynamo attribute values without the generic boto3 type (de)serializer.
+# encoding lives on the models as to_dynamo_json, decoding reads the attribute value types we know we wrote.
+def decode_game_turn(item: dict) -> GameTurn:
+    return GameTurn(
+        username=item["username"]["S"],
+        game_date=date.fromisoformat(item["game_date"]["S"]),
+        game_timestamp=datetime.fromtimestamp(float(item["game_timestamp"]["N"])),
+        word=item["word"]["S"],
+        win=item["win"]["BOOL"],
+        game_id=item["game_id"]["S"]
+    )
+
+
+def decode_game_word(item: dict) -> GameWord:
+    return GameWord(
+        username=item["username"]["S"],
+        word=item["word"]["S"],
+        game_timestamp=datetime.fromtimestamp(float(item["game_timestamp"]["N"])),
+        game_date=date.fromisoformat(item["game_date"]["S"]),
+        game_id=item["game_id"]["S"]
+    )
+
+
+def decode_game_summary(item: dict) -> GameSummary:
+    return GameSummary(
+        username=item["username"]["S"],
+        game_id=item["game_id"]["S"],
+        game_date=date.fromisoformat(item["game_date"]["S"]),
+        attempt_count=int(item["attempt_count"]["N"]),
+        won=item["won"]["BOOL"],
+        guesses=[guess["S"] for guess in item["guesses"]["L"]]
+    )
+
+
+def decode_guess_distribution(item: dict) -> list[int]:
+    return [int(item.get(won_in_attribute(attempts), {"N": "0"})["N"]) for attempts in range(1, MAX_ATTEMPTS + 1)]
+
+
+def decode_game_stats(game_date: date, item: dict) -> GameStats:
+    # counters are created by the first ADD that touches them, so any of them may be missing
+    return GameStats(
+        game_date=game_date,
+        players=int(item.get("players", {"N": "0"})["N"]),
+        wins=int(item.get("wins", {"N": "0"})["N"]),
+        losses=int(item.get("losses", {"N": "0"})["N"]),
+        guess_distribution=decode_guess_distribution(item)
+    )
+
+
+def decode_user_stats(username: str, item: dict) -> UserStats:
+    return UserStats(
+        username=username,
+        played=int(item.get("played", {"N": "0"})["N"]),
+        wins=int(item.get("wins", {"N": "0"})["N"]),
+        current_streak=int(item.get("current_streak", {"N": "0"})["N"]),
+        max_streak=int(item.get("max_streak", {"N": "0"})["N"]),
+        last_won_date=date.fromisoformat(item["last_won_date"]["S"]) if "last_won_date" in item else None,
+        guess_distribution=decode_guess_distribution(item)
+    )
+
+
+def decode_leaderboard_entry(value: dict) -> LeaderboardEntry:
+    entry = value["M"]
+    return LeaderboardEntry(
+        username=entry["username"]["S"],
+        attempts=int(entry["attempts"]["N"]),
+        finished_at=datetime.fromtimestamp(float(entry["finished_at"]["N"]))
+    )
+
+
+def decode_leaderboard(game_date: date, item: dict) -> Leaderboard:
+    return Leaderboard(
+        game_date=game_date,
+        entries=[decode_leaderboard_entry(entry) for entry in item["entries"]["L"]],
+        version=int(item["version"]["N"])
+    )
+
+
+def decode_rate_limit_window(item: dict) -> RateLimitWindow:
+    return RateLimitWindow(
+        key=item["username"]["S"].removeprefix(RATE_LIMIT_USERNAME_PREFIX),
+        window_start=datetime.fromtimestamp(float(item["game_timestamp"]["N"])),
+        request_count=int(item.get("request_count", {"N": "0"})["N"]),
+        expires_at=int(item.get("expires_at", {"N": "0"})["N"])
+    )
+
+
+def decode_item(
+        item: dict
+) -> GameTurn | GameWord | GameSummary | GameStats | UserStats | Leaderboard | RateLimitWindow:
+    username = item["username"]["S"]
+    if username == "sys":
+        return decode_game_word(item)
+    if username.startswith(RATE_LIMIT_USERNAME_PREFIX):
+        return decode_rate_limit_window(item)
+    if username in (GAME_STATS_USERNAME, LEADERBOARD_USERNAME):
+        game_date = datetime.fromtimestamp(float(item["game_timestamp"]["N"])).date()
+        if username == GAME_STATS_USERNAME:
+            return decode_game_stats(game_date, item)
+        return decode_leaderboard(game_date, item)
+    if item["game_timestamp"]["N"].startswith("-"):
+        return decode_game_summary(item)
+    if float(item["game_timestamp"]["N"]) == 0:
+        return decode_user_stats(username, item)
+    return decode_game_turn(item)
+
+
+def decode_page(items: list[dict], decode=decode_item) -> list:
+    return [decode(item) for item in items]
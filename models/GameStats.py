@@ -0,0 +1,131 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from models.GameSummary import MAX_ATTEMPTS
+
+# aggregate items live in their own partitions, user stats sit at sort key 0 between summaries and turns
+GAME_STATS_USERNAME = "stats"
+LEADERBOARD_USERNAME = "leaderboard"
+USER_STATS_TIMESTAMP = 0.0
+
+
+def day_timestamp(game_date: date) -> float:
+    return datetime.fromisoformat(game_date.isoformat()).timestamp()
+
+
+def won_in_attribute(attempts: int) -> str:
+    return f"won_in_{attempts}"
+
+
+@dataclass(slots=True)
+class GameStats:
+    game_date: date
+    players: int = 0
+    wins: int = 0
+    losses: int = 0
+    guess_distribution: list[int] = field(default_factory=lambda: [0] * MAX_ATTEMPTS)
+
+    def to_json_response(self):
+        finished = self.wins + self.losses
+        return {
+            "GameDate": self.game_date.isoformat(),
+            "Players": self.players,
+            "Wins": self.wins,
+            "Losses": self.losses,
+            "WinRate": self.wins / finished if finished > 0 else 0.0,
+            "GuessDistribution": self.guess_distribution
+        }
+
+
+@dataclass(slots=True)
+class UserStats:
+    username: str
+    played: int = 0
+    wins: int = 0
+    current_streak: int = 0
+    max_streak: int = 0
+    last_won_date: date | None = None
+    guess_distribution: list[int] = field(default_factory=lambda: [0] * MAX_ATTEMPTS)
+
+    def to_json_response(self, today: date | None = None):
+        today = today or date.today()
+        # the stored streak only counts while the player has not missed a day since their last win
+        streak_alive = self.last_won_date is not None and self.last_won_date >= today - timedelta(days=1)
+        return {
+            "Played": self.played,
+            "Wins": self.wins,
+            "WinRate": self.wins / self.played if self.played > 0 else 0.0,
+            "CurrentStreak": self.current_streak if streak_alive else 0,
+            "MaxStreak": self.max_streak,
+            "GuessDistribution": self.guess_distribution
+        }
+
+
+@dataclass(slots=True)
+class LeaderboardEntry:
+    username: str
+    attempts: int
+    finished_at: datetime
+
+    def sort_key(self):
+        return self.attempts, self.finished_at
+
+    def to_dynamo_json(self):
+        return {
+            "M": {
+                "username": {
+                    "S": self.username
+                },
+                "attempts": {
+                    "N": str(self.attempts)
+                },
+                "finished_at": {
+                    "N": str(self.finished_at.timestamp())
+                }
+            }
+        }
+
+    def to_json_response(self):
+        return {
+            "Username": self.username,
+            "Attempts": self.attempts,
+            "FinishedAt": self.finished_at.isoformat()
+        }
+
+
+@dataclass(slots=True)
+class Leaderboard:
+    game_date: date
+    entries: list[LeaderboardEntry] = field(default_factory=list)
+    version: int = 0
+
+    def merge(self, entries: list[LeaderboardEntry], size: int) -> "Leaderboard":
+        # a player finishes a game once, so an entry already on the board is never replaced
+        by_username = {entry.username: entry for entry in entries}
+        by_username.update({entry.username: entry for entry in self.entries})
+        merged = sorted(by_username.values(), key=LeaderboardEntry.sort_key)[:size]
+        return Leaderboard(self.game_date, merged, self.version + 1)
+
+    def to_dynamo_json(self):
+        return {
+            "username": {
+                "S": LEADERBOARD_USERNAME
+            },
+            "game_timestamp": {
+                "N": str(day_timestamp(self.game_date))
+            },
+            "game_date": {
+                "S": self.game_date.isoformat()
+            },
+            "entries": {
+                "L": [entry.to_dynamo_json() for entry in self.entries]
+            },
+            "version": {
+                "N": str(self.version)
+            }
+        }
+
+    def to_json_response(self):
+        return {
+            "GameDate": self.game_date.isoformat(),
+            "Leaderboard": [entry.to_json_response() for entry in self.entries]
+        }
@@ -0,0 +1,53 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+MAX_ATTEMPTS = 6
+
+
+def summary_timestamp(game_date: date) -> float:
+    # summaries share the user's partition but sit at negative sort keys, away from the game turns
+    return -datetime.fromisoformat(game_date.isoformat()).timestamp()
+
+
+@dataclass(slots=True)
+class GameSummary:
+    username: str
+    game_id: str
+    game_date: date
+    attempt_count: int = 0
+    won: bool = False
+    guesses: list[str] = field(default_factory=list)
+
+    def to_dynamo_json(self):
+        return {
+            "username": {
+                "S": self.username
+            },
+            "game_timestamp": {
+                "N": str(summary_timestamp(self.game_date))
+            },
+            "game_id": {
+                "S": self.game_id
+            },
+            "game_date": {
+                "S": self.game_date.isoformat()
+            },
+            "attempt_count": {
+                "N": str(self.attempt_count)
+            },
+            "won": {
+                "BOOL": self.won
+            },
+            "guesses": {
+                "L": [{"S": guess} for guess in self.guesses]
+            }
+        }
+
+    def to_json_response(self):
+        return {
+            "GameId": self.game_id,
+            "GameDate": self.game_date.isoformat(),
+            "AttemptCount": self.attempt_count,
+            "Won": self.won,
+            "Guesses": self.guesses
+        }
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from datetime import datetime, date
 
 
-@dataclass
+@dataclass(slots=True)
 class GameTurn:
     username: str
     game_date: date
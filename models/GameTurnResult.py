@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class GameTurnResult:
     word_attempt: str
     correct_letters: list[int]
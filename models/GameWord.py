@@ -1,15 +1,15 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, date
 from uuid import uuid4
 
 
-@dataclass
+@dataclass(slots=True)
 class GameWord:
     username: str  # wordgame will have 'sys' username
     word: str
     game_timestamp: datetime
     game_date: date
-    game_id: str = str(uuid4())
+    game_id: str = field(default_factory=lambda: str(uuid4()))
 
     def to_dynamo_json(self):
         return {
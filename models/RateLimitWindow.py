@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+# rate limit windows live in the game table under their own partitions, see dynamo_access_patterns.md
+RATE_LIMIT_USERNAME_PREFIX = "ratelimit#"
+
+
+@dataclass(slots=True)
+class RateLimitWindow:
+    key: str
+    window_start: datetime
+    request_count: int
+    expires_at: int
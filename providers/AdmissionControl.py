@@ -0,0 +1,126 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from models.RateLimitWindow import RATE_LIMIT_USERNAME_PREFIX
+from providers.BlockingExecutor import BlockingExecutor
+from providers.DynamoProvider import DynamoProvider
+
+COGNITO = "cognito"
+DYNAMO = "dynamo"
+WORDSAPI = "wordsapi"
+
+
+@dataclass(slots=True)
+class RateLimit:
+    per_second: float
+    burst: int
+
+
+# token buckets held in this process, every worker limits on its own
+class MemoryRateLimitBackend:
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self.__buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        # returns 0 when a token was taken, otherwise the seconds until the next one is available
+        now = time.monotonic()
+        tokens, updated_at = self.__buckets.get(key, (limit.burst, now))
+        tokens = min(limit.burst, tokens + (now - updated_at) * limit.per_second)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / limit.per_second
+        self.__buckets[key] = (tokens, now)
+        self.__buckets.move_to_end(key)
+        # forgetting the least recent bucket only hands that client a fresh burst
+        while len(self.__buckets) > self.max_keys:
+            self.__buckets.popitem(last=False)
+        return retry_after
+
+
+# counts requests in dynamodb so every worker and instance shares the same limits.
+# a bucket cannot be updated atomically in one call, so it is approximated with fixed windows
+# that admit burst requests every burst / per_second seconds, one UpdateItem per request
+class DynamoRateLimitBackend:
+    def __init__(self, dynamo_provider: DynamoProvider, executor: BlockingExecutor):
+        self.dynamo_provider = dynamo_provider
+        self.executor = executor
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        window_seconds = limit.burst / limit.per_second
+        now = time.time()
+        window_start = math.floor(now / window_seconds) * window_seconds
+        try:
+            count = await self.executor.run(
+                self.dynamo_provider.count_request,
+                RATE_LIMIT_USERNAME_PREFIX + key,
+                window_start,
+                int(window_start + window_seconds) + 60
+            )
+        except Exception as e:
+            # the limiter must not take the api down with it, so requests are let through
+            logging.warning(f"Could not check the rate limit for {key}, letting the request through: {e}")
+            return 0.0
+        if count <= limit.burst:
+            return 0.0
+        return window_start + window_seconds - now
+
+
+# sheds requests before they reach cognito, dynamodb or wordsapi:
+# token buckets per client ip and per username, and a cap on the requests in flight per downstream
+class AdmissionController:
+    def __init__(
+            self,
+            backend: MemoryRateLimitBackend | DynamoRateLimitBackend,
+            rate_limits: dict[str, RateLimit],
+            concurrency_limits: dict[str, int]
+    ):
+        self.backend = backend
+        self.rate_limits = rate_limits
+        self.concurrency_limits = concurrency_limits
+        self.in_flight = {downstream: 0 for downstream in concurrency_limits}
+        self.rejected: dict[str, int] = {}
+
+    async def check_rate(self, limit_name: str, key: str) -> float:
+        # returns 0 when the request is admitted, otherwise the seconds the client should wait
+        limit = self.rate_limits.get(limit_name)
+        if limit is None or limit.per_second <= 0:
+            return 0.0
+        retry_after = await self.backend.take(f"{limit_name}#{key}", limit)
+        if retry_after > 0:
+            self.__reject(limit_name)
+        return retry_after
+
+    def try_acquire(self, downstreams: tuple[str, ...]) -> bool:
+        # never waits: a request that would queue behind the cap is shed instead
+        for downstream in downstreams:
+            limit = self.concurrency_limits.get(downstream, 0)
+            if limit > 0 and self.in_flight[downstream] >= limit:
+                self.__reject(downstream)
+                return False
+        for downstream in downstreams:
+            if downstream in self.in_flight:
+                self.in_flight[downstream] += 1
+        return True
+
+    def release(self, downstreams: tuple[str, ...]):
+        for downstream in downstreams:
+            if downstream in self.in_flight:
+                self.in_flight[downstream] -= 1
+
+    def stats(self) -> dict:
+        return {
+            "InFlight": dict(self.in_flight),
+            "Rejected": dict(self.rejected)
+        }
+
+    def __reject(self, limit_name: str):
+        self.rejected[limit_name] = self.rejected.get(limit_name, 0) + 1
+
+
+def retry_after_header(retry_after: float) -> dict:
+    return {"Retry-After": str(max(1, math.ceil(retry_after)))}
@@ -1,28 +1,73 @@
 import logging
+from typing import TYPE_CHECKING
 from models.User import UserRequestModel, UserLoginRequestModel, RefreshRequestModel
 from fastapi import HTTPException
-from botocore.exceptions import ClientError
+from providers.LazyClient import client_error
+from providers.TokenCache import TokenCache
+from models.GameStats import GAME_STATS_USERNAME, LEADERBOARD_USERNAME
+from models.RateLimitWindow import RATE_LIMIT_USERNAME_PREFIX
+
+# partitions of the games table that hold shared items rather than a player's games
+RESERVED_USERNAMES = {"sys", GAME_STATS_USERNAME, LEADERBOARD_USERNAME}
+
+if TYPE_CHECKING:
+    # only imported when tokens are verified locally, see create_token_verifier
+    from providers.TokenVerifier import TokenVerifier
 
 
 class AuthenticationProvider:
-    def __init__(self, cognito_client, user_pool_id: str, app_client_id: str):
+    def __init__(
+            self,
+            cognito_client,
+            user_pool_id: str,
+            app_client_id: str,
+            token_verifier: "TokenVerifier | None" = None,
+            token_cache: TokenCache | None = None
+    ):
         self.cognito_client = cognito_client
         self.user_pool_id = user_pool_id
         self.app_client_id = app_client_id
+        self.token_verifier = token_verifier
+        self.token_cache = token_cache
 
     def verify_token(self, token: str) -> dict:
+        if self.token_verifier is not None:
+            return self.__cached(token, "claims", self.__verify_token_locally)
         try:
-            return self.cognito_client.get_user(
-                AccessToken=token
-            )
-        except ClientError as ce:
+            return self.__cached(token, "get_user", self.__get_cognito_user)
+        except client_error() as ce:
             logging.error(ce.response)
             error_message = ce.response['Error']['Message']
             raise HTTPException(status_code=400, detail={
                 "Message": f"Failed to validate authentication token. Responded with: {error_message}"
             })
 
+    def is_token_cached(self, token: str) -> bool:
+        # a cached token is answered without calling cognito or reading the jwks
+        if self.token_cache is None:
+            return False
+        return self.token_cache.contains(token, "claims" if self.token_verifier is not None else "get_user")
+
+    def __verify_token_locally(self, token: str) -> dict:
+        import jwt
+        try:
+            claims = self.token_verifier.verify(token)
+            return {
+                "Username": claims["username"],
+                "Claims": claims
+            }
+        except jwt.PyJWTError as je:
+            logging.error(je)
+            raise HTTPException(status_code=400, detail={
+                "Message": f"Failed to validate authentication token. {je}"
+            })
+
     def signup_user(self, user: UserRequestModel) -> dict:
+        username = user.username.lower()
+        if username in RESERVED_USERNAMES or username.startswith(RATE_LIMIT_USERNAME_PREFIX):
+            raise HTTPException(status_code=400, detail={
+                "Message": f"The username {user.username} is not available"
+            })
         try:
             cognito_user_res = self.cognito_client.admin_create_user(
                 UserPoolId=self.user_pool_id,
@@ -61,7 +106,7 @@ class AuthenticationProvider:
                 "UserAttributes": user_attributes
             }
             return user
-        except ClientError as ce:
+        except client_error() as ce:
             logging.error(ce)
             error_message = ce.response['Error']['Message']
             raise HTTPException(status_code=400, detail={
@@ -79,7 +124,7 @@ class AuthenticationProvider:
                 }
             )
             return cognito_auth_result["AuthenticationResult"]
-        except ClientError as ce:
+        except client_error() as ce:
             logging.error(ce.response)
             error_message = ce.response['Error']['Message']
             raise HTTPException(status_code=400, detail={
@@ -96,7 +141,7 @@ class AuthenticationProvider:
                 }
             )
             return cognito_auth_result["AuthenticationResult"]
-        except ClientError as ce:
+        except client_error() as ce:
             logging.error(ce.response)
             error_message = ce.response['Error']['Message']
             raise HTTPException(status_code=400, detail={
@@ -105,9 +150,7 @@ class AuthenticationProvider:
 
     def get_user_info(self, token: str) -> dict:
         try:
-            cognito_user_info = self.cognito_client.get_user(
-                AccessToken=token
-            )
+            cognito_user_info = self.__cached(token, "get_user", self.__get_cognito_user)
             username = cognito_user_info["Username"]
             user_attributes = dict()
             for user_attribute in cognito_user_info["UserAttributes"]:
@@ -117,13 +160,31 @@ class AuthenticationProvider:
                 "Username": username,
                 "UserAttributes": user_attributes
             }
-        except ClientError as ce:
+        except client_error() as ce:
             logging.error(ce.response)
             error_message = ce.response["Error"]["Message"]
             raise HTTPException(status_code=400, detail={
                 "Message": f"Failed to get user info. Auth service responded with: {error_message}"
             })
 
+    def invalidate_token(self, token: str):
+        if self.token_cache is not None:
+            self.token_cache.invalidate(token)
+
+    def __get_cognito_user(self, token: str) -> dict:
+        return self.cognito_client.get_user(
+            AccessToken=token
+        )
+
+    def __cached(self, token: str, kind: str, load) -> dict:
+        if self.token_cache is None:
+            return load(token)
+        value = self.token_cache.get(token, kind)
+        if value is None:
+            # failed lookups raise before reaching the cache, so only valid tokens are stored
+            value = load(token)
+            self.token_cache.put(token, kind, value)
+        return value
 
     def __parse_user_attribute(self, user_attribute: dict[str, str]) -> dict:
         if user_attribute["Name"].lower() == "sub":
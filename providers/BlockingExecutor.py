@@ -0,0 +1,60 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable
+from providers.RequestProfiler import current_profile
+
+
+# runs the synchronous boto3/requests provider calls off the event loop with a bounded number in flight
+class BlockingExecutor:
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.__pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="provider")
+        self.__semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self.__semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        self.total_wait_seconds += started_at - queued_at
+        self.in_flight += 1
+        profile = current_profile.get()
+        if profile is not None:
+            fn = profile.wrap(fn)
+        future = self.__pool.submit(fn, *args, **kwargs)
+        # a cancelled caller cannot stop a running thread, so the slot is only released once the call really ends
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(self.__release, f, started_at))
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        return {
+            "MaxConcurrency": self.max_concurrency,
+            "Waiting": self.waiting,
+            "InFlight": self.in_flight,
+            "Completed": self.completed,
+            "Failed": self.failed,
+            "TotalWaitSeconds": self.total_wait_seconds,
+            "TotalRunSeconds": self.total_run_seconds
+        }
+
+    def shutdown(self):
+        self.__pool.shutdown(wait=True)
+
+    def __release(self, future: Future, started_at: float):
+        self.in_flight -= 1
+        self.completed += 1
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+        self.total_run_seconds += time.perf_counter() - started_at
+        self.__semaphore.release()
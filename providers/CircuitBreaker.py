@@ -0,0 +1,48 @@
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+# stops calling a failing upstream for a while, then lets a single trial call through to see if it recovered
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+
+    def before_call(self):
+        if self.state == CLOSED:
+            return
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+            return
+        # open, or half open with the trial call still running
+        self.rejected += 1
+        raise CircuitOpenError(f"{self.name} circuit is open")
+
+    def record_success(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "State": self.state,
+            "ConsecutiveFailures": self.consecutive_failures,
+            "Rejected": self.rejected
+        }
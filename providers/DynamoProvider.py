@@ -1,52 +1,46 @@
+import base64
+import json
 import logging
+import re
+import time
 from fastapi import HTTPException, status
-from botocore.exceptions import ClientError
-from boto3 import client
-from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from typing import TYPE_CHECKING
+from providers.LazyClient import client_error
 from models.GameTurn import GameTurn
 from models.GameWord import GameWord
-from datetime import date, datetime
+from models.GameSummary import GameSummary, MAX_ATTEMPTS, summary_timestamp
+from models.GameStats import GameStats, UserStats, Leaderboard, LeaderboardEntry, day_timestamp, \
+    GAME_STATS_USERNAME, LEADERBOARD_USERNAME, USER_STATS_TIMESTAMP
+from models.RateLimitWindow import RateLimitWindow
+from providers.Retry import backoff_seconds
+from models.DynamoCodec import decode_game_turn, decode_game_word, decode_game_summary, decode_item, decode_page, \
+    decode_game_stats, decode_user_stats, decode_leaderboard
+from datetime import date, datetime, timedelta
+
+if TYPE_CHECKING:
+    from boto3 import client
+
+BATCH_WRITE_LIMIT = 25
+BATCH_GET_LIMIT = 100
+TRANSACT_WRITE_LIMIT = 100
+GAME_TURN_PROJECTION = {
+    "#username": "username",
+    "#game_timestamp": "game_timestamp",
+    "#game_date": "game_date",
+    "#word": "word",
+    "#win": "win",
+    "#game_id": "game_id"
+}
 
 
 class DynamoProvider:
-    def __init__(self, dynamo_client: client):
-        self.serializer = TypeSerializer()
-        self.deserializer = TypeDeserializer()
-        self.__dynamo: client = dynamo_client
-        self.table_name = "PyWordGame"
+    def __init__(self, dynamo_client: "client", table_name: str = "PyWordGame"):
+        self.__dynamo: "client" = dynamo_client
+        self.table_name = table_name
 
     def close_connection(self):
         self.__dynamo.close()
 
-    def get_user_attempt_count_for_game(self, game_date: date, username: str, game_id: str) -> int:
-        timestamp = datetime.fromisoformat(game_date.isoformat()).timestamp()
-        try:
-            dynamo_response = self.__dynamo.query(
-                TableName=self.table_name,
-                Select="ALL_ATTRIBUTES",
-                ConsistentRead=True,
-                KeyConditionExpression="username=:username AND game_timestamp >= :game_timestamp",
-                FilterExpression="game_id=:game_id",
-                ExpressionAttributeValues={
-                    ":username": {
-                        "S": username
-                    },
-                    ":game_timestamp": {
-                        "N": str(timestamp)
-                    },
-                    ":game_id": {
-                        "S": game_id
-                    }
-                }
-            )
-            return int(dynamo_response["Count"])
-        except ClientError as ce:
-            logging.error(ce.response)
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
-                "Message": f"Failed to get user's attempts on game with game id {game_id}",
-                "ServiceMessage": ce.response["Error"]["Message"]
-            })
-
     def get_user_attempts_for_game(self, game_date: date, username: str, game_id: str) -> list[GameTurn]:
         timestamp = datetime.fromisoformat(game_date.isoformat()).timestamp()
         try:
@@ -68,30 +62,20 @@ class DynamoProvider:
                     }
                 }
             )
-            items: list[dict] = results["Items"]
-            game_turns = []
-            for item in items:
-                game_turns.append(GameTurn(
-                    username=self.deserializer.deserialize(item["username"]),
-                    game_date=date.fromisoformat(self.deserializer.deserialize(item["game_date"])),
-                    game_timestamp=datetime.fromtimestamp(int(self.deserializer.deserialize(item["game_timestamp"]))),
-                    word=self.deserializer.deserialize(item["word"]),
-                    win=self.deserializer.deserialize(item["win"]),
-                    game_id=self.deserializer.deserialize(item["game_id"])
-                ))
-            return game_turns
-        except ClientError as ce:
+            return decode_page(results["Items"], decode_game_turn)
+        except client_error() as ce:
             logging.error(ce.response)
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
                 "Message": f"Failed to get user attempts for game with game id {game_id}",
                 "ServiceMessage": ce.response["Error"]["Message"]
             })
 
-    def get_game_for_date(self, game_date: date) -> GameWord | None:
+    def get_game_for_date(self, game_date: date, consistent_read: bool = False) -> GameWord | None:
         timestamp = datetime.fromisoformat(game_date.isoformat()).timestamp()
         try:
             game: dict = self.__dynamo.get_item(
                 TableName=self.table_name,
+                ConsistentRead=consistent_read,
                 Key={
                     "username": {
                         "S": "sys"
@@ -101,80 +85,123 @@ class DynamoProvider:
                     }
                 }
             )
-            logging.info(f"Found {'0' if game is None else '1'} game for date {game_date.isoformat()}")
             if game is None or "Item" not in game.keys():
+                logging.debug(f"Found no game for date {game_date.isoformat()}")
                 return None
-            dynamo_game_item: dict = game["Item"]
-            game_item = {}
-            for k in dynamo_game_item.keys():
-                deserialized_val = self.deserializer.deserialize(dynamo_game_item[k])
-                game_item[k] = deserialized_val
-            word_game = GameWord(
-                username=game_item["username"],
-                word=game_item["word"],
-                game_timestamp=datetime.fromtimestamp(int(game_item["game_timestamp"])),
-                game_date=date.fromisoformat(game_item["game_date"]),
-                game_id=game_item["game_id"]
-            )
-            logging.info(f"Game found is: {word_game}")
+            word_game = decode_game_word(game["Item"])
+            # the game holds the day's answer, so only the id is logged
+            logging.debug(f"Found game {word_game.game_id} for date {game_date.isoformat()}")
             return word_game
-        except ClientError as ce:
+        except client_error() as ce:
             logging.error(ce.response)
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
                 "Message": f"Failed to get game on date {game_date.isoformat()}",
                 "ServiceMessage": ce.response["Error"]["Message"]
             })
 
-    def get_user_game_turns(self, username: str, timestamp: datetime = 0) -> dict:
-        try:
-            pagination_dict = {}
-            if timestamp.timestamp() > 0:
-                pagination_dict = {
-                    "username": username,
-                    "game_timestamp": timestamp
-                }
-            attempts = self.__dynamo.query(
-                TableName=self.table_name,
-                Select="ALL_ATTRIBUTES",
-                ConsistentRead=True,
-                KeyConditionExpression="username=:username",
-                ExpressionAttributeValues={
-                    ":username": {
-                        "S": username
-                    }
+    def get_user_game_turns(self, username: str, cursor: str | None = None, limit: int = 25) -> dict:
+        query_args = {
+            "TableName": self.table_name,
+            "ConsistentRead": False,
+            "Limit": limit,
+            "KeyConditionExpression": "username=:username AND game_timestamp > :zero",
+            "ProjectionExpression": ", ".join(GAME_TURN_PROJECTION.keys()),
+            "ExpressionAttributeNames": GAME_TURN_PROJECTION,
+            "ExpressionAttributeValues": {
+                ":username": {
+                    "S": username
                 },
-                ExclusiveStartKey=pagination_dict
-            )
-            game_turns: list[GameTurn] = []
-            logging.info(f"Found {attempts['Count']} game turns for user ${username}")
-            for attempt in attempts["Items"]:
-                game_turns.append(GameTurn(
-                    game_id=attempt["game_id"],
-                    username=attempt["username"],
-                    game_timestamp=attempt["game_timestamp"],
-                    game_date=attempt["game_date"],
-                    word=attempt["word"],
-                    win=attempt["win"]
-                ))
+                ":zero": {
+                    "N": "0"
+                }
+            }
+        }
+        if cursor is not None:
+            query_args["ExclusiveStartKey"] = decode_cursor(cursor, username)
+        try:
+            attempts = self.__dynamo.query(**query_args)
+            logging.debug(f"Found {attempts['Count']} game turns for user {username}")
+            last_evaluated_key = attempts.get("LastEvaluatedKey")
             return {
-                "GameTurns": game_turns,
-                "LastEvaluatedKey": attempts["LastEvaluatedKey"],
+                "GameTurns": decode_page(attempts["Items"], decode_game_turn),
+                "NextCursor": None if last_evaluated_key is None else encode_cursor(last_evaluated_key),
                 "Count": attempts["Count"]
             }
-        except ClientError as ce:
+        except client_error() as ce:
             logging.error(ce.response)
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
                 "Message": f"Failed to get user game turns.",
                 "ServiceMessage": ce.response["Error"]["Message"]
             })
 
+    def get_user_game_summary(self, game_date: date, username: str) -> GameSummary | None:
+        try:
+            response = self.__dynamo.get_item(
+                TableName=self.table_name,
+                ConsistentRead=True,
+                Key=self.__summary_key(username, game_date)
+            )
+            if "Item" not in response:
+                return None
+            return decode_game_summary(response["Item"])
+        except client_error() as ce:
+            logging.error(ce.response)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+                "Message": f"Failed to get user's game summary on date {game_date.isoformat()}",
+                "ServiceMessage": ce.response["Error"]["Message"]
+            })
+
+    def record_user_attempt(self, game_attempt: GameTurn, previous_attempts: int | None = None, write_turn: bool = True):
+        # the turn and the summary are written together, the summary condition enforces the game rules.
+        # with previous_attempts the write also only succeeds if no other attempt got in first,
+        # so the caller knows exactly which attempt this one was.
+        # without write_turn only the summary is updated and the caller saves the turn itself
+        summary_update = self.__summary_update(game_attempt, previous_attempts)
+        try:
+            if not write_turn:
+                self.__dynamo.update_item(**summary_update)
+                return
+            self.__dynamo.transact_write_items(
+                TransactItems=[
+                    {
+                        "Update": summary_update
+                    },
+                    {
+                        "Put": {
+                            "TableName": self.table_name,
+                            "Item": game_attempt.to_dynamo_json(),
+                            "ConditionExpression": "attribute_not_exists(username)"
+                        }
+                    }
+                ]
+            )
+        except client_error() as ce:
+            if ce.response["Error"]["Code"] == "TransactionCanceledException":
+                self.__raise_rule_violation(ce.response.get("CancellationReasons", []), game_attempt)
+            if ce.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                # a plain update returns the old item on the error itself rather than in cancellation reasons
+                old_item = {"Item": ce.response["Item"]} if "Item" in ce.response else {}
+                self.__raise_rule_violation([{"Code": "ConditionalCheckFailed", **old_item}], game_attempt)
+            logging.error(ce.response)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+                "Message": f"Failed to save user game attempt with the word {game_attempt.word}",
+                "ServiceMessage": ce.response["Error"]["Message"]
+            })
+
+    def save_user_attempts(self, game_attempts: list[GameTurn]) -> list[dict]:
+        return self.batch_write_items([{
+            "PutRequest": {
+                "Item": game_attempt.to_dynamo_json()
+            }
+        } for game_attempt in game_attempts])
+
     def save_user_attempt(self, game_attempt: GameTurn):
         try:
             self.__dynamo.put_item(
                 TableName=self.table_name,
                 Item=game_attempt.to_dynamo_json()
             )
-        except ClientError as ce:
+        except client_error() as ce:
             logging.error(ce.response)
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
                 "Message": f"Failed to save user game attempt with the word {game_attempt.word}",
@@ -187,10 +214,448 @@ class DynamoProvider:
                 TableName=self.table_name,
                 Item=word_game.to_dynamo_json()
             )
-        except ClientError as ce:
+        except client_error() as ce:
             logging.error(ce)
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
                 "Message": f"Failed to save game word on date {word_game.game_date.isoformat()}",
                 "ServiceMessage": ce.response["Error"]["Message"]
             })
 
+
+    def create_word_game(self, word_game: GameWord) -> GameWord:
+        try:
+            self.__dynamo.put_item(
+                TableName=self.table_name,
+                Item=word_game.to_dynamo_json(),
+                ConditionExpression="attribute_not_exists(username)"
+            )
+            return word_game
+        except client_error() as ce:
+            if ce.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                # another worker created the game for this date first, everyone plays that one
+                existing_game = self.get_game_for_date(word_game.game_date, consistent_read=True)
+                if existing_game is not None:
+                    return existing_game
+            logging.error(ce)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+                "Message": f"Failed to create game word on date {word_game.game_date.isoformat()}",
+                "ServiceMessage": ce.response["Error"]["Message"]
+            })
+
+    def get_games_for_dates(self, game_dates: list[date], max_attempts: int = 8) -> list[GameWord]:
+        keys = [{
+            "username": {
+                "S": "sys"
+            },
+            "game_timestamp": {
+                "N": str(datetime.fromisoformat(game_date.isoformat()).timestamp())
+            }
+        } for game_date in game_dates]
+        word_games = []
+        try:
+            for i in range(0, len(keys), BATCH_GET_LIMIT):
+                request_items = {
+                    self.table_name: {
+                        "Keys": keys[i:i + BATCH_GET_LIMIT]
+                    }
+                }
+                for attempt in range(max_attempts):
+                    response = self.__dynamo.batch_get_item(RequestItems=request_items)
+                    word_games.extend(decode_page(response["Responses"].get(self.table_name, []), decode_game_word))
+                    request_items = response.get("UnprocessedKeys", {})
+                    if not request_items:
+                        break
+                    time.sleep(backoff_seconds(attempt))
+                if request_items:
+                    # callers treat a date without a game as free to schedule, so a partial answer must not pass
+                    unread = len(request_items[self.table_name]["Keys"])
+                    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail={
+                        "Message": f"Failed to get games for {unread} dates after {max_attempts} attempts"
+                    })
+            return word_games
+        except client_error() as ce:
+            logging.error(ce.response)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+                "Message": "Failed to get games for dates",
+                "ServiceMessage": ce.response["Error"]["Message"]
+            })
+
+    def save_word_games(self, word_games: list[GameWord], max_attempts: int = 8) -> list[GameWord]:
+        # conditional puts in transactions of up to TRANSACT_WRITE_LIMIT games, since BatchWriteItem cannot take
+        # a condition. a date that got a game in the meantime cancels its transaction, so the rest is written again
+        # without it. returns the games now in the table, which for such a date is the game that was already there
+        saved_games: dict[date, GameWord] = {}
+        try:
+            for i in range(0, len(word_games), TRANSACT_WRITE_LIMIT):
+                chunk = word_games[i:i + TRANSACT_WRITE_LIMIT]
+                attempt = 0
+                while len(chunk) > 0:
+                    try:
+                        self.__dynamo.transact_write_items(TransactItems=[{
+                            "Put": {
+                                "TableName": self.table_name,
+                                "Item": word_game.to_dynamo_json(),
+                                "ConditionExpression": "attribute_not_exists(username)",
+                                "ReturnValuesOnConditionCheckFailure": "ALL_OLD"
+                            }
+                        } for word_game in chunk])
+                        saved_games.update((word_game.game_date, word_game) for word_game in chunk)
+                        break
+                    except client_error() as ce:
+                        if ce.response["Error"]["Code"] != "TransactionCanceledException":
+                            raise
+                        reasons = ce.response.get("CancellationReasons", [])
+                        existing_games = [
+                            decode_game_word(reason["Item"]) for reason in reasons
+                            if reason.get("Code") == "ConditionalCheckFailed" and "Item" in reason
+                        ]
+                        if len(existing_games) > 0:
+                            saved_games.update((game.game_date, game) for game in existing_games)
+                            chunk = [word_game for word_game in chunk if word_game.game_date not in saved_games]
+                            continue
+                        # cancelled by a conflicting write or throttling rather than a date that is taken
+                        attempt += 1
+                        if attempt >= max_attempts:
+                            raise
+                        logging.info(f"Retrying transaction of {len(chunk)} games: {reasons}")
+                        time.sleep(backoff_seconds(attempt))
+            return [saved_games[word_game.game_date] for word_game in word_games]
+        except client_error() as ce:
+            logging.error(ce.response)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+                "Message": f"Failed to save {len(word_games)} game words",
+                "ServiceMessage": ce.response["Error"]["Message"]
+            })
+
+    def batch_write_items(self, write_requests: list[dict], max_attempts: int = 8) -> list[dict]:
+        # returns the write requests dynamo still had not processed after every retry
+        unprocessed = []
+        try:
+            for i in range(0, len(write_requests), BATCH_WRITE_LIMIT):
+                chunk = write_requests[i:i + BATCH_WRITE_LIMIT]
+                for attempt in range(max_attempts):
+                    response = self.__dynamo.batch_write_item(RequestItems={
+                        self.table_name: chunk
+                    })
+                    chunk = response.get("UnprocessedItems", {}).get(self.table_name, [])
+                    if not chunk:
+                        break
+                    logging.info(f"Retrying {len(chunk)} unprocessed items")
+                    time.sleep(backoff_seconds(attempt))
+                unprocessed.extend(chunk)
+            return unprocessed
+        except client_error() as ce:
+            logging.error(ce.response)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+                "Message": f"Failed to write batch of {len(write_requests)} items",
+                "ServiceMessage": ce.response["Error"]["Message"]
+            })
+
+    def scan_segment(
+            self,
+            segment: int,
+            total_segments: int,
+            exclusive_start_key: dict | None = None,
+            limit: int = 1000
+    ) -> dict:
+        scan_args = {
+            "TableName": self.table_name,
+            "Segment": segment,
+            "TotalSegments": total_segments,
+            "Limit": limit,
+            "ReturnConsumedCapacity": "TOTAL"
+        }
+        if exclusive_start_key is not None:
+            scan_args["ExclusiveStartKey"] = exclusive_start_key
+        try:
+            page = self.__dynamo.scan(**scan_args)
+            return {
+                "Items": page["Items"],
+                "LastEvaluatedKey": page.get("LastEvaluatedKey"),
+                "ConsumedCapacity": page.get("ConsumedCapacity", {}).get("CapacityUnits", 0.0)
+            }
+        except client_error() as ce:
+            logging.error(ce.response)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+                "Message": f"Failed to scan segment {segment} of {total_segments}",
+                "ServiceMessage": ce.response["Error"]["Message"]
+            })
+
+    def to_model(
+            self,
+            item: dict
+    ) -> GameWord | GameTurn | GameSummary | GameStats | UserStats | Leaderboard | RateLimitWindow:
+        return decode_item(item)
+
+    def __summary_key(self, username: str, game_date: date) -> dict:
+        return {
+            "username": {
+                "S": username
+            },
+            "game_timestamp": {
+                "N": str(summary_timestamp(game_date))
+            }
+        }
+
+    def __summary_update(self, game_attempt: GameTurn, previous_attempts: int | None) -> dict:
+        expression_attribute_values = {
+            ":zero": {"N": "0"},
+            ":one": {"N": "1"},
+            ":win": {"BOOL": game_attempt.win},
+            ":no_guesses": {"L": []},
+            ":guess": {"L": [{"S": game_attempt.word}]},
+            ":game_id": {"S": game_attempt.game_id},
+            ":game_date": {"S": game_attempt.game_date.isoformat()}
+        }
+        if previous_attempts is None:
+            condition_expression = "attribute_not_exists(username) OR (attempt_count < :max_attempts AND won = :false)"
+            expression_attribute_values[":false"] = {"BOOL": False}
+            expression_attribute_values[":max_attempts"] = {"N": str(MAX_ATTEMPTS)}
+        elif previous_attempts == 0:
+            condition_expression = "attribute_not_exists(username)"
+        else:
+            condition_expression = "attempt_count = :previous_attempts AND attempt_count < :max_attempts AND won = :false"
+            expression_attribute_values[":false"] = {"BOOL": False}
+            expression_attribute_values[":max_attempts"] = {"N": str(MAX_ATTEMPTS)}
+            expression_attribute_values[":previous_attempts"] = {"N": str(previous_attempts)}
+        return {
+            "TableName": self.table_name,
+            "Key": self.__summary_key(game_attempt.username, game_attempt.game_date),
+            "UpdateExpression": "SET attempt_count = if_not_exists(attempt_count, :zero) + :one, "
+                                "won = :win, "
+                                "guesses = list_append(if_not_exists(guesses, :no_guesses), :guess), "
+                                "game_id = :game_id, "
+                                "game_date = :game_date",
+            "ConditionExpression": condition_expression,
+            "ExpressionAttributeValues": expression_attribute_values,
+            "ReturnValuesOnConditionCheckFailure": "ALL_OLD"
+        }
+
+    def __raise_rule_violation(self, cancellation_reasons: list[dict], game_attempt: GameTurn):
+        if len(cancellation_reasons) == 0 or cancellation_reasons[0].get("Code") != "ConditionalCheckFailed":
+            return
+        old_item = cancellation_reasons[0].get("Item")
+        check_game_rules(None if old_item is None else decode_game_summary(old_item), game_attempt.game_date)
+        # the game is still open, so another attempt was saved between reading the summary and this write
+        raise HTTPException(409, {
+            "Message": "Another attempt for this game was saved at the same time, please try again"
+        })
+
+    def add_to_counters(self, username: str, game_timestamp: float, counters: dict[str, int]):
+        # ADD creates missing counters at zero, so the item never has to exist first
+        names = {f"#c{i}": name for i, name in enumerate(counters)}
+        values = {f":c{i}": {"N": str(value)} for i, value in enumerate(counters.values())}
+        try:
+            self.__dynamo.update_item(
+                TableName=self.table_name,
+                Key={
+                    "username": {
+                        "S": username
+                    },
+                    "game_timestamp": {
+                        "N": str(game_timestamp)
+                    }
+                },
+                UpdateExpression="ADD " + ", ".join(f"#c{i} :c{i}" for i in range(len(counters))),
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
+            )
+        except client_error() as ce:
+            logging.error(ce.response)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+                "Message": f"Failed to update counters for {username}",
+                "ServiceMessage": ce.response["Error"]["Message"]
+            })
+
+    def update_user_streak(self, username: str, game_date: date, won: bool):
+        # each update is conditional on the dates, so applying the same result twice changes nothing
+        key = self.__user_stats_key(username)
+        values = {
+            ":today": {"S": game_date.isoformat()},
+            ":yesterday": {"S": (game_date - timedelta(days=1)).isoformat()},
+            ":zero": {"N": "0"},
+            ":one": {"N": "1"}
+        }
+        not_counted_yet = "attribute_not_exists(last_won_date) OR last_won_date < :today"
+        try:
+            if not won:
+                self.__update_if(key, "SET current_streak = :zero", not_counted_yet, values)
+                return
+            streak = self.__update_if(
+                key,
+                "SET current_streak = current_streak + :one, last_won_date = :today",
+                "last_won_date = :yesterday",
+                values
+            )
+            if streak is None:
+                streak = self.__update_if(
+                    key,
+                    "SET current_streak = :one, last_won_date = :today",
+                    not_counted_yet,
+                    values
+                )
+            if streak is not None:
+                self.__update_if(
+                    key,
+                    "SET max_streak = :streak",
+                    "attribute_not_exists(max_streak) OR max_streak < :streak",
+                    {":streak": {"N": str(streak)}}
+                )
+        except client_error() as ce:
+            logging.error(ce.response)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+                "Message": f"Failed to update the streak for {username}",
+                "ServiceMessage": ce.response["Error"]["Message"]
+            })
+
+    def merge_leaderboard(self, game_date: date, entries: list[LeaderboardEntry], size: int, max_attempts: int = 8):
+        # read, merge and write back guarded by a version number, so workers merging at once retry instead of
+        # overwriting each other
+        try:
+            for attempt in range(max_attempts):
+                leaderboard = self.get_leaderboard(game_date, consistent_read=True)
+                merged = leaderboard.merge(entries, size)
+                if merged.entries == leaderboard.entries:
+                    return
+                try:
+                    self.__dynamo.put_item(
+                        TableName=self.table_name,
+                        Item=merged.to_dynamo_json(),
+                        ConditionExpression="attribute_not_exists(username) OR version = :version",
+                        ExpressionAttributeValues={":version": {"N": str(leaderboard.version)}}
+                    )
+                    return
+                except client_error() as ce:
+                    if ce.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                        raise
+                time.sleep(backoff_seconds(attempt))
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail={
+                "Message": f"Gave up merging the leaderboard for {game_date.isoformat()} after {max_attempts} tries"
+            })
+        except client_error() as ce:
+            logging.error(ce.response)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+                "Message": f"Failed to update the leaderboard for {game_date.isoformat()}",
+                "ServiceMessage": ce.response["Error"]["Message"]
+            })
+
+    def get_game_stats(self, game_date: date) -> GameStats:
+        item = self.__get_aggregate(GAME_STATS_USERNAME, day_timestamp(game_date), False)
+        return decode_game_stats(game_date, item)
+
+    def get_user_stats(self, username: str) -> UserStats:
+        item = self.__get_aggregate(username, USER_STATS_TIMESTAMP, False)
+        return decode_user_stats(username, item)
+
+    def get_leaderboard(self, game_date: date, consistent_read: bool = False) -> Leaderboard:
+        item = self.__get_aggregate(LEADERBOARD_USERNAME, day_timestamp(game_date), consistent_read)
+        if len(item) == 0:
+            return Leaderboard(game_date)
+        return decode_leaderboard(game_date, item)
+
+    def count_request(self, username: str, window_timestamp: float, expires_at: int) -> int:
+        # returns how many requests the window has counted, including this one
+        response = self.__dynamo.update_item(
+            TableName=self.table_name,
+            Key={
+                "username": {
+                    "S": username
+                },
+                "game_timestamp": {
+                    "N": str(window_timestamp)
+                }
+            },
+            UpdateExpression="ADD request_count :one SET expires_at = if_not_exists(expires_at, :expires_at)",
+            ExpressionAttributeValues={
+                ":one": {"N": "1"},
+                ":expires_at": {"N": str(expires_at)}
+            },
+            ReturnValues="UPDATED_NEW"
+        )
+        return int(response["Attributes"]["request_count"]["N"])
+
+    def __get_aggregate(self, username: str, game_timestamp: float, consistent_read: bool) -> dict:
+        try:
+            response = self.__dynamo.get_item(
+                TableName=self.table_name,
+                ConsistentRead=consistent_read,
+                Key={
+                    "username": {
+                        "S": username
+                    },
+                    "game_timestamp": {
+                        "N": str(game_timestamp)
+                    }
+                }
+            )
+            return response.get("Item", {})
+        except client_error() as ce:
+            logging.error(ce.response)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+                "Message": f"Failed to get statistics",
+                "ServiceMessage": ce.response["Error"]["Message"]
+            })
+
+    def __update_if(self, key: dict, update_expression: str, condition_expression: str, values: dict) -> int | None:
+        # returns the new current_streak, or None when the condition did not hold
+        used_values = set(re.findall(r":\w+", update_expression + " " + condition_expression))
+        try:
+            response = self.__dynamo.update_item(
+                TableName=self.table_name,
+                Key=key,
+                UpdateExpression=update_expression,
+                ConditionExpression=condition_expression,
+                # dynamodb rejects expression values that the expressions do not use
+                ExpressionAttributeValues={name: value for name, value in values.items() if name in used_values},
+                ReturnValues="UPDATED_NEW"
+            )
+        except client_error() as ce:
+            if ce.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return None
+            raise
+        attributes = response.get("Attributes", {})
+        return int(attributes["current_streak"]["N"]) if "current_streak" in attributes else 0
+
+    def __user_stats_key(self, username: str) -> dict:
+        return {
+            "username": {
+                "S": username
+            },
+            "game_timestamp": {
+                "N": str(USER_STATS_TIMESTAMP)
+            }
+        }
+
+
+def check_game_rules(game_summary: GameSummary | None, game_date: date):
+    if game_summary is None:
+        return
+    if game_summary.won:
+        raise HTTPException(400, {
+            "Message": f"You already won the game for date {game_date}"
+        })
+    if game_summary.attempt_count >= MAX_ATTEMPTS:
+        raise HTTPException(400, {
+            "Message": f"You cannot have more than {MAX_ATTEMPTS} attempts per game!"
+        })
+
+
+def encode_cursor(last_evaluated_key: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(last_evaluated_key, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, username: str) -> dict:
+    try:
+        exclusive_start_key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        cursor_username = exclusive_start_key["username"]["S"]
+        float(exclusive_start_key["game_timestamp"]["N"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+            "Message": "Invalid pagination cursor."
+        })
+    # the key is client supplied, only allow it to point into the caller's own partition
+    if cursor_username != username:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+            "Message": "Invalid pagination cursor."
+        })
+    return exclusive_start_key
@@ -0,0 +1,63 @@
+import logging
+import os
+import struct
+import numpy as np
+from providers.ScoringEngine import score_batch, encode_words, pattern_codes
+
+MAGIC = b"PYWFM"
+FORMAT_VERSION = 1
+# magic, format version, word count, word length
+HEADER = struct.Struct("<5sHIB")
+DEFAULT_FEEDBACK_MATRIX_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "feedback_matrix.bin")
+
+
+# words x words matrix of feedback patterns, row is the guess and column the answer, one byte per pair.
+# file layout: header, the words as ascii, then the matrix row by row
+class FeedbackMatrix:
+    def __init__(self, words: list[str], patterns: np.ndarray):
+        self.words = words
+        self.patterns = patterns
+        self.word_ids = {word: i for i, word in enumerate(words)}
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_FEEDBACK_MATRIX_PATH) -> "FeedbackMatrix":
+        with open(path, "rb") as matrix_file:
+            magic, version, word_count, word_length = HEADER.unpack(matrix_file.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} feedback matrix")
+            words_blob = matrix_file.read(word_count * word_length).decode("ascii")
+        words = [words_blob[i:i + word_length] for i in range(0, len(words_blob), word_length)]
+        # read only memory map, every worker opening the same file shares its pages
+        patterns = np.memmap(
+            path,
+            dtype=np.uint8,
+            mode="r",
+            offset=HEADER.size + word_count * word_length,
+            shape=(word_count, word_count)
+        )
+        logging.info(f"Opened {word_count}x{word_count} feedback matrix from {path}")
+        return cls(words, patterns)
+
+    @staticmethod
+    def build(words: list[str], path: str, chunk_size: int = 64):
+        encoded = encode_words(words)
+        word_count, word_length = encoded.shape
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as matrix_file:
+            matrix_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, word_count, word_length))
+            matrix_file.write("".join(words).encode("ascii"))
+            for start in range(0, word_count, chunk_size):
+                guesses = encoded[start:start + chunk_size]
+                scores = score_batch(
+                    np.repeat(guesses, word_count, axis=0),
+                    np.tile(encoded, (len(guesses), 1))
+                )
+                matrix_file.write(pattern_codes(scores).tobytes())
+        os.replace(temp_path, path)
+
+    def pattern_row(self, guess: str) -> np.ndarray:
+        word_id = self.word_ids.get(guess)
+        if word_id is not None:
+            return self.patterns[word_id]
+        # guesses outside the word list are scored on the fly
+        return pattern_codes(score_batch(encode_words([guess]), encode_words(self.words)))
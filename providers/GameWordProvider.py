@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from fastapi import HTTPException
+from models.GameWord import GameWord
+from providers.BlockingExecutor import BlockingExecutor
+from providers.DynamoProvider import DynamoProvider
+from providers.WordsProvider import WordsProvider
+
+
+# keeps game words in memory by date and makes sure only one request per process creates the word of the day
+class GameWordProvider:
+    def __init__(
+            self,
+            dynamo_provider: DynamoProvider,
+            words_provider: WordsProvider,
+            executor: BlockingExecutor,
+            max_cached_dates: int = 7
+    ):
+        self.dynamo_provider = dynamo_provider
+        self.words_provider = words_provider
+        self.executor = executor
+        self.max_cached_dates = max_cached_dates
+        self.__games: OrderedDict[date, GameWord] = OrderedDict()
+        self.__pending: dict[tuple[date, bool], asyncio.Task] = {}
+        self.__word_pool_primed: asyncio.Task | None = None
+
+    async def get_game_for_date(self, game_date: date) -> GameWord | None:
+        game_word = self.__get_cached(game_date)
+        if game_word is not None:
+            return game_word
+        return await self.__single_flight(game_date, False)
+
+    async def get_or_create_game_for_date(self, game_date: date) -> GameWord:
+        game_word = self.__get_cached(game_date)
+        if game_word is not None:
+            return game_word
+        return await self.__single_flight(game_date, True)
+
+    def prime_word_pool(self, no_repeat_days: int = 365, scheduled_days: int = 30) -> asyncio.Task | None:
+        # keep words played recently or already scheduled out of the candidate pool, then start filling it
+        word_pool = self.words_provider.word_pool
+        if word_pool is None:
+            return None
+
+        async def prime():
+            today = date.today()
+            game_dates = [today + timedelta(days=i) for i in range(-no_repeat_days, scheduled_days + 1)]
+            try:
+                games = await self.executor.run(self.dynamo_provider.get_games_for_dates, game_dates)
+                word_pool.exclude(game.word for game in games)
+            except Exception as e:
+                # the pool still works, it just cannot rule out recent words until the games table is reachable
+                logging.warning(f"Could not load recent game words for the word pool: {e}")
+            word_pool.start_refill()
+
+        self.__word_pool_primed = asyncio.create_task(prime())
+        return self.__word_pool_primed
+
+    def invalidate(self, game_date: date):
+        self.__games.pop(game_date, None)
+
+    async def __single_flight(self, game_date: date, create: bool) -> GameWord | None:
+        key = (game_date, create)
+        task = self.__pending.get(key)
+        if task is None:
+            load = self.__load_or_create_game if create else self.__load_game
+            task = asyncio.create_task(load(game_date))
+            self.__pending[key] = task
+            task.add_done_callback(lambda _: self.__pending.pop(key, None))
+        # shield the shared task so one cancelled request does not cancel it for everyone waiting
+        return await asyncio.shield(task)
+
+    async def __load_game(self, game_date: date) -> GameWord | None:
+        game_word = await self.executor.run(self.dynamo_provider.get_game_for_date, game_date)
+        if game_word is not None:
+            self.__put_cached(game_word)
+        return game_word
+
+    async def __load_or_create_game(self, game_date: date) -> GameWord:
+        game_word = await self.__load_game(game_date)
+        if game_word is not None:
+            return game_word
+        if self.__word_pool_primed is not None:
+            # picking before the recent words are excluded could repeat one of them
+            await asyncio.shield(self.__word_pool_primed)
+        random_word = await self.words_provider.get_random_word()
+        if random_word == "":
+            raise HTTPException(500, {
+                "Message": "Failed to get game word."
+            })
+        game_word = await self.executor.run(self.dynamo_provider.create_word_game, GameWord(
+            username="sys",
+            word=random_word,
+            game_date=game_date,
+            game_timestamp=datetime.fromisoformat(game_date.isoformat())
+        ))
+        logging.info(f"Created game {game_word.game_id} for date {game_date.isoformat()}")
+        self.__put_cached(game_word)
+        return game_word
+
+    def __get_cached(self, game_date: date) -> GameWord | None:
+        # entries are keyed by date, so today's word stops being served as soon as the date rolls over
+        game_word = self.__games.get(game_date)
+        if game_word is not None:
+            self.__games.move_to_end(game_date)
+        return game_word
+
+    def __put_cached(self, game_word: GameWord):
+        if self.words_provider.word_pool is not None:
+            self.words_provider.word_pool.exclude([game_word.word])
+        self.__games[game_word.game_date] = game_word
+        self.__games.move_to_end(game_word.game_date)
+        while len(self.__games) > self.max_cached_dates:
+            self.__games.popitem(last=False)
@@ -0,0 +1,71 @@
+import functools
+import numpy as np
+from providers.FeedbackMatrix import FeedbackMatrix
+from providers.ScoringEngine import score_batch, encode_words, pattern_codes
+
+PATTERN_COUNT = 243
+# guesses scored per chunk: bucket ids stay below 2^16 and a chunk of the matrix stays a few megabytes
+GUESS_CHUNK_SIZE = 256
+
+
+class HintProvider:
+    def __init__(self, feedback_matrix: FeedbackMatrix):
+        self.feedback_matrix = feedback_matrix
+
+    def get_hint(self, guesses: list[str], answer: str) -> dict | None:
+        # the matrix only knows words from the word list, so there is nothing to narrow down for other answers
+        if answer not in self.feedback_matrix.word_ids:
+            return None
+        candidates = self.remaining_candidates(guesses, answer)
+        return {
+            "RemainingCandidates": int(candidates.size),
+            "BestGuess": self.best_guess(candidates, len(guesses) == 0)
+        }
+
+    def remaining_candidates(self, guesses: list[str], answer: str) -> np.ndarray:
+        matrix = self.feedback_matrix
+        mask = np.ones(len(matrix.words), dtype=bool)
+        if len(guesses) == 0:
+            return np.flatnonzero(mask)
+        feedback = pattern_codes(score_batch(encode_words(guesses), encode_words([answer])))
+        for guess, pattern in zip(guesses, feedback):
+            # keep the words that would have produced the same feedback for this guess
+            mask &= matrix.pattern_row(guess) == pattern
+        return np.flatnonzero(mask)
+
+    def best_guess(self, candidates: np.ndarray, is_opening: bool) -> str | None:
+        if candidates.size == 0:
+            return None
+        if candidates.size <= 2:
+            return self.feedback_matrix.words[candidates[0]]
+        if is_opening:
+            return opening_guess(self.feedback_matrix)
+        return find_best_guess(self.feedback_matrix, candidates)
+
+    def prewarm(self):
+        opening_guess(self.feedback_matrix)
+
+
+def find_best_guess(feedback_matrix: FeedbackMatrix, candidates: np.ndarray | None = None) -> str:
+    # pick the guess that leaves the fewest candidates on average: sum of squared bucket sizes per guess.
+    # candidates None means every word, which reads the matrix rows without copying the columns
+    patterns = feedback_matrix.patterns
+    word_count = patterns.shape[0]
+    offsets = (np.arange(GUESS_CHUNK_SIZE, dtype=np.uint16) * PATTERN_COUNT)[:, None]
+    expected_sizes = np.empty(word_count, dtype=np.int64)
+    for start in range(0, word_count, GUESS_CHUNK_SIZE):
+        end = min(start + GUESS_CHUNK_SIZE, word_count)
+        chunk = patterns[start:end] if candidates is None else patterns[start:end, candidates]
+        buckets = chunk + offsets[:end - start]
+        bucket_sizes = np.bincount(buckets.ravel(), minlength=(end - start) * PATTERN_COUNT)
+        expected_sizes[start:end] = (bucket_sizes.reshape(end - start, PATTERN_COUNT) ** 2).sum(axis=1)
+    # prefer a guess that could itself be the answer when scores tie
+    expected_sizes[slice(None) if candidates is None else candidates] -= 1
+    return feedback_matrix.words[int(np.argmin(expected_sizes))]
+
+
+# the opening hint is the same for every player and every day, so it is computed once per matrix.
+# the production server computes it in the gunicorn master, see preload_shared_data
+@functools.cache
+def opening_guess(feedback_matrix: FeedbackMatrix) -> str:
+    return find_best_guess(feedback_matrix)
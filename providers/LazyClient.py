@@ -0,0 +1,47 @@
+import threading
+
+# boto3's default session is not safe to create clients from on several threads at once
+CREATE_LOCK = threading.Lock()
+
+
+# stands in for an aws client and creates it on first use, so startup does not pay for loading the service models
+class LazyClient:
+    def __init__(self, create_client):
+        self.__create_client = create_client
+        self.__client = None
+        self.__on_create = []
+
+    def get(self):
+        if self.__client is None:
+            with CREATE_LOCK:
+                if self.__client is None:
+                    aws_client = self.__create_client()
+                    for callback in self.__on_create:
+                        callback(aws_client)
+                    self.__client = aws_client
+        return self.__client
+
+    def created(self) -> bool:
+        return self.__client is not None
+
+    def when_created(self, callback):
+        with CREATE_LOCK:
+            if self.__client is None:
+                self.__on_create.append(callback)
+                return
+        callback(self.__client)
+
+    def close(self):
+        # a client that was never used has nothing to close
+        if self.__client is not None:
+            self.__client.close()
+
+    def __getattr__(self, name: str):
+        return getattr(self.get(), name)
+
+
+def client_error() -> type[Exception]:
+    # botocore.exceptions pulls in botocore itself, so the class is looked up when an error is being handled
+    # rather than when a provider module is imported: except client_error() as ce
+    from botocore.exceptions import ClientError
+    return ClientError
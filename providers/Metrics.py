@@ -0,0 +1,213 @@
+import asyncio
+import functools
+import inspect
+import os
+import time
+from typing import Callable
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+# set by gunicorn.conf.py, every worker then writes its metrics to files that /metrics adds up
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+PROVIDER_CALL_SECONDS = Histogram(
+    "pywordle_provider_call_seconds",
+    "Latency of provider method calls",
+    ["provider", "method"]
+)
+PROVIDER_CALL_ERRORS = Counter(
+    "pywordle_provider_call_errors_total",
+    "Provider method calls that raised",
+    ["provider", "method"]
+)
+AWS_CALL_SECONDS = Histogram(
+    "pywordle_aws_call_seconds",
+    "Latency of AWS API calls",
+    ["service", "operation"]
+)
+AWS_CALL_ERRORS = Counter(
+    "pywordle_aws_call_errors_total",
+    "AWS API calls that returned an error",
+    ["service", "operation", "code"]
+)
+DYNAMODB_CONSUMED_CAPACITY = Counter(
+    "pywordle_dynamodb_consumed_capacity_units_total",
+    "DynamoDB capacity units consumed",
+    ["operation"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "pywordle_http_request_seconds",
+    "Latency of HTTP requests",
+    ["method", "route", "status"]
+)
+EXECUTOR_IN_FLIGHT = Gauge(
+    "pywordle_executor_in_flight",
+    "Blocking provider calls running",
+    multiprocess_mode="livesum"
+)
+EXECUTOR_WAITING = Gauge(
+    "pywordle_executor_waiting",
+    "Blocking provider calls waiting for a slot",
+    multiprocess_mode="livesum"
+)
+TOKEN_CACHE_HITS = Gauge("pywordle_token_cache_hits", "Token cache hits since start", multiprocess_mode="livesum")
+TOKEN_CACHE_MISSES = Gauge("pywordle_token_cache_misses", "Token cache misses since start", multiprocess_mode="livesum")
+TOKEN_CACHE_EVICTIONS = Gauge(
+    "pywordle_token_cache_evictions",
+    "Token cache LRU evictions since start",
+    multiprocess_mode="livesum"
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "pywordle_admission_in_flight",
+    "Admitted requests in flight per downstream",
+    ["downstream"],
+    multiprocess_mode="livesum"
+)
+ADMISSION_REJECTED = Gauge(
+    "pywordle_admission_rejected",
+    "Requests shed since start per limit",
+    ["limit"],
+    multiprocess_mode="livesum"
+)
+CIRCUIT_OPEN = Gauge(
+    "pywordle_circuit_open",
+    "1 while the circuit to an upstream is open or half open",
+    ["upstream"],
+    multiprocess_mode="livemax"
+)
+# dynamodb operations that accept ReturnConsumedCapacity
+CAPACITY_OPERATIONS = {
+    "GetItem", "PutItem", "UpdateItem", "DeleteItem", "Query", "Scan",
+    "BatchGetItem", "BatchWriteItem", "TransactWriteItems", "TransactGetItems"
+}
+
+# gauges read from a function, polled into the metric files when every worker writes its own
+POLLED_GAUGES: list[tuple[Gauge, Callable[[], float]]] = []
+
+
+def instrument_provider(provider, provider_name: str):
+    # replaces every public method on the instance with a timed wrapper
+    for method_name in dir(type(provider)):
+        if method_name.startswith("_"):
+            continue
+        method = getattr(provider, method_name)
+        if inspect.ismethod(method):
+            setattr(provider, method_name, timed(provider_name, method_name, method))
+    return provider
+
+
+def timed(provider_name: str, method_name: str, method):
+    histogram = PROVIDER_CALL_SECONDS.labels(provider_name, method_name)
+    errors = PROVIDER_CALL_ERRORS.labels(provider_name, method_name)
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def timed_coroutine(*args, **kwargs):
+            started_at = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started_at)
+        return timed_coroutine
+
+    @functools.wraps(method)
+    def timed_method(*args, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - started_at)
+    return timed_method
+
+
+def instrument_aws_client(aws_client):
+    # local fakes have no botocore event system
+    meta = getattr(aws_client, "meta", None)
+    if meta is None:
+        return aws_client
+    service = meta.service_model.service_name
+    meta.events.register(f"provide-client-params.{service}", request_consumed_capacity)
+    meta.events.register(f"before-call.{service}", start_aws_call)
+    meta.events.register(f"after-call.{service}", functools.partial(finish_aws_call, service))
+    return aws_client
+
+
+def request_consumed_capacity(params, model, **kwargs):
+    if model.service_model.service_name == "dynamodb" and model.name in CAPACITY_OPERATIONS:
+        params.setdefault("ReturnConsumedCapacity", "TOTAL")
+
+
+def start_aws_call(context, **kwargs):
+    context["pywordle_started_at"] = time.perf_counter()
+
+
+def finish_aws_call(service, http_response, parsed, model, context, **kwargs):
+    started_at = context.get("pywordle_started_at")
+    if started_at is not None:
+        AWS_CALL_SECONDS.labels(service, model.name).observe(time.perf_counter() - started_at)
+    if "Error" in parsed:
+        AWS_CALL_ERRORS.labels(service, model.name, parsed["Error"].get("Code", "Unknown")).inc()
+    consumed_capacity = parsed.get("ConsumedCapacity")
+    if consumed_capacity is not None:
+        # single table operations return one entry, batch and transaction operations a list
+        entries = consumed_capacity if isinstance(consumed_capacity, list) else [consumed_capacity]
+        DYNAMODB_CONSUMED_CAPACITY.labels(model.name).inc(sum(entry.get("CapacityUnits", 0) for entry in entries))
+
+
+def track_runtime_stats(executor, token_cache):
+    observe(EXECUTOR_IN_FLIGHT, lambda: executor.in_flight)
+    observe(EXECUTOR_WAITING, lambda: executor.waiting)
+    if token_cache is not None:
+        observe(TOKEN_CACHE_HITS, lambda: token_cache.hits)
+        observe(TOKEN_CACHE_MISSES, lambda: token_cache.misses)
+        observe(TOKEN_CACHE_EVICTIONS, lambda: token_cache.evictions)
+
+
+def track_circuit_breaker(circuit_breaker):
+    observe(CIRCUIT_OPEN.labels(circuit_breaker.name), lambda: circuit_breaker.state != "closed")
+
+
+def track_admission_controller(admission_controller):
+    for downstream in admission_controller.concurrency_limits:
+        observe(
+            ADMISSION_IN_FLIGHT.labels(downstream),
+            lambda downstream=downstream: admission_controller.in_flight[downstream]
+        )
+    for limit_name in [*admission_controller.rate_limits, *admission_controller.concurrency_limits]:
+        observe(
+            ADMISSION_REJECTED.labels(limit_name),
+            lambda limit_name=limit_name: admission_controller.rejected.get(limit_name, 0)
+        )
+
+
+def observe(gauge: Gauge, function: Callable[[], float]):
+    # a function gauge only exists in the process that defines it, so with several workers it is polled instead
+    if MULTIPROCESS:
+        POLLED_GAUGES.append((gauge, function))
+    else:
+        gauge.set_function(function)
+
+
+def update_polled_gauges():
+    for gauge, function in POLLED_GAUGES:
+        gauge.set(function())
+
+
+async def poll_gauges(interval_seconds: float = 5.0):
+    while True:
+        update_polled_gauges()
+        await asyncio.sleep(interval_seconds)
+
+
+def render_metrics() -> bytes:
+    if not MULTIPROCESS:
+        return generate_latest()
+    # this worker's gauges are fresh, the other workers' are at most one poll interval old
+    update_polled_gauges()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
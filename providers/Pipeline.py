@@ -0,0 +1,31 @@
+import asyncio
+import time
+from typing import Any, Awaitable
+
+
+# records how long each stage of a request took so it can be reported in a Server-Timing header
+class StageTimer:
+    def __init__(self):
+        self.timings: dict[str, float] = {}
+
+    async def time(self, stage: str, awaitable: Awaitable) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.timings[stage] = time.perf_counter() - started_at
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.timings.items())
+
+
+async def run_concurrently(*awaitables: Awaitable) -> list:
+    # like gather, but the first stage to fail cancels the ones still running
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
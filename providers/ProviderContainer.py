@@ -0,0 +1,370 @@
+import asyncio
+import functools
+import os
+import logging
+import time
+from typing import TYPE_CHECKING
+from providers.AuthenticationProvider import AuthenticationProvider
+from providers.WordsProvider import WordsProvider
+from providers.DynamoProvider import DynamoProvider
+from providers.BlockingExecutor import BlockingExecutor
+from providers.GameWordProvider import GameWordProvider
+from providers.FeedbackMatrix import FeedbackMatrix, DEFAULT_FEEDBACK_MATRIX_PATH
+from providers.HintProvider import HintProvider, opening_guess
+from providers.StatsProvider import StatsProvider
+from providers.AdmissionControl import AdmissionController, MemoryRateLimitBackend, DynamoRateLimitBackend, RateLimit, \
+    COGNITO, DYNAMO, WORDSAPI
+from providers.TurnWriteQueue import TurnWriteQueue, TurnJournal, DEFAULT_JOURNAL_DIR
+from providers.TokenCache import TokenCache
+from providers.WordIndex import WordIndex, DEFAULT_WORD_LIST_PATH, DEFAULT_GUESS_LIST_PATH
+from providers.WordsApiClient import WordsApiClient, WORDS_API_URL
+from providers.CircuitBreaker import CircuitBreaker
+from providers.LazyClient import LazyClient
+from providers.StartupTimer import STARTUP_LOGGER
+from providers.WordPool import WordPool, local_page_loader
+from providers.Metrics import instrument_provider, instrument_aws_client, track_runtime_stats, track_circuit_breaker, \
+    track_admission_controller, poll_gauges, POLLED_GAUGES
+
+if TYPE_CHECKING:
+    # boto3, botocore and the jwt and requests packages behind the token verifier take a while to import,
+    # so they are only imported once a client or verifier is created
+    from boto3 import client
+    from botocore.config import Config
+    from providers.TokenVerifier import TokenVerifier
+
+AWS_REGION = "us-west-1"
+
+
+# clients and providers live for the whole process: created at startup, shared by requests, closed on shutdown
+class ProviderContainer:
+    def __init__(
+            self,
+            cognito_client: "client",
+            dynamo_client: "client",
+            auth_provider: AuthenticationProvider,
+            dynamo_provider: DynamoProvider,
+            words_provider: WordsProvider,
+            executor: BlockingExecutor,
+            game_word_provider: GameWordProvider,
+            hint_provider: HintProvider | None = None,
+            stats_provider: StatsProvider | None = None,
+            turn_write_queue: TurnWriteQueue | None = None,
+            admission_controller: AdmissionController | None = None
+    ):
+        self.cognito_client = cognito_client
+        self.dynamo_client = dynamo_client
+        self.auth_provider = auth_provider
+        self.dynamo_provider = dynamo_provider
+        self.words_provider = words_provider
+        self.executor = executor
+        self.game_word_provider = game_word_provider
+        self.hint_provider = hint_provider
+        self.stats_provider = stats_provider
+        self.turn_write_queue = turn_write_queue
+        self.admission_controller = admission_controller
+        self.__gauge_poller: asyncio.Task | None = None
+        self.__prewarm_task: asyncio.Task | None = None
+
+    @classmethod
+    def from_env(cls) -> "ProviderContainer":
+        max_pool_connections = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+        # the aws clients are created on first use or by prewarm, whichever comes first
+        cognito_client = LazyClient(lambda: create_cognito_client(create_client_config(max_pool_connections)))
+        dynamo_client = LazyClient(lambda: create_dynamo_client(create_client_config(max_pool_connections)))
+        auth_provider = AuthenticationProvider(
+            cognito_client,
+            os.getenv("USER_POOL_ID"),
+            os.getenv("APP_CLIENT_ID"),
+            create_token_verifier(),
+            create_token_cache()
+        )
+        dynamo_provider = DynamoProvider(dynamo_client)
+        word_index = load_word_index(os.getenv("WORD_LIST_PATH", DEFAULT_WORD_LIST_PATH))
+        guess_index = load_guess_index(
+            os.getenv("WORD_LIST_PATH", DEFAULT_WORD_LIST_PATH),
+            os.getenv("GUESS_LIST_PATH", DEFAULT_GUESS_LIST_PATH)
+        )
+        words_provider = WordsProvider(
+            os.getenv("WORDS_API_KEY"),
+            guess_index,
+            os.getenv("WORDS_API_FALLBACK", "false") == "true",
+            create_words_api_client()
+        )
+        words_provider.word_pool = create_word_pool(words_provider, word_index, guess_index)
+        executor = BlockingExecutor(int(os.getenv("PROVIDER_MAX_CONCURRENCY", "32")))
+        logging.info(f"Created provider container with {max_pool_connections} pooled connections per client")
+        providers = cls(
+            cognito_client=cognito_client,
+            dynamo_client=dynamo_client,
+            auth_provider=auth_provider,
+            dynamo_provider=dynamo_provider,
+            words_provider=words_provider,
+            executor=executor,
+            game_word_provider=GameWordProvider(dynamo_provider, words_provider, executor),
+            hint_provider=create_hint_provider(),
+            stats_provider=create_stats_provider(dynamo_provider, executor),
+            turn_write_queue=create_turn_write_queue(dynamo_provider, executor),
+            admission_controller=create_admission_controller(dynamo_provider, executor)
+        )
+        if os.getenv("METRICS_ENABLED", "true") == "true":
+            providers.instrument()
+        return providers
+
+    def instrument(self):
+        # times every public provider method and every aws call, see providers/Metrics.py
+        for aws_client in (self.cognito_client, self.dynamo_client):
+            if isinstance(aws_client, LazyClient):
+                aws_client.when_created(instrument_aws_client)
+            else:
+                instrument_aws_client(aws_client)
+        instrument_provider(self.auth_provider, "auth")
+        instrument_provider(self.dynamo_provider, "dynamo")
+        instrument_provider(self.words_provider, "words")
+        instrument_provider(self.game_word_provider, "game_word")
+        if self.hint_provider is not None:
+            instrument_provider(self.hint_provider, "hint")
+        if self.stats_provider is not None:
+            instrument_provider(self.stats_provider, "stats")
+        track_runtime_stats(self.executor, self.auth_provider.token_cache)
+        track_circuit_breaker(self.words_provider.api_client.circuit_breaker)
+        if self.admission_controller is not None:
+            track_admission_controller(self.admission_controller)
+
+    def start(self):
+        # runs once the event loop is up
+        self.game_word_provider.prime_word_pool(int(os.getenv("WORD_POOL_NO_REPEAT_DAYS", "365")))
+        if self.stats_provider is not None:
+            self.stats_provider.start()
+        if self.turn_write_queue is not None:
+            self.turn_write_queue.start()
+        if len(POLLED_GAUGES) > 0:
+            self.__gauge_poller = asyncio.create_task(poll_gauges())
+        if os.getenv("STARTUP_PREWARM", "true") == "true":
+            self.__prewarm_task = asyncio.create_task(
+                self.__prewarm_in_background(float(os.getenv("STARTUP_PREWARM_DELAY_SECONDS", "1")))
+            )
+
+    async def __prewarm_in_background(self, delay_seconds: float):
+        # the delay lets the server bind its port and answer health checks first
+        await asyncio.sleep(delay_seconds)
+        started_at = time.perf_counter()
+        try:
+            await self.executor.run(self.prewarm)
+        except Exception as e:
+            logging.warning(f"Prewarm failed, clients are created on first use instead: {e}")
+            return
+        STARTUP_LOGGER.info(f"Prewarmed clients in {(time.perf_counter() - started_at) * 1000:.0f}ms")
+
+    def prewarm(self):
+        # creates what startup left for first use, so the first requests do not pay for it
+        for aws_client in (self.cognito_client, self.dynamo_client):
+            if isinstance(aws_client, LazyClient):
+                aws_client.get()
+        self.words_provider.api_client.prewarm()
+        if self.auth_provider.token_verifier is not None:
+            self.auth_provider.token_verifier.refresh_keys()
+        if self.hint_provider is not None:
+            self.hint_provider.prewarm()
+
+    async def close(self):
+        for task in (self.__gauge_poller, self.__prewarm_task):
+            if task is not None:
+                task.cancel()
+        await self.words_provider.close()
+        # pending turns and statistics are written before the executor they are written on goes away
+        if self.turn_write_queue is not None:
+            await self.turn_write_queue.close()
+        if self.stats_provider is not None:
+            await self.stats_provider.close()
+        self.executor.shutdown()
+        self.dynamo_provider.close_connection()
+        self.cognito_client.close()
+
+
+def create_client_config(max_pool_connections: int) -> "Config":
+    from botocore.config import Config
+    return Config(max_pool_connections=max_pool_connections)
+
+
+def create_cognito_client(client_config: "Config | None" = None) -> "client":
+    from boto3 import client
+    return client(
+        "cognito-idp",
+        region_name=AWS_REGION,
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        config=client_config
+    )
+
+
+def create_dynamo_client(client_config: "Config | None" = None) -> "client":
+    from boto3 import client
+    if os.getenv("PROJECT_ENV") == "development":
+        return client(
+            "dynamodb",
+            region_name="anywhere",
+            endpoint_url="http://my-dynamodb:8000",
+            aws_access_key_id="LOCAL_ACCESS_ID",
+            aws_secret_access_key="LOCAL_ACCESS_SECRET_KEY",
+            config=client_config
+        )
+    return client(
+        "dynamodb",
+        region_name=AWS_REGION,
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        config=client_config
+    )
+
+
+def create_words_api_client() -> WordsApiClient:
+    return WordsApiClient(
+        os.getenv("WORDS_API_KEY"),
+        os.getenv("WORDS_API_URL", WORDS_API_URL),
+        float(os.getenv("WORDS_API_CONNECT_TIMEOUT", "2")),
+        float(os.getenv("WORDS_API_READ_TIMEOUT", "5")),
+        int(os.getenv("WORDS_API_MAX_RETRIES", "2")),
+        circuit_breaker=CircuitBreaker(
+            "wordsapi",
+            int(os.getenv("WORDS_API_BREAKER_FAILURES", "5")),
+            float(os.getenv("WORDS_API_BREAKER_RESET_SECONDS", "30"))
+        )
+    )
+
+
+def create_word_pool(words_provider: WordsProvider, word_index: WordIndex, guess_index: WordIndex) -> WordPool | None:
+    capacity = int(os.getenv("WORD_POOL_SIZE", "200"))
+    if capacity <= 0:
+        return None
+    words = word_index.words()
+    if os.getenv("WORD_POOL_SOURCE", "api") == "list":
+        load_page = local_page_loader(words)
+    else:
+        # looked up on every call so the page loads go through the metrics wrapper
+        load_page = lambda page: words_provider.get_word_page(page)
+    return WordPool(
+        load_page,
+        capacity,
+        int(os.getenv("WORD_POOL_LOW_WATER", str(capacity // 4))),
+        # while the pool is empty, e.g. with wordsapi down, words come from the local list instead
+        words if os.getenv("WORD_POOL_LIST_FALLBACK", "true") == "true" else None,
+        guess_index
+    )
+
+
+def create_stats_provider(dynamo_provider: DynamoProvider, executor: BlockingExecutor) -> StatsProvider | None:
+    if os.getenv("STATS_ENABLED", "true") != "true":
+        return None
+    return StatsProvider(
+        dynamo_provider,
+        executor,
+        float(os.getenv("STATS_FLUSH_SECONDS", "1")),
+        int(os.getenv("LEADERBOARD_SIZE", "100"))
+    )
+
+
+def create_turn_write_queue(dynamo_provider: DynamoProvider, executor: BlockingExecutor) -> TurnWriteQueue | None:
+    if os.getenv("TURN_WRITE_MODE", "sync") != "batched":
+        return None
+    return TurnWriteQueue(
+        dynamo_provider,
+        executor,
+        TurnJournal(
+            os.getenv("TURN_JOURNAL_DIR", DEFAULT_JOURNAL_DIR),
+            float(os.getenv("TURN_JOURNAL_FSYNC_SECONDS", "1"))
+        ),
+        float(os.getenv("TURN_FLUSH_SECONDS", "0.2")),
+        max_pending=int(os.getenv("TURN_QUEUE_MAX_PENDING", "10000"))
+    )
+
+
+def create_admission_controller(
+        dynamo_provider: DynamoProvider,
+        executor: BlockingExecutor
+) -> AdmissionController | None:
+    if os.getenv("ADMISSION_CONTROL_ENABLED", "true") != "true":
+        return None
+    if os.getenv("RATE_LIMIT_BACKEND", "memory") == "dynamo":
+        # shared by every worker and instance, at the cost of one UpdateItem per limit checked
+        backend = DynamoRateLimitBackend(dynamo_provider, executor)
+    else:
+        backend = MemoryRateLimitBackend()
+    return AdmissionController(
+        backend,
+        {
+            "ip": rate_limit_from_env("IP", "20", "40"),
+            "auth": rate_limit_from_env("AUTH", "1", "10"),
+            "login": rate_limit_from_env("LOGIN", "0.1", "5"),
+            "user": rate_limit_from_env("USER", "10", "20")
+        },
+        {
+            COGNITO: int(os.getenv("MAX_CONCURRENT_COGNITO", "64")),
+            DYNAMO: int(os.getenv("MAX_CONCURRENT_DYNAMO", "128")),
+            WORDSAPI: int(os.getenv("MAX_CONCURRENT_WORDSAPI", "64"))
+        }
+    )
+
+
+def rate_limit_from_env(name: str, per_second: str, burst: str) -> RateLimit:
+    return RateLimit(
+        float(os.getenv(f"RATE_LIMIT_{name}_PER_SECOND", per_second)),
+        int(os.getenv(f"RATE_LIMIT_{name}_BURST", burst))
+    )
+
+
+def create_token_verifier() -> "TokenVerifier | None":
+    if os.getenv("AUTH_TOKEN_VERIFICATION", "remote") != "local":
+        return None
+    from providers.TokenVerifier import TokenVerifier, RemoteJwksSource, FileJwksSource
+    user_pool_id = os.getenv("USER_POOL_ID")
+    issuer = f"https://cognito-idp.{AWS_REGION}.amazonaws.com/{user_pool_id}"
+    jwks_file = os.getenv("COGNITO_JWKS_FILE")
+    if jwks_file:
+        jwks_source = FileJwksSource(jwks_file)
+    else:
+        jwks_source = RemoteJwksSource(f"{issuer}/.well-known/jwks.json")
+    return TokenVerifier(jwks_source, issuer, os.getenv("APP_CLIENT_ID"))
+
+
+def create_token_cache() -> TokenCache | None:
+    max_entries = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    if max_entries <= 0:
+        return None
+    return TokenCache(max_entries, float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300")))
+
+
+def create_hint_provider() -> HintProvider | None:
+    feedback_matrix_path = os.getenv("FEEDBACK_MATRIX_PATH", DEFAULT_FEEDBACK_MATRIX_PATH)
+    if not os.path.exists(feedback_matrix_path):
+        logging.warning(f"No feedback matrix at {feedback_matrix_path}, hints are disabled")
+        return None
+    return HintProvider(load_feedback_matrix(feedback_matrix_path))
+
+
+# read-only data is loaded once per process. the production server loads it in the gunicorn master
+# before forking, so every worker shares the same memory pages instead of holding its own copy
+@functools.cache
+def load_word_index(word_list_path: str) -> WordIndex:
+    return WordIndex.from_file(word_list_path)
+
+
+@functools.cache
+def load_guess_index(word_list_path: str, guess_list_path: str) -> WordIndex:
+    # game words are always accepted as guesses, even when the guess list lacks one
+    return WordIndex.from_files([word_list_path, guess_list_path])
+
+
+@functools.cache
+def load_feedback_matrix(feedback_matrix_path: str) -> FeedbackMatrix:
+    return FeedbackMatrix.open(feedback_matrix_path)
+
+
+def preload_shared_data():
+    load_word_index(os.getenv("WORD_LIST_PATH", DEFAULT_WORD_LIST_PATH))
+    load_guess_index(
+        os.getenv("WORD_LIST_PATH", DEFAULT_WORD_LIST_PATH),
+        os.getenv("GUESS_LIST_PATH", DEFAULT_GUESS_LIST_PATH)
+    )
+    feedback_matrix_path = os.getenv("FEEDBACK_MATRIX_PATH", DEFAULT_FEEDBACK_MATRIX_PATH)
+    if os.path.exists(feedback_matrix_path):
+        opening_guess(load_feedback_matrix(feedback_matrix_path))
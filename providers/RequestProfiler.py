@@ -0,0 +1,103 @@
+import contextvars
+import cProfile
+import hmac
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+
+PROFILE_HEADER = "x-profile-request"
+REQUEST_ID_HEADER = "x-request-id"
+DEFAULT_PROFILE_DIR = "profiles"
+# set while a profiled request runs, so the blocking executor can profile its threads too
+current_profile: contextvars.ContextVar["RequestProfile | None"] = contextvars.ContextVar("current_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.loop_profile = cProfile.Profile()
+        self.__thread_profiles: list[cProfile.Profile] = []
+        self.__lock = threading.Lock()
+
+    def wrap(self, fn):
+        # provider calls run on executor threads, which the event loop profiler does not see
+        def profiled(*args, **kwargs):
+            thread_profile = cProfile.Profile()
+            try:
+                thread_profile.enable()
+            except ValueError:
+                # python 3.12+ allows a single active profiler per process
+                return fn(*args, **kwargs)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                thread_profile.disable()
+                with self.__lock:
+                    self.__thread_profiles.append(thread_profile)
+        return profiled
+
+    def dump(self, path: str):
+        stats = pstats.Stats(self.loop_profile)
+        with self.__lock:
+            for thread_profile in self.__thread_profiles:
+                stats.add(thread_profile)
+        stats.dump_stats(path)
+
+
+class RequestProfiler:
+    def __init__(self, output_dir: str = DEFAULT_PROFILE_DIR, sample_rate: float = 0.0, admin_token: str | None = None):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token
+        self.enabled = sample_rate > 0 or bool(admin_token)
+        self.active = False
+
+    @classmethod
+    def from_env(cls) -> "RequestProfiler":
+        return cls(
+            os.getenv("PROFILE_OUTPUT_DIR", DEFAULT_PROFILE_DIR),
+            float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+            os.getenv("PROFILE_ADMIN_TOKEN") or None
+        )
+
+    def should_profile(self, headers) -> bool:
+        # one profiler per thread, so requests overlapping a profiled one run unprofiled
+        if self.active:
+            return False
+        requested = headers.get(PROFILE_HEADER)
+        if requested is not None and self.admin_token:
+            return hmac.compare_digest(requested.encode(), self.admin_token.encode())
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def profile(self, req, call_next):
+        request_id = req.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        profile = RequestProfile(request_id)
+        token = current_profile.set(profile)
+        self.active = True
+        started_at = time.perf_counter()
+        # the event loop profiler also sees other requests interleaved with this one,
+        # so profiles are clearest when taken under light load
+        profile.loop_profile.enable()
+        try:
+            response = await call_next(req)
+        finally:
+            profile.loop_profile.disable()
+            current_profile.reset(token)
+            self.active = False
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        path = self.__write(profile)
+        logging.info(f"Profiled {req.method} {req.url.path} ({elapsed_ms:.1f} ms) to {path}")
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+    def __write(self, profile: RequestProfile) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        # request ids may come from the client, so keep only characters that are safe in a file name
+        safe_id = "".join(c for c in profile.request_id if c.isalnum() or c in "-_")[:64] or uuid.uuid4().hex
+        path = os.path.join(self.output_dir, f"{int(time.time())}-{safe_id}.prof")
+        profile.dump(path)
+        return path
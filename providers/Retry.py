@@ -0,0 +1,6 @@
+import random
+
+
+def backoff_seconds(attempt: int, base_seconds: float = 0.05, max_seconds: float = 5.0) -> float:
+    # full jitter exponential backoff
+    return random.uniform(0, min(max_seconds, base_seconds * 2 ** attempt))
@@ -0,0 +1,55 @@
+import numpy as np
+
+ABSENT = 0
+MISPLACED = 1
+CORRECT = 2
+ALPHABET_SIZE = 26
+
+
+def score_word(guess: str, answer: str) -> tuple[list[int], list[int]]:
+    # single pair fast path, returns the correct and misplaced positions of the guess
+    correct_letters = []
+    unmatched_letters: dict[str, int] = {}
+    for i, letter in enumerate(guess):
+        if letter == answer[i]:
+            correct_letters.append(i)
+        else:
+            unmatched_letters[answer[i]] = unmatched_letters.get(answer[i], 0) + 1
+    misplaced_letters = []
+    for i, letter in enumerate(guess):
+        # a repeated letter is only misplaced as many times as it is still unmatched in the answer
+        if letter != answer[i] and unmatched_letters.get(letter, 0) > 0:
+            misplaced_letters.append(i)
+            unmatched_letters[letter] -= 1
+    return correct_letters, misplaced_letters
+
+
+def encode_words(words: list[str]) -> np.ndarray:
+    # one row per word, letters as 0-25
+    encoded = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8).reshape(len(words), -1)
+    return encoded - ord("a")
+
+
+def score_batch(guesses: np.ndarray, answers: np.ndarray) -> np.ndarray:
+    # scores row i of guesses against row i of answers, broadcasting a single row against many
+    guesses, answers = np.broadcast_arrays(guesses, answers)
+    pair_count, word_length = guesses.shape
+    rows = np.arange(pair_count)
+    correct = guesses == answers
+    scores = np.where(correct, CORRECT, ABSENT).astype(np.uint8)
+    # count the answer letters that were not matched in place, these are available for misplaced marks
+    unmatched = np.zeros((pair_count, ALPHABET_SIZE), dtype=np.int8)
+    for j in range(word_length):
+        unmatched[rows, answers[:, j]] += ~correct[:, j]
+    for j in range(word_length):
+        letters = guesses[:, j]
+        misplaced = ~correct[:, j] & (unmatched[rows, letters] > 0)
+        scores[misplaced, j] = MISPLACED
+        unmatched[rows[misplaced], letters[misplaced]] -= 1
+    return scores
+
+
+def pattern_codes(scores: np.ndarray) -> np.ndarray:
+    # packs a row of 0/1/2 marks into one byte, 3^5 = 243 patterns
+    powers = 3 ** np.arange(scores.shape[-1], dtype=np.uint16)
+    return (scores.astype(np.uint16) * powers).sum(axis=-1).astype(np.uint8)
@@ -0,0 +1,32 @@
+import logging
+import time
+
+# uvicorn's logger, so the report shows up next to its own startup lines
+STARTUP_LOGGER = logging.getLogger("uvicorn.error")
+
+
+# seconds spent in each phase of starting the server, reported once the app is ready to serve
+class StartupTimer:
+    def __init__(self, started_at: float | None = None):
+        self.started_at = started_at or time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.__phase_started_at = self.started_at
+
+    def begin(self):
+        # phases after a gap, e.g. worker startup after the app was preloaded in the gunicorn master
+        self.__phase_started_at = time.perf_counter()
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases[phase] = now - self.__phase_started_at
+        self.__phase_started_at = now
+
+    def report(self) -> dict:
+        return {
+            "TotalSeconds": sum(self.phases.values()),
+            "Phases": dict(self.phases)
+        }
+
+    def log(self):
+        phases = ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.phases.items())
+        STARTUP_LOGGER.info(f"Startup took {sum(self.phases.values()) * 1000:.0f}ms: {phases}")
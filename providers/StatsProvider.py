@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import date
+from models.GameStats import GameStats, UserStats, Leaderboard, LeaderboardEntry, day_timestamp, won_in_attribute, \
+    GAME_STATS_USERNAME, USER_STATS_TIMESTAMP
+from models.GameSummary import MAX_ATTEMPTS
+from models.GameTurn import GameTurn
+from providers.BlockingExecutor import BlockingExecutor
+from providers.DynamoProvider import DynamoProvider
+
+
+# keeps the statistics and leaderboard items up to date as attempts are saved.
+# updates are buffered in memory and merged, so a thousand players finishing in the same second
+# cost one counter update on the game's statistics instead of a thousand
+class StatsProvider:
+    def __init__(
+            self,
+            dynamo_provider: DynamoProvider,
+            executor: BlockingExecutor,
+            flush_interval_seconds: float = 1.0,
+            leaderboard_size: int = 100
+    ):
+        self.dynamo_provider = dynamo_provider
+        self.executor = executor
+        self.flush_interval_seconds = flush_interval_seconds
+        self.leaderboard_size = leaderboard_size
+        self.__counters: dict[tuple[str, float], Counter] = {}
+        self.__streaks: list[tuple[str, date, bool]] = []
+        self.__leaderboards: dict[date, list[LeaderboardEntry]] = {}
+        self.__flush_lock = asyncio.Lock()
+        self.__flusher: asyncio.Task | None = None
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    def record_attempt(self, game_turn: GameTurn, attempt_number: int):
+        game_counters = self.__counters_for(GAME_STATS_USERNAME, day_timestamp(game_turn.game_date))
+        if attempt_number == 1:
+            game_counters["players"] += 1
+        if not game_turn.win and attempt_number < MAX_ATTEMPTS:
+            return
+        user_counters = self.__counters_for(game_turn.username, USER_STATS_TIMESTAMP)
+        user_counters["played"] += 1
+        if game_turn.win:
+            for counters in (game_counters, user_counters):
+                counters["wins"] += 1
+                counters[won_in_attribute(attempt_number)] += 1
+            self.__leaderboards.setdefault(game_turn.game_date, []).append(
+                LeaderboardEntry(game_turn.username, attempt_number, game_turn.game_timestamp)
+            )
+        else:
+            game_counters["losses"] += 1
+        self.__streaks.append((game_turn.username, game_turn.game_date, game_turn.win))
+
+    def start(self):
+        if self.__flusher is None:
+            self.__flusher = asyncio.create_task(self.__flush_periodically())
+
+    async def flush(self):
+        async with self.__flush_lock:
+            counters, self.__counters = self.__counters, {}
+            streaks, self.__streaks = self.__streaks, []
+            leaderboards, self.__leaderboards = self.__leaderboards, {}
+            if len(counters) == 0 and len(streaks) == 0 and len(leaderboards) == 0:
+                return
+            try:
+                await self.executor.run(self.__write, counters, streaks, leaderboards)
+                self.flushes += 1
+            except Exception as e:
+                # __write drops what it managed to write, the rest goes back into the buffer for the next flush
+                self.failed_flushes += 1
+                logging.error(f"Failed to flush statistics, will retry: {e}")
+                for key, counter in counters.items():
+                    self.__counters.setdefault(key, Counter()).update(counter)
+                self.__streaks[:0] = streaks
+                for game_date, entries in leaderboards.items():
+                    self.__leaderboards.setdefault(game_date, [])[:0] = entries
+
+    async def close(self):
+        if self.__flusher is not None:
+            self.__flusher.cancel()
+            self.__flusher = None
+        await self.flush()
+
+    async def get_game_stats(self, game_date: date) -> GameStats:
+        game_stats = await self.executor.run(self.dynamo_provider.get_game_stats, game_date)
+        # include what is still waiting to be flushed, so players see their own finished game counted
+        pending = self.__counters.get((GAME_STATS_USERNAME, day_timestamp(game_date)), Counter())
+        game_stats.players += pending["players"]
+        game_stats.wins += pending["wins"]
+        game_stats.losses += pending["losses"]
+        game_stats.guess_distribution = self.__add_distribution(game_stats.guess_distribution, pending)
+        return game_stats
+
+    async def get_user_stats(self, username: str) -> UserStats:
+        # streaks are flushed first, since they cannot be merged into what was read like the counters
+        if any(streak[0] == username for streak in self.__streaks):
+            await self.flush()
+        user_stats = await self.executor.run(self.dynamo_provider.get_user_stats, username)
+        pending = self.__counters.get((username, USER_STATS_TIMESTAMP), Counter())
+        user_stats.played += pending["played"]
+        user_stats.wins += pending["wins"]
+        user_stats.guess_distribution = self.__add_distribution(user_stats.guess_distribution, pending)
+        return user_stats
+
+    async def get_leaderboard(self, game_date: date) -> Leaderboard:
+        leaderboard = await self.executor.run(self.dynamo_provider.get_leaderboard, game_date)
+        return leaderboard.merge(self.__leaderboards.get(game_date, []), self.leaderboard_size)
+
+    def stats(self) -> dict:
+        return {
+            "PendingCounterItems": len(self.__counters),
+            "PendingStreaks": len(self.__streaks),
+            "PendingLeaderboards": len(self.__leaderboards),
+            "Flushes": self.flushes,
+            "FailedFlushes": self.failed_flushes
+        }
+
+    async def __flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await self.flush()
+
+    def __write(
+            self,
+            counters: dict[tuple[str, float], Counter],
+            streaks: list[tuple[str, date, bool]],
+            leaderboards: dict[date, list[LeaderboardEntry]]
+    ):
+        # runs on an executor thread, each update is removed from the batch as soon as it is written
+        for key in list(counters):
+            changed = {name: value for name, value in counters[key].items() if value != 0}
+            if len(changed) > 0:
+                self.dynamo_provider.add_to_counters(key[0], key[1], changed)
+            del counters[key]
+        while len(streaks) > 0:
+            self.dynamo_provider.update_user_streak(*streaks[0])
+            del streaks[0]
+        for game_date in list(leaderboards):
+            self.dynamo_provider.merge_leaderboard(game_date, leaderboards[game_date], self.leaderboard_size)
+            del leaderboards[game_date]
+
+    def __counters_for(self, username: str, game_timestamp: float) -> Counter:
+        return self.__counters.setdefault((username, game_timestamp), Counter())
+
+    @staticmethod
+    def __add_distribution(guess_distribution: list[int], pending: Counter) -> list[int]:
+        return [count + pending[won_in_attribute(attempts)] for attempts, count in enumerate(guess_distribution, 1)]
@@ -0,0 +1,88 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+# bounded LRU cache of cognito lookups keyed by a hash of the access token
+class TokenCache:
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.__entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, token: str, kind: str):
+        key = self.__token_key(token)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None or kind not in entry[1]:
+                self.misses += 1
+                return None
+            expires_at, values = entry
+            if expires_at <= time.time():
+                del self.__entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return values[kind]
+
+    def contains(self, token: str, kind: str) -> bool:
+        # a peek that leaves the hit and miss counters and the lru order alone
+        with self.__lock:
+            entry = self.__entries.get(self.__token_key(token))
+            return entry is not None and kind in entry[1] and entry[0] > time.time()
+
+    def put(self, token: str, kind: str, value):
+        key = self.__token_key(token)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                entry = (self.__expires_at(token), {})
+                self.__entries[key] = entry
+            entry[1][kind] = value
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, token: str):
+        with self.__lock:
+            self.__entries.pop(self.__token_key(token), None)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "Size": len(self.__entries),
+            "MaxEntries": self.max_entries,
+            "Hits": self.hits,
+            "Misses": self.misses,
+            "Evictions": self.evictions,
+            "Expirations": self.expirations
+        }
+
+    def __expires_at(self, token: str) -> float:
+        expires_at = time.time() + self.ttl_seconds
+        # imported on first use to keep it out of startup
+        import jwt
+        try:
+            # the signature has already been checked by cognito or the token verifier, we only need exp
+            token_exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+        except jwt.PyJWTError:
+            return expires_at
+        if token_exp is None:
+            return expires_at
+        return min(expires_at, float(token_exp))
+
+    @staticmethod
+    def __token_key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
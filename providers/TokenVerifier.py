@@ -0,0 +1,93 @@
+import json
+import logging
+import threading
+import time
+from typing import Protocol
+import jwt
+
+
+# where the user pool's signing keys come from
+class JwksSource(Protocol):
+    def fetch(self) -> dict:
+        ...
+
+
+class RemoteJwksSource(JwksSource):
+    def __init__(self, jwks_url: str, timeout: float = 5.0):
+        self.jwks_url = jwks_url
+        self.timeout = timeout
+
+    def fetch(self) -> dict:
+        # only needed here, importing requests adds a tenth of a second to startup
+        import requests
+        res = requests.get(self.jwks_url, timeout=self.timeout)
+        res.raise_for_status()
+        return res.json()
+
+
+class FileJwksSource(JwksSource):
+    def __init__(self, jwks_path: str):
+        self.jwks_path = jwks_path
+
+    def fetch(self) -> dict:
+        with open(self.jwks_path) as jwks_file:
+            return json.load(jwks_file)
+
+
+# verifies cognito access tokens against the user pool's signing keys without calling cognito
+class TokenVerifier:
+    def __init__(
+            self,
+            jwks_source: JwksSource,
+            issuer: str,
+            app_client_id: str,
+            min_refresh_seconds: float = 60.0,
+            leeway_seconds: float = 0.0
+    ):
+        self.jwks_source = jwks_source
+        self.issuer = issuer
+        self.app_client_id = app_client_id
+        self.min_refresh_seconds = min_refresh_seconds
+        self.leeway_seconds = leeway_seconds
+        self.__keys: dict[str, jwt.PyJWK] = {}
+        self.__last_refresh = 0.0
+        self.__lock = threading.Lock()
+
+    def verify(self, token: str) -> dict:
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = self.__get_signing_key(kid)
+        claims = jwt.decode(
+            token,
+            signing_key.key,
+            algorithms=["RS256"],
+            issuer=self.issuer,
+            leeway=self.leeway_seconds,
+            options={
+                "require": ["exp", "iss", "token_use", "client_id", "username"]
+            }
+        )
+        if claims["token_use"] != "access":
+            raise jwt.InvalidTokenError(f"Expected an access token but got token_use {claims['token_use']}")
+        if claims["client_id"] != self.app_client_id:
+            raise jwt.InvalidTokenError("Token was not issued for this app client")
+        return claims
+
+    def refresh_keys(self, force: bool = False):
+        with self.__lock:
+            # unknown key ids trigger a refresh, so limit how often a bad token can make us refetch
+            if not force and time.monotonic() - self.__last_refresh < self.min_refresh_seconds:
+                return
+            jwks = self.jwks_source.fetch()
+            self.__keys = {jwk["kid"]: jwt.PyJWK(jwk) for jwk in jwks["keys"]}
+            self.__last_refresh = time.monotonic()
+            logging.info(f"Loaded {len(self.__keys)} token signing keys")
+
+    def __get_signing_key(self, kid: str | None) -> jwt.PyJWK:
+        signing_key = self.__keys.get(kid)
+        if signing_key is None:
+            # the key set has either not been loaded yet or cognito rotated its keys
+            self.refresh_keys(force=len(self.__keys) == 0)
+            signing_key = self.__keys.get(kid)
+        if signing_key is None:
+            raise jwt.InvalidTokenError(f"No signing key found for key id {kid}")
+        return signing_key
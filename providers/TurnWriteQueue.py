@@ -0,0 +1,270 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from itertools import islice
+from models.DynamoCodec import decode_game_turn
+from models.GameTurn import GameTurn
+from providers.BlockingExecutor import BlockingExecutor
+from providers.DynamoProvider import DynamoProvider
+from providers.Retry import backoff_seconds
+
+DEFAULT_JOURNAL_DIR = "journal"
+
+
+def turn_key(game_turn: GameTurn) -> tuple[str, float]:
+    return game_turn.username, game_turn.game_timestamp.timestamp()
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# append-only log of the turns waiting to be written, one json object per line:
+# {"seq": n, "item": {...}} for a queued turn and {"ack": [n, ...]} once turns are in dynamo
+class TurnJournal:
+    def __init__(self, journal_dir: str = DEFAULT_JOURNAL_DIR, fsync_seconds: float = 1.0, compact_bytes: int = 1 << 20):
+        self.journal_dir = journal_dir
+        self.fsync_seconds = fsync_seconds
+        self.compact_bytes = compact_bytes
+        # one file per process, so workers sharing the directory never write to the same file
+        self.path = os.path.join(journal_dir, f"turns-{os.getpid()}-{time.time_ns()}.jsonl")
+        self.__file = None
+        self.__synced_at = time.monotonic()
+        self.__taken_over: list[str] = []
+
+    def open(self) -> list[dict]:
+        # returns the turns that processes which are gone queued but never wrote
+        os.makedirs(self.journal_dir, exist_ok=True)
+        unwritten = []
+        for path in sorted(glob.glob(os.path.join(self.journal_dir, "turns-*.jsonl"))):
+            pid = int(os.path.basename(path).split("-")[1])
+            # a journal with our own pid was left by an earlier process, e.g. pid 1 in a restarted container
+            if pid != os.getpid() and process_alive(pid):
+                continue
+            claimed_path = self.__claim(path, len(self.__taken_over))
+            if claimed_path is None:
+                continue
+            unwritten.extend(self.read(claimed_path))
+            self.__taken_over.append(claimed_path)
+        self.__file = open(self.path, "a")
+        return unwritten
+
+    def release_taken_over(self):
+        # the old journals are only removed once their turns are safely in this one
+        os.fsync(self.__file.fileno())
+        for path in self.__taken_over:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.__taken_over = []
+
+    def __claim(self, path: str, n: int) -> str | None:
+        # workers starting together can find the same orphaned journal. renaming it under our own pid is atomic,
+        # so exactly one of them adopts it, and if we die before releasing it the next process adopts it from us
+        claimed_path = self.path.removesuffix(".jsonl") + f"-{n}.jsonl"
+        try:
+            os.rename(path, claimed_path)
+        except FileNotFoundError:
+            return None
+        return claimed_path
+
+    @staticmethod
+    def read(path: str) -> list[dict]:
+        items: dict[int, dict] = {}
+        with open(path) as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # a crash can leave the last line half written
+                    continue
+                if "ack" in entry:
+                    for seq in entry["ack"]:
+                        items.pop(seq, None)
+                else:
+                    items[entry["seq"]] = entry["item"]
+        return list(items.values())
+
+    def append(self, seq: int, item: dict):
+        self.__write({"seq": seq, "item": item})
+
+    def ack(self, seqs: list[int]):
+        self.__write({"ack": seqs})
+
+    def needs_compaction(self) -> bool:
+        return self.__file.tell() >= self.compact_bytes
+
+    def compact(self, pending: list[tuple[int, dict]]):
+        # rewrites the journal with only the turns still pending
+        compacted_path = self.path + ".compact"
+        with open(compacted_path, "w") as compacted:
+            for seq, item in pending:
+                compacted.write(json.dumps({"seq": seq, "item": item}, separators=(",", ":")) + "\n")
+            compacted.flush()
+            os.fsync(compacted.fileno())
+        self.__file.close()
+        os.replace(compacted_path, self.path)
+        self.__file = open(self.path, "a")
+
+    def close(self, empty: bool):
+        self.__file.close()
+        if empty:
+            os.remove(self.path)
+
+    def __write(self, entry: dict):
+        self.__file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        # flushing hands the line to the os, which keeps it through a crash of this process;
+        # fsync keeps it through a crash of the machine, at a cost, so it is done at most every fsync_seconds
+        self.__file.flush()
+        if time.monotonic() - self.__synced_at >= self.fsync_seconds:
+            os.fsync(self.__file.fileno())
+            self.__synced_at = time.monotonic()
+
+
+# queues game turns in memory and writes them in batches in the background.
+# the summary update that enforces the game rules stays synchronous, only the turn item is deferred
+class TurnWriteQueue:
+    def __init__(
+            self,
+            dynamo_provider: DynamoProvider,
+            executor: BlockingExecutor,
+            journal: TurnJournal | None = None,
+            flush_interval_seconds: float = 0.2,
+            batch_size: int = 100,
+            max_pending: int = 10000
+    ):
+        self.dynamo_provider = dynamo_provider
+        self.executor = executor
+        self.journal = journal
+        self.flush_interval_seconds = flush_interval_seconds
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.__pending: OrderedDict[int, GameTurn] = OrderedDict()
+        self.__pending_by_user: dict[str, dict[int, GameTurn]] = {}
+        self.__seq = 0
+        self.__batch_ready = asyncio.Event()
+        self.__flush_lock = asyncio.Lock()
+        self.__flusher: asyncio.Task | None = None
+        self.__failed_flushes_in_a_row = 0
+        self.written = 0
+        self.failed_flushes = 0
+
+    def start(self):
+        if self.journal is not None:
+            unwritten = self.journal.open()
+            if len(unwritten) > 0:
+                logging.warning(f"Replaying {len(unwritten)} game turns from the journal")
+            for item in unwritten:
+                self.enqueue(decode_game_turn(item))
+            self.journal.release_taken_over()
+        self.__flusher = asyncio.create_task(self.__flush_periodically())
+
+    def is_full(self) -> bool:
+        return len(self.__pending) >= self.max_pending
+
+    def journal_turn(self, game_turn: GameTurn) -> int:
+        # called before the summary write, so a turn whose summary was committed is already on disk.
+        # the returned seq is passed to enqueue once the summary is written, or to discard if it was rejected
+        self.__seq += 1
+        if self.journal is not None:
+            self.journal.append(self.__seq, game_turn.to_dynamo_json())
+        return self.__seq
+
+    def enqueue(self, game_turn: GameTurn, seq: int | None = None):
+        if seq is None:
+            seq = self.journal_turn(game_turn)
+        self.__pending[seq] = game_turn
+        self.__pending_by_user.setdefault(game_turn.username, {})[seq] = game_turn
+        if len(self.__pending) >= self.batch_size:
+            self.__batch_ready.set()
+
+    def discard(self, seq: int):
+        # the summary write failed, so the journaled turn must not be replayed
+        if self.journal is not None:
+            self.journal.ack([seq])
+
+    def pending_turns(self, username: str) -> list[GameTurn]:
+        return list(self.__pending_by_user.get(username, {}).values())
+
+    async def flush(self):
+        async with self.__flush_lock:
+            while len(self.__pending) > 0:
+                batch = list(islice(self.__pending.items(), self.batch_size))
+                try:
+                    unprocessed = await self.executor.run(
+                        self.dynamo_provider.save_user_attempts,
+                        [game_turn for _, game_turn in batch]
+                    )
+                except Exception as e:
+                    self.failed_flushes += 1
+                    self.__failed_flushes_in_a_row += 1
+                    logging.error(f"Failed to write {len(batch)} game turns, {len(self.__pending)} pending: {e}")
+                    return
+                unprocessed_keys = {
+                    (request["PutRequest"]["Item"]["username"]["S"],
+                     float(request["PutRequest"]["Item"]["game_timestamp"]["N"]))
+                    for request in unprocessed
+                }
+                written = [seq for seq, game_turn in batch if turn_key(game_turn) not in unprocessed_keys]
+                self.__remove(written)
+                if len(unprocessed) > 0:
+                    # dynamo kept throttling these through every retry, leave them for the next flush
+                    self.__failed_flushes_in_a_row += 1
+                    logging.warning(f"{len(unprocessed)} game turns were not written, {len(self.__pending)} pending")
+                    return
+                self.__failed_flushes_in_a_row = 0
+
+    async def close(self):
+        if self.__flusher is not None:
+            self.__flusher.cancel()
+            self.__flusher = None
+        await self.flush()
+        if self.journal is not None:
+            # turns that still could not be written stay in the journal for the next start
+            self.journal.close(empty=len(self.__pending) == 0)
+        if len(self.__pending) > 0:
+            logging.error(f"Shut down with {len(self.__pending)} game turns not written")
+
+    def stats(self) -> dict:
+        return {
+            "Pending": len(self.__pending),
+            "Written": self.written,
+            "FailedFlushes": self.failed_flushes
+        }
+
+    async def __flush_periodically(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.__batch_ready.wait(), self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self.__batch_ready.clear()
+            await self.flush()
+            if self.__failed_flushes_in_a_row > 0:
+                await asyncio.sleep(backoff_seconds(self.__failed_flushes_in_a_row, self.flush_interval_seconds, 30.0))
+
+    def __remove(self, seqs: list[int]):
+        for seq in seqs:
+            game_turn = self.__pending.pop(seq)
+            user_turns = self.__pending_by_user[game_turn.username]
+            del user_turns[seq]
+            if len(user_turns) == 0:
+                del self.__pending_by_user[game_turn.username]
+        self.written += len(seqs)
+        if self.journal is not None and len(seqs) > 0:
+            self.journal.ack(seqs)
+            if self.journal.needs_compaction():
+                self.journal.compact([
+                    (seq, game_turn.to_dynamo_json()) for seq, game_turn in self.__pending.items()
+                ])
@@ -0,0 +1,79 @@
+import logging
+import os
+from array import array
+from bisect import bisect_left
+
+WORD_LENGTH = 5
+BITS_PER_LETTER = 5
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+# candidate game words
+DEFAULT_WORD_LIST_PATH = os.path.join(DATA_DIR, "words.txt")
+# every word accepted as a guess, including plurals and other inflected forms
+DEFAULT_GUESS_LIST_PATH = os.path.join(DATA_DIR, "guesses.txt")
+
+
+def encode_word(word: str) -> int:
+    # pack the five letters into 25 bits, a=1 ... z=26, so sorted codes keep alphabetical order
+    code = 0
+    for letter in word:
+        code = (code << BITS_PER_LETTER) | (ord(letter) - 96)
+    return code
+
+
+def decode_word(code: int) -> str:
+    letters = []
+    for _ in range(WORD_LENGTH):
+        letters.append(chr((code & 0b11111) + 96))
+        code >>= BITS_PER_LETTER
+    return "".join(reversed(letters))
+
+
+def is_valid_word(word: str) -> bool:
+    return len(word) == WORD_LENGTH and word.isascii() and word.isalpha() and word.islower()
+
+
+# sorted array of packed 5-letter words, 4 bytes per word with O(log n) lookups
+class WordIndex:
+    def __init__(self, codes: array):
+        self.__codes = codes
+
+    @classmethod
+    def from_words(cls, words) -> "WordIndex":
+        codes = sorted({encode_word(word) for word in words if is_valid_word(word)})
+        return cls(array("I", codes))
+
+    @classmethod
+    def from_file(cls, word_list_path: str = DEFAULT_WORD_LIST_PATH) -> "WordIndex":
+        with open(word_list_path) as word_list:
+            word_index = cls.from_words(line.strip().lower() for line in word_list)
+        logging.info(f"Loaded {len(word_index)} words from {word_list_path}")
+        return word_index
+
+    @classmethod
+    def from_files(cls, word_list_paths: list[str]) -> "WordIndex":
+        words = set()
+        for word_list_path in word_list_paths:
+            with open(word_list_path) as word_list:
+                words.update(line.strip().lower() for line in word_list)
+        word_index = cls.from_words(words)
+        logging.info(f"Loaded {len(word_index)} words from {', '.join(word_list_paths)}")
+        return word_index
+
+    def __contains__(self, word: str) -> bool:
+        if not is_valid_word(word):
+            return False
+        code = encode_word(word)
+        i = bisect_left(self.__codes, code)
+        return i < len(self.__codes) and self.__codes[i] == code
+
+    def __len__(self) -> int:
+        return len(self.__codes)
+
+    def __getitem__(self, i: int) -> str:
+        return decode_word(self.__codes[i])
+
+    def words(self) -> list[str]:
+        return [decode_word(code) for code in self.__codes]
+
+    def size_bytes(self) -> int:
+        return self.__codes.buffer_info()[1] * self.__codes.itemsize
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable
+from providers.WordIndex import WordIndex, is_valid_word
+
+# loads one page of candidate words, returning the words and the total number of pages
+PageLoader = Callable[[int], Awaitable[tuple[list[str], int]]]
+
+
+def local_page_loader(words: list[str], page_size: int = 50) -> PageLoader:
+    async def load_page(page: int) -> tuple[list[str], int]:
+        start = (page - 1) * page_size
+        return words[start:start + page_size], max(1, -(-len(words) // page_size))
+    return load_page
+
+
+# candidate game words kept in memory and refilled in the background, so picking a word never waits on the network
+class WordPool:
+    def __init__(
+            self,
+            load_page: PageLoader,
+            capacity: int = 200,
+            low_water: int = 50,
+            fallback_words: list[str] | None = None,
+            word_index: WordIndex | None = None
+    ):
+        self.load_page = load_page
+        self.capacity = capacity
+        self.low_water = low_water
+        self.fallback_words = fallback_words
+        # words that cannot be guessed would make the day unwinnable, so only words in the index are pooled
+        self.word_index = word_index
+        self.__candidates: list[str] = []
+        self.__pooled: set[str] = set()
+        self.__excluded: set[str] = set()
+        self.__pages: list[int] = []
+        self.__total_pages: int | None = None
+        self.__refill_task: asyncio.Task | None = None
+        self.__words_added = asyncio.Event()
+        self.pages_loaded = 0
+        self.fallback_picks = 0
+        self.words_skipped = 0
+
+    def __len__(self) -> int:
+        return len(self.__candidates)
+
+    def exclude(self, words):
+        # words already used as daily words are never handed out again
+        for word in words:
+            self.__excluded.add(word)
+            if word in self.__pooled:
+                self.__pooled.discard(word)
+                self.__candidates.remove(word)
+
+    def start_refill(self) -> asyncio.Task:
+        if self.__refill_task is None or self.__refill_task.done():
+            self.__refill_task = asyncio.create_task(self.__refill())
+        return self.__refill_task
+
+    async def pick(self) -> str:
+        if len(self.__candidates) <= self.low_water:
+            self.start_refill()
+        if len(self.__candidates) == 0:
+            word = self.__pick_fallback()
+            if word is not None:
+                return word
+            # nothing local to serve, so the first pick after startup waits for the first useful page
+            await self.__wait_for_words()
+            if len(self.__candidates) == 0:
+                return ""
+        # swap the picked word with the last one so removal is O(1)
+        i = random.randrange(len(self.__candidates))
+        self.__candidates[i], self.__candidates[-1] = self.__candidates[-1], self.__candidates[i]
+        word = self.__candidates.pop()
+        self.__pooled.discard(word)
+        self.__excluded.add(word)
+        return word
+
+    async def close(self):
+        if self.__refill_task is not None:
+            self.__refill_task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "Candidates": len(self.__candidates),
+            "Excluded": len(self.__excluded),
+            "PagesLoaded": self.pages_loaded,
+            "FallbackPicks": self.fallback_picks,
+            "WordsSkipped": self.words_skipped
+        }
+
+    async def __wait_for_words(self):
+        self.__words_added.clear()
+        refill_task = self.start_refill()
+        words_added = asyncio.ensure_future(self.__words_added.wait())
+        try:
+            await asyncio.wait([refill_task, words_added], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            words_added.cancel()
+
+    def __pick_fallback(self) -> str | None:
+        if not self.fallback_words:
+            return None
+        for _ in range(20):
+            word = random.choice(self.fallback_words)
+            if word not in self.__excluded:
+                self.fallback_picks += 1
+                self.__excluded.add(word)
+                return word
+        return None
+
+    async def __refill(self):
+        # a full pass over every page without finding a new word means the source is used up
+        pages_without_words = 0
+        while len(self.__candidates) < self.capacity:
+            page = self.__next_page()
+            try:
+                words, total_pages = await self.load_page(page)
+            except Exception as e:
+                logging.warning(f"Could not load word page {page}, the pool holds {len(self.__candidates)} words: {e}")
+                return
+            self.pages_loaded += 1
+            if self.__total_pages is None:
+                self.__total_pages = total_pages
+            added = self.__add(words)
+            pages_without_words = 0 if added > 0 else pages_without_words + 1
+            if pages_without_words >= (self.__total_pages or 1):
+                return
+
+    def __next_page(self) -> int:
+        if self.__total_pages is None:
+            return 1
+        if len(self.__pages) == 0:
+            # visit the pages in random order so the pool is not biased towards the start of the alphabet
+            self.__pages = random.sample(range(1, self.__total_pages + 1), self.__total_pages)
+        return self.__pages.pop()
+
+    def __add(self, words: list[str]) -> int:
+        added = 0
+        for word in words:
+            word = word.lower()
+            if not is_valid_word(word) or word in self.__pooled or word in self.__excluded:
+                continue
+            if self.word_index is not None and word not in self.word_index:
+                self.words_skipped += 1
+                continue
+            self.__candidates.append(word)
+            self.__pooled.add(word)
+            added += 1
+        if added > 0:
+            self.__words_added.set()
+        return added
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING
+from providers.CircuitBreaker import CircuitBreaker, CircuitOpenError
+from providers.Retry import backoff_seconds
+
+WORDS_API_URL = "https://wordsapiv1.p.rapidapi.com"
+WORDS_API_HOST = "wordsapiv1.p.rapidapi.com"
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class WordsApiError(Exception):
+    pass
+
+
+# pooled async client for wordsapi: keep-alive connections, timeouts, bounded retries and a circuit breaker
+class WordsApiClient:
+    def __init__(
+            self,
+            api_key: str,
+            base_url: str = WORDS_API_URL,
+            connect_timeout: float = 2.0,
+            read_timeout: float = 5.0,
+            max_retries: int = 2,
+            max_connections: int = 20,
+            circuit_breaker: CircuitBreaker | None = None,
+            transport: "httpx.AsyncBaseTransport | None" = None
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.max_connections = max_connections
+        self.circuit_breaker = circuit_breaker or CircuitBreaker("wordsapi")
+        self.transport = transport
+        self.__client: "httpx.AsyncClient | None" = None
+        self.__create_lock = threading.Lock()
+
+    def prewarm(self):
+        # importing httpx and loading the certificates for its ssl context is the slow part of the first call
+        self.__get_client()
+
+    async def get(self, path: str, params: dict | None = None) -> "httpx.Response":
+        # 4xx responses other than 429 are returned, the caller decides what they mean
+        self.circuit_breaker.before_call()
+        try:
+            response = await self.__get_with_retries(path, params)
+        except BaseException:
+            # cancellations and unexpected errors count as failures too, otherwise a half open trial would never end
+            self.circuit_breaker.record_failure()
+            raise
+        self.circuit_breaker.record_success()
+        return response
+
+    async def close(self):
+        if self.__client is not None:
+            await self.__client.aclose()
+
+    async def __get_with_retries(self, path: str, params: dict | None) -> "httpx.Response":
+        client = self.__get_client()
+        import httpx
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.get(path, params=params)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    return response
+                error = WordsApiError(f"WordsAPI responded {response.status_code} for {path}")
+            except httpx.TransportError as te:
+                error = WordsApiError(f"WordsAPI request for {path} failed: {te!r}")
+            if attempt < self.max_retries:
+                logging.info(f"{error}, retrying")
+                await asyncio.sleep(backoff_seconds(attempt, 0.1, 1.0))
+        raise error
+
+    def __get_client(self) -> "httpx.AsyncClient":
+        # prewarm creates the client on an executor thread, possibly while the first request needs it
+        with self.__create_lock:
+            if self.__client is not None:
+                return self.__client
+            import httpx
+            self.__client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "X-RapidAPI-Key": self.api_key or "",
+                    "X-RapidAPI-Host": WORDS_API_HOST,
+                },
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                transport=self.transport
+            )
+            return self.__client
+
@@ -1,60 +1,85 @@
 import logging
-import requests
 import random
 from models.GameWord import GameWord
 from models.GameTurn import GameTurn
 from models.GameTurnResult import GameTurnResult
+from providers.WordIndex import WordIndex
+from providers.ScoringEngine import score_word, score_batch, encode_words, CORRECT, MISPLACED
+from providers.WordPool import WordPool
+from providers.WordsApiClient import WordsApiClient, WordsApiError, CircuitOpenError
 
 
 class WordsProvider:
-    def __init__(self, api_key: str):
-        self.endpoint = "https://wordsapiv1.p.rapidapi.com"
-        self.api_key = api_key
-        self.headers = {
-            "X-RapidAPI-Key": self.api_key,
-            "X-RapidAPI-Host": "wordsapiv1.p.rapidapi.com",
-        }
+    def __init__(
+            self,
+            api_key: str,
+            word_index: WordIndex | None = None,
+            remote_fallback: bool = True,
+            api_client: WordsApiClient | None = None,
+            word_pool: WordPool | None = None
+    ):
+        self.api_client = api_client or WordsApiClient(api_key)
+        self.word_pool = word_pool
+        self.word_index = word_index
+        self.remote_fallback = remote_fallback
 
-    def get_random_word(self) -> str:
+    async def get_random_word(self) -> str:
+        if self.word_pool is not None:
+            return await self.word_pool.pick()
         try:
-            query_string_params = {
-                "letters": 5,
-                "partsOfSpeech": "noun",
-                "limit": 50,
-                "page": 1,
-                "hasDetails": "hasCategories"
-            }
-            request_url = f"{self.endpoint}/words/"
-            res = requests.get(request_url, headers=self.headers, params=query_string_params)
-            json_res = res.json()
-            words: list[str] = json_res["results"]["data"]
-            logging.info(f"Pulled words from the api: ${words}")
-            return random.choice(words)
-        except requests.RequestException as re:
-            logging.error(re)
+            words, _ = await self.get_word_page(1)
+            return random.choice(self.playable_words(words))
+        except (WordsApiError, CircuitOpenError, IndexError) as we:
+            logging.error(we)
             return ""
 
-    def does_word_exist(self, word_attempt: str) -> bool:
+    async def get_word_page(self, page: int, page_size: int = 50) -> tuple[list[str], int]:
+        query_string_params = {
+            "letters": 5,
+            "partsOfSpeech": "noun",
+            "limit": page_size,
+            "page": page,
+            "hasDetails": "hasCategories"
+        }
+        res = await self.api_client.get("/words/", query_string_params)
+        if res.status_code != 200:
+            raise WordsApiError(f"WordsAPI responded {res.status_code} when listing words")
+        json_res = res.json()
+        words: list[str] = json_res["results"]["data"]
+        total_pages = max(1, -(-json_res["results"].get("total", len(words)) // page_size))
+        logging.debug(f"Pulled {len(words)} words from page {page} of {total_pages} from the api")
+        return words, total_pages
+
+    def playable_words(self, words: list[str]) -> list[str]:
+        # a game word has to be accepted as a guess, and only the word index is sure to accept it
+        words = [word.lower() for word in words]
+        if self.word_index is None:
+            return words
+        return [word for word in words if word in self.word_index]
+
+    async def does_word_exist(self, word_attempt: str) -> bool:
+        if self.word_index is not None:
+            if word_attempt in self.word_index:
+                return True
+            if not self.remote_fallback:
+                return False
+        return await self.__does_word_exist_remote(word_attempt)
+
+    async def __does_word_exist_remote(self, word_attempt: str) -> bool:
         try:
-            request_url = f"{self.endpoint}/words/{word_attempt}/frequency"
-            res = requests.get(request_url, headers=self.headers)
+            res = await self.api_client.get(f"/words/{word_attempt}/frequency")
             return 200 <= res.status_code < 300
-        except requests.RequestException as re:
-            logging.error(re)
+        except (WordsApiError, CircuitOpenError) as we:
+            logging.error(we)
             return False
 
+    async def close(self):
+        if self.word_pool is not None:
+            await self.word_pool.close()
+        await self.api_client.close()
+
     def compare_word_attempt(self, game_word: GameWord, game_turn: GameTurn) -> GameTurnResult:
-        correct_letters = []
-        misplaced_letters = []
-        # find correctly placed letters
-        winning_game_word = game_word.word
-        for i, letter in enumerate(game_turn.word):
-            if letter == winning_game_word[i]:
-                correct_letters.append(i)
-        # find misplaced letters
-        for i, letter in enumerate(game_turn.word):
-            if letter in winning_game_word and i not in correct_letters:
-                misplaced_letters.append(i)
+        correct_letters, misplaced_letters = score_word(game_turn.word, game_word.word)
         game_win = game_word.word == game_turn.word
         game_turn_result = GameTurnResult(
             word_attempt=game_turn.word,
@@ -64,3 +89,17 @@ class WordsProvider:
         )
         return game_turn_result
 
+    def compare_word_attempts(self, word_attempts: list[str], answer: str) -> list[GameTurnResult]:
+        # scores many guesses against one answer in a single numpy pass, e.g. to rebuild a game's feedback
+        if len(word_attempts) == 0:
+            return []
+        scores = score_batch(encode_words(word_attempts), encode_words([answer]))
+        game_turn_results = []
+        for word_attempt, word_scores in zip(word_attempts, scores.tolist()):
+            game_turn_results.append(GameTurnResult(
+                word_attempt=word_attempt,
+                correct_letters=[i for i, score in enumerate(word_scores) if score == CORRECT],
+                misplaced_letters=[i for i, score in enumerate(word_scores) if score == MISPLACED],
+                win=word_attempt == answer
+            ))
+        return game_turn_results
@@ -2,41 +2,59 @@ from fastapi import Request, Depends, APIRouter
 from providers.AuthenticationProvider import AuthenticationProvider
 from models.User import UserRequestModel, UserLoginRequestModel, RefreshRequestModel
 from middleware.AuthMiddleware import validate_token
+from middleware.AdmissionMiddleware import limit_user, limit_username
+from middleware.ProviderMiddleware import get_auth_provider, get_executor
+from providers.BlockingExecutor import BlockingExecutor
 
 
 auth_router = APIRouter(prefix="/auth")
 
 
 @auth_router.post("/register", status_code=200)
-async def register_user(req: Request, user: UserRequestModel):
-    auth_provider: AuthenticationProvider = req.state.auth_provider
-    user = auth_provider.signup_user(user)
+async def register_user(
+        user: UserRequestModel,
+        auth_provider: AuthenticationProvider = Depends(get_auth_provider),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    user = await executor.run(auth_provider.signup_user, user)
     return {"user": user}
 
 
 @auth_router.post("/login", status_code=200)
-async def login(req: Request, user_login: UserLoginRequestModel):
-    auth_provider: AuthenticationProvider = req.state.auth_provider
-    auth_result: dict = auth_provider.signin_user(user_login)
+async def login(
+        req: Request,
+        user_login: UserLoginRequestModel,
+        auth_provider: AuthenticationProvider = Depends(get_auth_provider),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    # per username as well as per ip, so spreading guesses for one account over many addresses does not help
+    await limit_username(req, "login", user_login.username)
+    auth_result: dict = await executor.run(auth_provider.signin_user, user_login)
     return {
         "AuthResult": auth_result
     }
 
 
 @auth_router.post("/refresh", status_code=200)
-async def refresh(req: Request, refresh_request: RefreshRequestModel):
-    auth_provider: AuthenticationProvider = req.state.auth_provider
-    auth_result: dict = auth_provider.refresh_token(refresh_request)
+async def refresh(
+        refresh_request: RefreshRequestModel,
+        auth_provider: AuthenticationProvider = Depends(get_auth_provider),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    auth_result: dict = await executor.run(auth_provider.refresh_token, refresh_request)
     return {
         "AuthResult": auth_result
     }
 
 
-@auth_router.get("/user", status_code=200, dependencies=[Depends(validate_token)])
-async def get_user(req: Request):
-    auth_provider: AuthenticationProvider = req.state.auth_provider
+@auth_router.get("/user", status_code=200, dependencies=[Depends(validate_token), Depends(limit_user)])
+async def get_user(
+        req: Request,
+        auth_provider: AuthenticationProvider = Depends(get_auth_provider),
+        executor: BlockingExecutor = Depends(get_executor)
+):
     token = req.headers["authorization"].split(" ")[1]
-    user_info = auth_provider.get_user_info(token)
+    user_info = await executor.run(auth_provider.get_user_info, token)
     return {
         "UserInfo": user_info
     }
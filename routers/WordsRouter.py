@@ -1,11 +1,24 @@
+import json
+import logging
 from providers.WordsProvider import WordsProvider
-from providers.DynamoProvider import DynamoProvider
-from fastapi import Request, HTTPException, Depends, APIRouter
-from models.GameWord import GameWord
+from providers.DynamoProvider import DynamoProvider, check_game_rules
+from fastapi import Request, Response, HTTPException, Depends, APIRouter, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from models.GameTurn import GameTurn
 from datetime import date, datetime
 from pydantic import BaseModel
 from middleware.AuthMiddleware import validate_token
+from middleware.AdmissionMiddleware import limit_user
+from middleware.HttpCache import cached_json_response, until_midnight, validator_etag, etag_matches, \
+    not_modified_response, IMMUTABLE, REVALIDATE
+from middleware.ProviderMiddleware import get_dynamo_provider, get_words_provider, get_executor, \
+    get_game_word_provider, get_hint_provider, get_stats_provider, get_providers
+from providers.BlockingExecutor import BlockingExecutor
+from providers.GameWordProvider import GameWordProvider
+from providers.HintProvider import HintProvider
+from providers.Pipeline import StageTimer, run_concurrently
+from providers.StatsProvider import StatsProvider
 
 
 class GameWordAttempt(BaseModel):
@@ -15,110 +28,223 @@ class GameWordAttempt(BaseModel):
 words_router = APIRouter(prefix="/word")
 
 
-@words_router.get("/game-word", status_code=200, dependencies=[Depends(validate_token)])
-async def get_game_word(req: Request):
-    words_provider: WordsProvider = req.state.words_provider
-    dynamo_provider: DynamoProvider = req.state.dynamo_provider
-    current_date = date.today()
-    current_game_word = dynamo_provider.get_game_for_date(current_date)
-    if current_game_word is None:
-        random_word = words_provider.get_random_word()
-        if random_word == "":
-            raise HTTPException(400, {
-                "Message": "Failed to get game word."
-            })
-        current_game_word = GameWord(
-            "sys",
-            random_word,
-            datetime.fromisoformat(current_date.isoformat()),
-            current_date
-        )
-        dynamo_provider.save_word_game(current_game_word)
-    return {
+@words_router.get("/game-word", status_code=200, dependencies=[Depends(validate_token), Depends(limit_user)])
+async def get_game_word(req: Request, game_word_provider: GameWordProvider = Depends(get_game_word_provider)):
+    current_game_word = await game_word_provider.get_or_create_game_for_date(date.today())
+    # the word does not change until the next game starts at midnight
+    return cached_json_response(req, {
         "GameWord": current_game_word.word
-    }
+    }, until_midnight())
 
 
-@words_router.put("/check-word", status_code=200, dependencies=[Depends(validate_token)])
-async def check_word_attempt(req: Request, game_word_attempt: GameWordAttempt):
+@words_router.put("/check-word", status_code=200, dependencies=[Depends(validate_token), Depends(limit_user)])
+async def check_word_attempt(
+        req: Request,
+        response: Response,
+        game_word_attempt: GameWordAttempt,
+        words_provider: WordsProvider = Depends(get_words_provider),
+        dynamo_provider: DynamoProvider = Depends(get_dynamo_provider),
+        game_word_provider: GameWordProvider = Depends(get_game_word_provider),
+        executor: BlockingExecutor = Depends(get_executor)
+):
     username: str = req.state.username
-    words_provider: WordsProvider = req.state.words_provider
-    dynamo_provider: DynamoProvider = req.state.dynamo_provider
     word_attempt = game_word_attempt.word.lower().strip()
-    if not words_provider.does_word_exist(word_attempt):
-        raise HTTPException(400, {"Message": "Bad word attempt! The word must consist of 5 alphabetic characters"})
-    # check word against game word
     timestamp = datetime.now().timestamp()
-    game_word = dynamo_provider.get_game_for_date(date.fromtimestamp(timestamp))
-    if game_word is None:
-        # get a new word for the day
-        random_word = words_provider.get_random_word()
-        if random_word == "":
-            raise HTTPException(500, {
-                "Message": "Failed to get game word."
-            })
-        current_date = date.today()
-        current_game_word = GameWord(
-            username="sys",
-            word=random_word,
-            game_date=current_date,
-            game_timestamp=datetime.fromisoformat(current_date.isoformat())
+    game_date = date.fromtimestamp(timestamp)
+    timer = StageTimer()
+
+    async def validate_word_attempt():
+        if not await timer.time("word_check", words_provider.does_word_exist(word_attempt)):
+            raise HTTPException(400, {"Message": "Bad word attempt! The word must consist of 5 alphabetic characters"})
+
+    try:
+        # the word check, the game lookup and the summary read are independent, an invalid word cancels the others
+        _, game_word, game_summary = await run_concurrently(
+            validate_word_attempt(),
+            timer.time("game_word", game_word_provider.get_or_create_game_for_date(game_date)),
+            timer.time("summary", executor.run(dynamo_provider.get_user_game_summary, game_date, username))
         )
-        dynamo_provider.save_word_game(current_game_word)
-        game_word = current_game_word
-    game_date = game_word.game_date
-    game_turn = GameTurn(
-        username=username,
-        game_date=game_date,
-        game_timestamp=datetime.fromtimestamp(timestamp),
-        word=word_attempt,
-        win=False,
-        game_id=game_word.game_id
-    )
-    game_attempts = dynamo_provider.get_user_attempts_for_game(
-        game_date,
-        username,
-        game_word.game_id
-    )
-    # check if user has already won
-    for game_attempt in game_attempts:
-        if game_attempt.win is True:
-            # do not save word attempt
-            raise HTTPException(400, {
-                "Message": f"You already won the game for date {game_date}"
-            })
-    if len(game_attempts) > 5:
-        raise HTTPException(400, {
-            "Message": "You cannot have more than 6 attempts per game!"
-        })
-    if game_word.word == game_turn.word:
-        game_turn.win = True
-    dynamo_provider.save_user_attempt(game_turn)
+        check_game_rules(game_summary, game_date)
+        game_turn = GameTurn(
+            username=username,
+            game_date=game_word.game_date,
+            game_timestamp=datetime.fromtimestamp(timestamp),
+            word=word_attempt,
+            win=game_word.word == word_attempt,
+            game_id=game_word.game_id
+        )
+        # a single conditional write that also rejects the attempt if the game is over or another attempt got in first
+        previous_attempts = 0 if game_summary is None else game_summary.attempt_count
+        providers = get_providers(req)
+        # in batched mode only the summary is written now, the turn follows with the next batch.
+        # the turn is journaled first so a crash right after the summary write cannot lose it
+        write_behind = providers.turn_write_queue is not None and not providers.turn_write_queue.is_full()
+        turn_seq = providers.turn_write_queue.journal_turn(game_turn) if write_behind else None
+        try:
+            await timer.time("save", executor.run(
+                dynamo_provider.record_user_attempt,
+                game_turn,
+                previous_attempts,
+                not write_behind
+            ))
+        except Exception:
+            if write_behind:
+                providers.turn_write_queue.discard(turn_seq)
+            raise
+        if write_behind:
+            providers.turn_write_queue.enqueue(game_turn, turn_seq)
+        if providers.stats_provider is not None:
+            providers.stats_provider.record_attempt(game_turn, previous_attempts + 1)
+    finally:
+        logging.debug(f"check-word stage timings for {username}: {timer.timings}")
+    response.headers["Server-Timing"] = timer.server_timing()
     game_turn_result = words_provider.compare_word_attempt(game_word, game_turn)
     return game_turn_result.to_json_response()
 
 
-@words_router.get("/game-attempts/{game_date}", status_code=200, dependencies=[Depends(validate_token)])
-async def get_game_attempts_by_date(req: Request, game_date: str):
+@words_router.get("/hint", status_code=200, dependencies=[Depends(validate_token), Depends(limit_user)])
+async def get_hint(
+        req: Request,
+        dynamo_provider: DynamoProvider = Depends(get_dynamo_provider),
+        game_word_provider: GameWordProvider = Depends(get_game_word_provider),
+        hint_provider: HintProvider = Depends(get_hint_provider),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    username: str = req.state.username
+    game_word = await game_word_provider.get_or_create_game_for_date(date.today())
+    game_summary = await executor.run(dynamo_provider.get_user_game_summary, game_word.game_date, username)
+    guesses = [] if game_summary is None else game_summary.guesses
+    hint = await executor.run(hint_provider.get_hint, guesses, game_word.word)
+    if hint is None:
+        raise HTTPException(404, {
+            "Message": "No hint is available for today's word."
+        })
+    return {
+        "Hint": hint
+    }
+
+
+@words_router.get("/stats/me", status_code=200, dependencies=[Depends(validate_token), Depends(limit_user)])
+async def get_user_stats(req: Request, stats_provider: StatsProvider = Depends(get_stats_provider)):
+    user_stats = await stats_provider.get_user_stats(req.state.username)
+    return cached_json_response(req, user_stats.to_json_response(), REVALIDATE)
+
+
+@words_router.get("/stats/{game_date}", status_code=200, dependencies=[Depends(validate_token), Depends(limit_user)])
+async def get_game_stats(req: Request, game_date: date, stats_provider: StatsProvider = Depends(get_stats_provider)):
+    game_stats = await stats_provider.get_game_stats(game_date)
+    return cached_json_response(req, game_stats.to_json_response(), REVALIDATE)
+
+
+@words_router.get(
+    "/stats/{game_date}/leaderboard",
+    status_code=200,
+    dependencies=[Depends(validate_token), Depends(limit_user)]
+)
+async def get_leaderboard(req: Request, game_date: date, stats_provider: StatsProvider = Depends(get_stats_provider)):
+    leaderboard = await stats_provider.get_leaderboard(game_date)
+    return cached_json_response(req, leaderboard.to_json_response(), REVALIDATE)
+
+
+@words_router.get(
+    "/game-attempts/{game_date}",
+    status_code=200,
+    dependencies=[Depends(validate_token), Depends(limit_user)]
+)
+async def get_game_attempts_by_date(
+        req: Request,
+        game_date: str,
+        dynamo_provider: DynamoProvider = Depends(get_dynamo_provider),
+        game_word_provider: GameWordProvider = Depends(get_game_word_provider),
+        executor: BlockingExecutor = Depends(get_executor)
+):
     username: str = req.state.username
-    dynamo_provider: DynamoProvider = req.state.dynamo_provider
-    game_word = dynamo_provider.get_game_for_date(date.fromisoformat(game_date))
-    attempts: list[GameTurn] = dynamo_provider.get_user_attempts_for_game(
-        game_word.date,
+    game_word = await game_word_provider.get_game_for_date(date.fromisoformat(game_date))
+    if game_word is None:
+        raise HTTPException(404, {
+            "Message": f"No game found for date {game_date}"
+        })
+    pending_turns = get_pending_turns(req, username)
+    etag = None
+    if game_word.game_date < date.today():
+        # attempts on a past game can never change, so the summary identifies them: a client that already holds
+        # them is answered from a single item read, without querying the turns or encoding them
+        game_summary = await executor.run(dynamo_provider.get_user_game_summary, game_word.game_date, username)
+        if game_summary is not None:
+            etag = validator_etag(username, game_summary.game_id, game_summary.attempt_count, *game_summary.guesses)
+            if etag_matches(req.headers.get("if-none-match"), etag):
+                return not_modified_response(etag, IMMUTABLE)
+    attempts: list[GameTurn] = await executor.run(
+        dynamo_provider.get_user_attempts_for_game,
+        game_word.game_date,
         username,
         game_word.game_id
     )
+    attempts = with_pending_turns(attempts, [turn for turn in pending_turns if turn.game_id == game_word.game_id])
     if len(attempts) < 1:
         raise HTTPException(404, {
             "Message": "No game attempts found for this game!"
         })
-    return {"GameAttempts": attempts}
+    # attempts on past games can never change, today's may grow so clients revalidate them
+    cache_control = IMMUTABLE if game_word.game_date < date.today() else REVALIDATE
+    return cached_json_response(req, {"GameAttempts": attempts}, cache_control, etag)
 
 
-@words_router.get("/user-game-attempts", status_code=200, dependencies=[Depends(validate_token)])
-async def get_user_game_attempts(req: Request, last_timestamp: float = 0):
+@words_router.get("/user-game-attempts", status_code=200, dependencies=[Depends(validate_token), Depends(limit_user)])
+async def get_user_game_attempts(
+        req: Request,
+        cursor: str | None = None,
+        limit: int = Query(25, ge=1, le=100),
+        stream: bool = False,
+        dynamo_provider: DynamoProvider = Depends(get_dynamo_provider),
+        executor: BlockingExecutor = Depends(get_executor)
+):
     username: str = req.state.username
-    dynamo_provider: DynamoProvider = req.state.dynamo_provider
-    game_attempts = dynamo_provider.get_user_game_turns(username, datetime.fromtimestamp(last_timestamp))
-    return game_attempts
+    pending_turns = get_pending_turns(req, username)
+    if stream:
+        return StreamingResponse(
+            stream_game_turns(dynamo_provider, executor, username, cursor, limit, pending_turns),
+            media_type="application/x-ndjson"
+        )
+    page = await executor.run(dynamo_provider.get_user_game_turns, username, cursor, limit)
+    return with_pending_page(page, pending_turns)
+
+
+def get_pending_turns(req: Request, username: str) -> list[GameTurn]:
+    # taken before reading dynamo, so a turn written by the queue in between is found by the read instead
+    turn_write_queue = get_providers(req).turn_write_queue
+    return [] if turn_write_queue is None else turn_write_queue.pending_turns(username)
+
+
+def with_pending_turns(game_turns: list[GameTurn], pending_turns: list[GameTurn]) -> list[GameTurn]:
+    if len(pending_turns) == 0:
+        return game_turns
+    saved_timestamps = {game_turn.game_timestamp for game_turn in game_turns}
+    return game_turns + [turn for turn in pending_turns if turn.game_timestamp not in saved_timestamps]
+
+
+def with_pending_page(page: dict, pending_turns: list[GameTurn]) -> dict:
+    # pending turns are the newest, so they belong at the end of the last page
+    if page["NextCursor"] is not None or len(pending_turns) == 0:
+        return page
+    game_turns = with_pending_turns(page["GameTurns"], pending_turns)
+    return {**page, "GameTurns": game_turns, "Count": len(game_turns)}
+
 
+async def stream_game_turns(
+        dynamo_provider: DynamoProvider,
+        executor: BlockingExecutor,
+        username: str,
+        cursor: str | None,
+        page_size: int,
+        pending_turns: list[GameTurn] | None = None
+):
+    # pages are fetched one at a time as the client reads, so memory stays bounded by the page size
+    while True:
+        page = await executor.run(dynamo_provider.get_user_game_turns, username, cursor, page_size)
+        page = with_pending_page(page, pending_turns or [])
+        for game_turn in page["GameTurns"]:
+            yield json.dumps(jsonable_encoder(game_turn)) + "\n"
+        cursor = page["NextCursor"]
+        if cursor is None:
+            break
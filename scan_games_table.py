@@ -0,0 +1,200 @@
+import argparse
+import dataclasses
+import gzip
+import importlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from models.RateLimitWindow import RateLimitWindow
+from providers.DynamoProvider import DynamoProvider
+from providers.ProviderContainer import create_dynamo_client
+
+
+# parallel segmented scan of PyWordGame for exports and key-schema migrations
+# usage: python scan_games_table.py export --segments 8 --output-dir export/
+#        python scan_games_table.py rewrite --target-table PyWordGameV2 --transform migrations:by_game_id
+# progress is checkpointed per segment, so re-running the same command resumes where it stopped.
+# a page is checkpointed after it is written, so a crash can repeat at most one page per segment.
+class CapacityBudget:
+    def __init__(self, units_per_second: float):
+        self.units_per_second = units_per_second
+        self.__available = units_per_second
+        self.__refilled_at = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def consume(self, units: float):
+        with self.__lock:
+            now = time.monotonic()
+            self.__available = min(
+                self.units_per_second,
+                self.__available + (now - self.__refilled_at) * self.units_per_second
+            )
+            self.__refilled_at = now
+            self.__available -= units
+            wait_seconds = -self.__available / self.units_per_second if self.__available < 0 else 0
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+
+class SegmentCheckpoint:
+    def __init__(self, checkpoint_dir: str, segment: int):
+        self.path = os.path.join(checkpoint_dir, f"segment-{segment}.json")
+
+    def load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {"LastEvaluatedKey": None, "Done": False, "ItemCount": 0}
+        with open(self.path) as checkpoint_file:
+            return json.load(checkpoint_file)
+
+    def save(self, state: dict):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump(state, checkpoint_file)
+        os.replace(temp_path, self.path)
+
+
+class NdjsonExportSink:
+    def __init__(self, output_dir: str, segment: int):
+        self.__file = gzip.open(os.path.join(output_dir, f"segment-{segment}.ndjson.gz"), "at")
+
+    def write(self, items: list[dict], models: list):
+        for model in models:
+            self.__file.write(model_to_json(model))
+            self.__file.write("\n")
+        self.__file.flush()
+
+    def close(self):
+        self.__file.close()
+
+
+class RewriteSink:
+    def __init__(self, target_provider: DynamoProvider, transform):
+        self.target_provider = target_provider
+        self.transform = transform
+
+    def write(self, items: list[dict], models: list):
+        write_requests = []
+        for item, model in zip(items, models):
+            new_item = self.transform(item, model)
+            if new_item is not None:
+                write_requests.append({"PutRequest": {"Item": new_item}})
+        unprocessed = self.target_provider.batch_write_items(write_requests)
+        if len(unprocessed) > 0:
+            raise RuntimeError(f"{len(unprocessed)} items were not written to {self.target_provider.table_name}")
+
+    def close(self):
+        pass
+
+
+def model_to_json(model) -> str:
+    return json.dumps(
+        {"Type": type(model).__name__, **dataclasses.asdict(model)},
+        default=lambda value: value.isoformat()
+    )
+
+
+def copy_item(item: dict, model) -> dict:
+    return item
+
+
+def load_transform(transform_path: str | None):
+    if transform_path is None:
+        return copy_item
+    module_name, function_name = transform_path.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def scan_segment(
+        dynamo_provider: DynamoProvider,
+        segment: int,
+        total_segments: int,
+        sink,
+        checkpoint: SegmentCheckpoint,
+        budget: CapacityBudget,
+        page_size: int
+) -> int:
+    state = checkpoint.load()
+    if state["Done"]:
+        logging.info(f"Segment {segment} already finished with {state['ItemCount']} items")
+        return state["ItemCount"]
+    try:
+        while True:
+            page = dynamo_provider.scan_segment(segment, total_segments, state["LastEvaluatedKey"], page_size)
+            items, models = [], []
+            for item in page["Items"]:
+                model = dynamo_provider.to_model(item)
+                # rate limit windows are short lived counters, not game data
+                if isinstance(model, RateLimitWindow):
+                    continue
+                items.append(item)
+                models.append(model)
+            sink.write(items, models)
+            state = {
+                "LastEvaluatedKey": page["LastEvaluatedKey"],
+                "Done": page["LastEvaluatedKey"] is None,
+                "ItemCount": state["ItemCount"] + len(models)
+            }
+            checkpoint.save(state)
+            budget.consume(page["ConsumedCapacity"])
+            if state["Done"]:
+                logging.info(f"Segment {segment} finished with {state['ItemCount']} items")
+                return state["ItemCount"]
+    finally:
+        sink.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Scan PyWordGame in parallel to export or rewrite its items")
+    parser.add_argument("mode", choices=["export", "rewrite"])
+    parser.add_argument("--segments", type=int, default=8)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--capacity", type=float, default=100.0,
+                        help="read capacity units per second shared by all segments")
+    parser.add_argument("--output-dir", default="export")
+    parser.add_argument("--checkpoint-dir", default="scan-checkpoints")
+    parser.add_argument("--target-table", help="table written to in rewrite mode")
+    parser.add_argument("--transform", help="module:function turning a scanned item into the item to write")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.mode == "rewrite" and args.target_table is None:
+        parser.error("rewrite mode needs --target-table")
+
+    os.makedirs(args.checkpoint_dir, exist_ok=True)
+    if args.mode == "export":
+        os.makedirs(args.output_dir, exist_ok=True)
+    dynamo_client = create_dynamo_client(Config(max_pool_connections=args.segments * 2))
+    dynamo_provider = DynamoProvider(dynamo_client)
+    transform = load_transform(args.transform)
+    budget = CapacityBudget(args.capacity)
+
+    def run_segment(segment: int) -> int:
+        if args.mode == "export":
+            sink = NdjsonExportSink(args.output_dir, segment)
+        else:
+            sink = RewriteSink(DynamoProvider(dynamo_client, args.target_table), transform)
+        return scan_segment(
+            dynamo_provider,
+            segment,
+            args.segments,
+            sink,
+            SegmentCheckpoint(args.checkpoint_dir, segment),
+            budget,
+            args.page_size
+        )
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.segments) as pool:
+            item_counts = list(pool.map(run_segment, range(args.segments)))
+        logging.info(f"Processed {sum(item_counts)} items in {args.segments} segments")
+        return 0
+    finally:
+        dynamo_provider.close_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
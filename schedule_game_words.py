@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+from models.GameWord import GameWord
+from providers.DynamoProvider import DynamoProvider
+from providers.ProviderContainer import create_dynamo_client, create_words_api_client
+from providers.WordIndex import WordIndex, DEFAULT_WORD_LIST_PATH, DEFAULT_GUESS_LIST_PATH
+from providers.WordPool import WordPool
+from providers.WordsProvider import WordsProvider
+
+
+# pre-generates the word of the day so requests never have to create it
+# usage: python schedule_game_words.py --days 30 --no-repeat-days 365
+def pick_word(next_word, used_words: set[str], max_tries: int) -> str:
+    for _ in range(max_tries):
+        word = next_word()
+        if word != "" and word not in used_words:
+            return word
+    raise RuntimeError(f"Could not find an unused word after {max_tries} tries")
+
+
+def schedule_game_words(
+        dynamo_provider: DynamoProvider,
+        next_word,
+        start_date: date,
+        days: int,
+        no_repeat_days: int,
+        max_tries: int = 20
+) -> list[GameWord]:
+    game_dates = [start_date + timedelta(days=i) for i in range(days)]
+    window_dates = [start_date - timedelta(days=i) for i in range(1, no_repeat_days + 1)]
+    existing_games = dynamo_provider.get_games_for_dates(window_dates + game_dates)
+    used_words = {game.word for game in existing_games}
+    scheduled_dates = {game.game_date for game in existing_games}
+    new_games = []
+    for game_date in game_dates:
+        if game_date in scheduled_dates:
+            continue
+        word = pick_word(next_word, used_words, max_tries)
+        used_words.add(word)
+        new_games.append(GameWord(
+            username="sys",
+            word=word,
+            game_timestamp=datetime.fromisoformat(game_date.isoformat()),
+            game_date=game_date
+        ))
+    return new_games
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate game words ahead of time")
+    parser.add_argument("--days", type=int, default=30, help="number of days to schedule")
+    # today's game may already be in play, so scheduling starts tomorrow unless asked otherwise
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date.today() + timedelta(days=1))
+    parser.add_argument("--no-repeat-days", type=int, default=365,
+                        help="do not reuse a word played within this many days")
+    parser.add_argument("--word-source", choices=["api", "list"], default="api",
+                        help="pick words from WordsAPI or from the local word list")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    dynamo_client = create_dynamo_client()
+    dynamo_provider = DynamoProvider(dynamo_client)
+    # the words api client is async, so it gets one loop for the whole run to keep its connections alive
+    loop = asyncio.new_event_loop()
+    word_list_path = os.getenv("WORD_LIST_PATH", DEFAULT_WORD_LIST_PATH)
+    word_index = WordIndex.from_file(word_list_path)
+    guess_index = WordIndex.from_files([word_list_path, os.getenv("GUESS_LIST_PATH", DEFAULT_GUESS_LIST_PATH)])
+    words_provider = WordsProvider(os.getenv("WORDS_API_KEY"), guess_index, api_client=create_words_api_client())
+    if args.word_source == "api":
+        # the pool walks random pages and keeps only words in the guess index, which players can guess
+        words_provider.word_pool = WordPool(words_provider.get_word_page, word_index=guess_index)
+        next_word = lambda: loop.run_until_complete(words_provider.get_random_word())
+    else:
+        words = word_index.words()
+        next_word = lambda: random.choice(words)
+    try:
+        new_games = schedule_game_words(
+            dynamo_provider,
+            next_word,
+            args.start_date,
+            args.days,
+            args.no_repeat_days
+        )
+        for game in new_games:
+            logging.info(f"{game.game_date.isoformat()}: {game.word}")
+        if args.dry_run or len(new_games) == 0:
+            return 0
+        saved_games = dynamo_provider.save_word_games(new_games)
+        kept_games = [saved for new, saved in zip(new_games, saved_games) if saved.game_id != new.game_id]
+        for game in kept_games:
+            logging.warning(f"{game.game_date.isoformat()} already had a game word, kept {game.word}")
+        logging.info(f"Scheduled {len(new_games) - len(kept_games)} game words")
+        return 0
+    finally:
+        loop.run_until_complete(words_provider.close())
+        loop.close()
+        dynamo_provider.close_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
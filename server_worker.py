@@ -0,0 +1,12 @@
+from uvicorn_worker import UvicornWorker
+
+# seconds of the graceful timeout kept back for the shutdown event, which writes pending turns and statistics
+SHUTDOWN_RESERVE_SECONDS = 5
+
+
+# uvicorn worker for gunicorn that stops waiting for open connections in time for the app to shut down cleanly,
+# rather than being killed by the master once the graceful timeout runs out
+class AppWorker(UvicornWorker):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(1, self.cfg.graceful_timeout - SHUTDOWN_RESERVE_SECONDS)
@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from providers.AdmissionControl import AdmissionController, MemoryRateLimitBackend, RateLimit, DYNAMO
+
+ORIGIN = "https://wordle.example.com"
+
+
+@pytest.fixture
+def client():
+    # an empty ip bucket that barely refills, so every counted request is rejected before reaching a route
+    app.state.providers = SimpleNamespace(admission_controller=AdmissionController(
+        MemoryRateLimitBackend(),
+        {"ip": RateLimit(0.001, 0)},
+        {DYNAMO: 1}
+    ))
+    # not entered as a context manager, so the startup event does not build real providers
+    yield TestClient(app)
+    del app.state.providers
+
+
+def test_rate_limited_cross_origin_request_has_cors_headers(client):
+    response = client.get("/word/game-attempts", headers={"Origin": ORIGIN})
+    assert response.status_code == 429
+    assert response.headers["Access-Control-Allow-Origin"] == ORIGIN
+    assert "Retry-After" in response.headers
+
+
+def test_preflight_is_not_rate_limited(client):
+    response = client.options("/word/game-attempts", headers={
+        "Origin": ORIGIN,
+        "Access-Control-Request-Method": "GET",
+        "Access-Control-Request-Headers": "authorization"
+    })
+    assert response.status_code == 200
+    assert response.headers["Access-Control-Allow-Origin"] == ORIGIN
+    assert app.state.providers.admission_controller.rejected == {}
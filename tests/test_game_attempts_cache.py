@@ -0,0 +1,91 @@
+from datetime import date, datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from benchmarks.fakes import Latency, FakeCognitoClient, FakeDynamoClient, FakeWordsProvider
+from main import app
+from models.GameTurn import GameTurn
+from models.GameWord import GameWord
+from providers.AuthenticationProvider import AuthenticationProvider
+from providers.BlockingExecutor import BlockingExecutor
+from providers.DynamoProvider import DynamoProvider
+from providers.GameWordProvider import GameWordProvider
+from providers.ProviderContainer import ProviderContainer
+from providers.WordIndex import WordIndex
+
+YESTERDAY = date.today() - timedelta(days=1)
+
+
+class QueryCountingDynamoClient(FakeDynamoClient):
+    def __init__(self):
+        super().__init__(Latency())
+        self.queries = 0
+
+    def query(self, **kwargs):
+        self.queries += 1
+        return super().query(**kwargs)
+
+
+@pytest.fixture
+def game():
+    cognito_client = FakeCognitoClient(Latency())
+    dynamo_client = QueryCountingDynamoClient()
+    dynamo_provider = DynamoProvider(dynamo_client)
+    words_provider = FakeWordsProvider(Latency(), WordIndex.from_file())
+    executor = BlockingExecutor(4)
+    game_word = GameWord("sys", "crane", datetime.fromisoformat(YESTERDAY.isoformat()), YESTERDAY)
+    dynamo_provider.save_word_game(game_word)
+    for attempt, word in enumerate(["slate", "crane"]):
+        dynamo_provider.record_user_attempt(GameTurn(
+            username="cached",
+            game_date=YESTERDAY,
+            game_timestamp=datetime.fromisoformat(YESTERDAY.isoformat()) + timedelta(hours=12, minutes=attempt),
+            word=word,
+            win=word == game_word.word,
+            game_id=game_word.game_id
+        ), attempt)
+    app.state.providers = ProviderContainer(
+        cognito_client=cognito_client,
+        dynamo_client=dynamo_client,
+        auth_provider=AuthenticationProvider(cognito_client, "fake-pool", "fake-client", None),
+        dynamo_provider=dynamo_provider,
+        words_provider=words_provider,
+        executor=executor,
+        game_word_provider=GameWordProvider(dynamo_provider, words_provider, executor)
+    )
+    with TestClient(app) as client:
+        client.post("/auth/register", json={
+            "username": "cached",
+            "first_name": "Http",
+            "last_name": "Cache",
+            "email": "cached@example.com",
+            "password": "Cached-password-1"
+        })
+        login = client.post("/auth/login", json={"username": "cached", "password": "Cached-password-1"})
+        client.headers["authorization"] = f"Bearer {login.json()['AuthResult']['AccessToken']}"
+        yield client, dynamo_client
+    del app.state.providers
+
+
+def test_past_game_attempts_revalidate_without_querying_turns(game):
+    client, dynamo_client = game
+    response = client.get(f"/word/game-attempts/{YESTERDAY.isoformat()}")
+    assert response.status_code == 200
+    assert [attempt["word"] for attempt in response.json()["GameAttempts"]] == ["slate", "crane"]
+    assert "immutable" in response.headers["Cache-Control"]
+    queries = dynamo_client.queries
+
+    revalidated = client.get(
+        f"/word/game-attempts/{YESTERDAY.isoformat()}",
+        headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == response.headers["ETag"]
+    assert revalidated.content == b""
+    assert dynamo_client.queries == queries
+
+
+def test_past_game_attempts_with_a_stale_etag_are_sent_again(game):
+    client, dynamo_client = game
+    response = client.get(f"/word/game-attempts/{YESTERDAY.isoformat()}", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert len(response.json()["GameAttempts"]) == 2
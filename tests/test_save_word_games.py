@@ -0,0 +1,67 @@
+from datetime import date, datetime, timedelta
+import boto3
+import pytest
+from moto import mock_aws
+from main import create_games_table
+from models.GameWord import GameWord
+from providers.DynamoProvider import DynamoProvider, TRANSACT_WRITE_LIMIT
+
+START_DATE = date(2030, 1, 1)
+
+
+# counts the transactions while passing every call through to the moto client
+class TransactionCountingClient:
+    def __init__(self, dynamo_client):
+        self.dynamo_client = dynamo_client
+        self.transactions: list[int] = []
+
+    def transact_write_items(self, TransactItems):
+        self.transactions.append(len(TransactItems))
+        return self.dynamo_client.transact_write_items(TransactItems=TransactItems)
+
+    def __getattr__(self, name: str):
+        return getattr(self.dynamo_client, name)
+
+
+@pytest.fixture
+def dynamo_client():
+    with mock_aws():
+        client = boto3.client(
+            "dynamodb",
+            region_name="us-west-1",
+            aws_access_key_id="testing",
+            aws_secret_access_key="testing"
+        )
+        create_games_table(client)
+        yield TransactionCountingClient(client)
+
+
+def new_games(days: int) -> list[GameWord]:
+    game_dates = [START_DATE + timedelta(days=i) for i in range(days)]
+    return [GameWord("sys", f"w{i:04d}", datetime.fromisoformat(game_date.isoformat()), game_date)
+            for i, game_date in enumerate(game_dates)]
+
+
+def test_games_are_written_in_transactions(dynamo_client):
+    dynamo_provider = DynamoProvider(dynamo_client)
+    games = new_games(TRANSACT_WRITE_LIMIT + 20)
+    assert dynamo_provider.save_word_games(games) == games
+    assert dynamo_client.transactions == [TRANSACT_WRITE_LIMIT, 20]
+    saved_games = dynamo_provider.get_games_for_dates([game.game_date for game in games])
+    assert sorted(game.game_id for game in saved_games) == sorted(game.game_id for game in games)
+
+
+def test_dates_that_already_have_a_game_keep_it(dynamo_client):
+    dynamo_provider = DynamoProvider(dynamo_client)
+    games = new_games(5)
+    existing_game = GameWord("sys", "taken", games[2].game_timestamp, games[2].game_date)
+    dynamo_provider.save_word_game(existing_game)
+
+    saved_games = dynamo_provider.save_word_games(games)
+    assert [game.game_id for game in saved_games] == \
+        [games[0].game_id, games[1].game_id, existing_game.game_id, games[3].game_id, games[4].game_id]
+    assert saved_games[2].word == "taken"
+    # the cancelled transaction is written again without the taken date
+    assert dynamo_client.transactions == [5, 4]
+    assert dynamo_provider.get_game_for_date(games[2].game_date).word == "taken"
+    assert dynamo_provider.get_game_for_date(games[4].game_date).game_id == games[4].game_id
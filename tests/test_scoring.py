@@ -0,0 +1,25 @@
+import random
+from providers.ScoringEngine import score_word
+from providers.WordIndex import WordIndex
+from providers.WordsProvider import WordsProvider
+
+
+def test_compare_word_attempts_matches_score_word():
+    words = WordIndex.from_file().words()
+    rng = random.Random(7)
+    # repeated letters are where batch and single scoring are most likely to disagree
+    word_attempts = ["speed", "eerie", "llama", "abbey", "geese"] + rng.sample(words, 500)
+    words_provider = WordsProvider("test-key")
+    for answer in ["abide", "erase", "steel", "geese"] + rng.sample(words, 20):
+        results = words_provider.compare_word_attempts(word_attempts, answer)
+        assert len(results) == len(word_attempts)
+        for word_attempt, result in zip(word_attempts, results):
+            correct_letters, misplaced_letters = score_word(word_attempt, answer)
+            assert result.word_attempt == word_attempt
+            assert result.correct_letters == correct_letters
+            assert result.misplaced_letters == misplaced_letters
+            assert result.win == (word_attempt == answer)
+
+
+def test_compare_word_attempts_without_attempts():
+    assert WordsProvider("test-key").compare_word_attempts([], "crane") == []
@@ -0,0 +1,36 @@
+import os
+import socket
+import statistics
+import subprocess
+import sys
+from benchmarks.startup_benchmark import time_to_first_ping
+
+# same default as python -m benchmarks.startup_benchmark, raise it on slow build machines
+BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "2.0"))
+RUNS = int(os.getenv("STARTUP_RUNS", "3"))
+
+# heavy packages that are only imported once a client, verifier or http client is created
+LAZY_MODULES = ["boto3", "botocore", "jwt"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_importing_main_does_not_load_aws_packages():
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, main; print([m for m in {LAZY_MODULES!r} if m in sys.modules])"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_time_to_first_ping_within_budget():
+    seconds = [time_to_first_ping(free_port(), 30.0)[0] for _ in range(RUNS)]
+    median_seconds = statistics.median(seconds)
+    assert median_seconds <= BUDGET_SECONDS, \
+        f"median time to first /ping {median_seconds * 1000:.0f} ms is over the budget of {BUDGET_SECONDS * 1000:.0f} ms"
@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+from benchmarks.fakes import Latency, FakeCognitoClient, FakeDynamoClient, FakeWordsProvider, client_error
+from main import app
+from providers.AuthenticationProvider import AuthenticationProvider
+from providers.BlockingExecutor import BlockingExecutor
+from providers.DynamoProvider import DynamoProvider
+from providers.GameWordProvider import GameWordProvider
+from providers.ProviderContainer import ProviderContainer
+from providers.TurnWriteQueue import TurnWriteQueue, TurnJournal
+from providers.WordIndex import WordIndex
+
+
+# records what the journal held when the summary was written, and can reject the summary write
+class JournalCheckingDynamoClient(FakeDynamoClient):
+    def __init__(self, journal: TurnJournal):
+        super().__init__(Latency())
+        self.journal = journal
+        self.journaled_at_summary_write: list[list[dict]] = []
+        self.reject_summary = False
+
+    def update_item(self, **update):
+        self.journaled_at_summary_write.append(TurnJournal.read(self.journal.path))
+        if self.reject_summary:
+            raise client_error("ProvisionedThroughputExceededException", "Throughput exceeded", "UpdateItem")
+        return super().update_item(**update)
+
+
+@pytest.fixture
+def game(tmp_path):
+    journal = TurnJournal(str(tmp_path))
+    cognito_client = FakeCognitoClient(Latency())
+    dynamo_client = JournalCheckingDynamoClient(journal)
+    dynamo_provider = DynamoProvider(dynamo_client)
+    words_provider = FakeWordsProvider(Latency(), WordIndex.from_file())
+    executor = BlockingExecutor(4)
+    app.state.providers = ProviderContainer(
+        cognito_client=cognito_client,
+        dynamo_client=dynamo_client,
+        auth_provider=AuthenticationProvider(cognito_client, "fake-pool", "fake-client", None),
+        dynamo_provider=dynamo_provider,
+        words_provider=words_provider,
+        executor=executor,
+        game_word_provider=GameWordProvider(dynamo_provider, words_provider, executor),
+        # turns stay queued for the whole test, so the journal only changes when a turn is journaled or discarded
+        turn_write_queue=TurnWriteQueue(dynamo_provider, executor, journal, flush_interval_seconds=3600)
+    )
+    with TestClient(app) as client:
+        client.post("/auth/register", json={
+            "username": "journaled",
+            "first_name": "Turn",
+            "last_name": "Journal",
+            "email": "journaled@example.com",
+            "password": "Journal-password-1"
+        })
+        login = client.post("/auth/login", json={"username": "journaled", "password": "Journal-password-1"})
+        client.headers["authorization"] = f"Bearer {login.json()['AuthResult']['AccessToken']}"
+        yield client, dynamo_client, journal
+    del app.state.providers
+
+
+def journaled_words(journal: TurnJournal) -> list[str]:
+    return [item["word"]["S"] for item in TurnJournal.read(journal.path)]
+
+
+def test_turn_is_journaled_before_the_summary_write(game):
+    client, dynamo_client, journal = game
+    response = client.put("/word/check-word", json={"word": "crane"})
+    assert response.status_code == 200
+    assert [[item["word"]["S"] for item in items] for items in dynamo_client.journaled_at_summary_write] == [["crane"]]
+    assert app.state.providers.turn_write_queue.pending_turns("journaled")[0].word == "crane"
+    assert journaled_words(journal) == ["crane"]
+
+
+def test_turn_is_dropped_from_the_journal_when_the_summary_write_fails(game):
+    client, dynamo_client, journal = game
+    dynamo_client.reject_summary = True
+    response = client.put("/word/check-word", json={"word": "crane"})
+    assert response.status_code == 400
+    assert len(dynamo_client.journaled_at_summary_write) == 1
+    # a replay after a restart must not write a turn the player was told failed
+    assert journaled_words(journal) == []
+    assert app.state.providers.turn_write_queue.pending_turns("journaled") == []
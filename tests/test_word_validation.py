@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from providers.ProviderContainer import load_guess_index
+from providers.WordIndex import DEFAULT_WORD_LIST_PATH, DEFAULT_GUESS_LIST_PATH
+from providers.WordPool import WordPool
+from providers.WordsProvider import WordsProvider
+
+
+class FailingApiClient:
+    # any call means the guess was not settled locally
+    async def get(self, path: str, params: dict | None = None):
+        raise AssertionError(f"WordsAPI was called for {path}")
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture(scope="module")
+def words_provider() -> WordsProvider:
+    guess_index = load_guess_index(DEFAULT_WORD_LIST_PATH, DEFAULT_GUESS_LIST_PATH)
+    return WordsProvider("test-key", guess_index, remote_fallback=False, api_client=FailingApiClient())
+
+
+@pytest.mark.parametrize("word", [
+    "games", "words", "books", "cards", "plays", "tears", "jeans", "tares",
+    "loved", "baked", "tried", "hoped", "pizza", "crane"
+])
+def test_inflected_forms_are_valid_locally(words_provider: WordsProvider, word: str):
+    assert asyncio.run(words_provider.does_word_exist(word))
+
+
+@pytest.mark.parametrize("word", ["zzzzz", "qwert", "aeiou"])
+def test_unknown_words_are_rejected_locally(words_provider: WordsProvider, word: str):
+    assert not asyncio.run(words_provider.does_word_exist(word))
+
+
+def test_every_game_word_is_a_valid_guess(words_provider: WordsProvider):
+    with open(DEFAULT_WORD_LIST_PATH) as word_list:
+        assert all(line.strip() in words_provider.word_index for line in word_list if line.strip())
+
+
+def test_word_pool_skips_words_that_cannot_be_guessed(words_provider: WordsProvider):
+    async def load_page(page: int) -> tuple[list[str], int]:
+        return ["CRANE", "xyzzy", "slate"], 1
+
+    async def pick_all() -> list[str]:
+        word_pool = WordPool(load_page, capacity=10, low_water=0, word_index=words_provider.word_index)
+        return [await word_pool.pick() for _ in range(3)]
+
+    picks = asyncio.run(pick_all())
+    assert sorted(picks[:2]) == ["crane", "slate"]
+    assert picks[2] == ""
@@ -0,0 +1,130 @@
+import asyncio
+import socket
+import threading
+import time
+import pytest
+import uvicorn
+from benchmarks import fake_words_api
+from providers.CircuitBreaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN
+from providers.WordsApiClient import WordsApiClient, WordsApiError
+
+
+@pytest.fixture(scope="module")
+def fake_url():
+    # a real server rather than an asgi transport, so the client's socket timeouts apply
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    # hung requests never finish on their own, so shutdown only waits briefly for them
+    server = uvicorn.Server(uvicorn.Config(
+        fake_words_api.app,
+        host="127.0.0.1",
+        port=port,
+        log_level="warning",
+        timeout_graceful_shutdown=1
+    ))
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    server_thread.join()
+
+
+@pytest.fixture(autouse=True)
+def fake_upstream(monkeypatch):
+    monkeypatch.setattr(fake_words_api, "LATENCY_SECONDS", 0)
+    monkeypatch.setattr(fake_words_api, "FAILURE_RATE", 0)
+    monkeypatch.setattr(fake_words_api, "HANG_RATE", 0)
+    monkeypatch.setattr(fake_words_api, "FAILURES_BEFORE_SUCCESS", 0)
+    monkeypatch.setattr(fake_words_api, "request_count", 0)
+
+
+def get_frequency(client: WordsApiClient, word: str = "crane"):
+    async def get():
+        try:
+            return await client.get(f"/words/{word}/frequency")
+        finally:
+            await client.close()
+    return asyncio.run(get())
+
+
+def test_hung_request_times_out(fake_url, monkeypatch):
+    monkeypatch.setattr(fake_words_api, "HANG_RATE", 1)
+    circuit_breaker = CircuitBreaker("test", failure_threshold=5)
+    client = WordsApiClient("key", fake_url, read_timeout=0.2, max_retries=1, circuit_breaker=circuit_breaker)
+    started_at = time.monotonic()
+    with pytest.raises(WordsApiError):
+        get_frequency(client)
+    # two attempts of 0.2s plus at most 0.2s of backoff
+    assert time.monotonic() - started_at < 2
+    assert fake_words_api.request_count == 2
+    assert circuit_breaker.consecutive_failures == 1
+
+
+def test_5xx_is_retried_until_it_succeeds(fake_url, monkeypatch):
+    monkeypatch.setattr(fake_words_api, "FAILURES_BEFORE_SUCCESS", 2)
+    circuit_breaker = CircuitBreaker("test")
+    client = WordsApiClient("key", fake_url, max_retries=2, circuit_breaker=circuit_breaker)
+    assert get_frequency(client).status_code == 200
+    assert fake_words_api.request_count == 3
+    assert circuit_breaker.state == CLOSED
+    assert circuit_breaker.consecutive_failures == 0
+
+
+def test_404_is_returned_without_retries(fake_url):
+    client = WordsApiClient("key", fake_url, max_retries=2)
+    assert get_frequency(client, "zzzzz").status_code == 404
+    assert fake_words_api.request_count == 1
+
+
+def test_open_circuit_rejects_without_calling_upstream(fake_url, monkeypatch):
+    monkeypatch.setattr(fake_words_api, "FAILURE_RATE", 1)
+    circuit_breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=60)
+    for _ in range(2):
+        with pytest.raises(WordsApiError):
+            get_frequency(WordsApiClient("key", fake_url, max_retries=0, circuit_breaker=circuit_breaker))
+    assert circuit_breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        get_frequency(WordsApiClient("key", fake_url, max_retries=0, circuit_breaker=circuit_breaker))
+    assert fake_words_api.request_count == 2
+    assert circuit_breaker.rejected == 1
+
+
+def test_half_open_trial_closes_the_circuit_once_upstream_recovers(fake_url, monkeypatch):
+    monkeypatch.setattr(fake_words_api, "FAILURE_RATE", 1)
+    circuit_breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.1)
+    with pytest.raises(WordsApiError):
+        get_frequency(WordsApiClient("key", fake_url, max_retries=0, circuit_breaker=circuit_breaker))
+    assert circuit_breaker.state == OPEN
+    # a failed trial opens the circuit again
+    time.sleep(0.15)
+    with pytest.raises(WordsApiError):
+        get_frequency(WordsApiClient("key", fake_url, max_retries=0, circuit_breaker=circuit_breaker))
+    assert circuit_breaker.state == OPEN
+    monkeypatch.setattr(fake_words_api, "FAILURE_RATE", 0)
+    time.sleep(0.15)
+    assert get_frequency(WordsApiClient("key", fake_url, circuit_breaker=circuit_breaker)).status_code == 200
+    assert circuit_breaker.state == CLOSED
+
+
+def test_cancelled_half_open_trial_does_not_leave_the_circuit_stuck(fake_url, monkeypatch):
+    monkeypatch.setattr(fake_words_api, "HANG_RATE", 1)
+    circuit_breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0)
+    circuit_breaker.record_failure()
+    client = WordsApiClient("key", fake_url, circuit_breaker=circuit_breaker)
+
+    async def cancel_trial():
+        trial = asyncio.create_task(client.get("/words/crane/frequency"))
+        await asyncio.sleep(0.1)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        await client.close()
+
+    asyncio.run(cancel_trial())
+    assert circuit_breaker.state == OPEN
+    monkeypatch.setattr(fake_words_api, "HANG_RATE", 0)
+    assert get_frequency(WordsApiClient("key", fake_url, circuit_breaker=circuit_breaker)).status_code == 200
+    assert circuit_breaker.state == CLOSED